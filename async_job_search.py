@@ -0,0 +1,271 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+
+import aiohttp
+
+
+logger = logging.getLogger(__name__)
+
+RAPIDAPI_HOST = "linkedin-job-search-api.p.rapidapi.com"
+RAPIDAPI_PATH = "/active-jb-7d"
+
+# 所有搜索器共用一个后台事件循环; 每个 (api_key, host) 共用一个长连接会话
+CONNECTION_POOL_SIZE = 8
+DEFAULT_TIMEOUT = 15
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_QUERIES = 5
+
+
+def build_focused_queries(primary_role="", simple_search_terms="", hard_skills="", max_queries=5, skills_per_query=1):
+    """把求职者资料拆分为若干个聚焦的短查询, 代替一个超长的拼接查询"""
+    role = (primary_role or "").strip()
+    terms = [t.strip() for t in (simple_search_terms or "").split(",") if t.strip()]
+    skills = [s.strip() for s in (hard_skills or "").split(",") if s.strip()]
+
+    candidates = []
+    if role:
+        candidates.append(role)
+    candidates.extend(terms)
+
+    # 角色 + 核心技能组合, 提高技术岗位的召回
+    if role:
+        for i in range(0, len(skills), skills_per_query):
+            candidates.append(f"{role} {' '.join(skills[i:i + skills_per_query])}")
+    else:
+        candidates.extend(skills)
+
+    queries = []
+    seen = set()
+    for query in candidates:
+        key = query.lower()
+        if key not in seen:
+            seen.add(key)
+            queries.append(query)
+        if len(queries) >= max_queries:
+            break
+
+    return queries or ["General"]
+
+
+def normalize_job(raw):
+    """把RapidAPI返回的职位统一成页面使用的字段 (只用于去重和展示, 搜索结果本身保持上游原样)"""
+    locations = raw.get("locations_derived") or []
+    location = raw.get("location") or (locations[0] if locations else "Unknown")
+    return {
+        "id": str(raw.get("id") or raw.get("job_id") or ""),
+        "title": raw.get("title") or raw.get("job_title") or "Unknown",
+        "company": raw.get("organization") or raw.get("company") or "Unknown",
+        "location": location,
+        "posted_date": raw.get("date_posted") or raw.get("posted_date") or "Unknown",
+        "url": raw.get("url") or raw.get("job_url") or "",
+        "description": raw.get("description_text") or raw.get("description") or "",
+    }
+
+
+def _dedupe_key(job):
+    if not isinstance(job, dict):
+        return ("raw", repr(job))
+    job = normalize_job(job)
+    if job["id"]:
+        return ("id", job["id"])
+    return ("text", job["title"].lower(), job["company"].lower(), job["location"].lower())
+
+
+def merge_results(result_lists, limit):
+    """轮流合并多个查询的结果并去重, 保证每个查询都有代表; 返回的职位对象保持原样"""
+    merged = []
+    seen = set()
+    for position in range(max((len(r) for r in result_lists), default=0)):
+        for results in result_lists:
+            if position >= len(results):
+                continue
+            job = results[position]
+            key = _dedupe_key(job)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(job)
+            if len(merged) >= limit:
+                return merged
+    return merged
+
+
+# ---------- 共享的后台事件循环与长连接会话 ----------
+
+_loop = None
+_loop_lock = threading.Lock()
+_sessions = {}
+
+
+def _event_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="job-search-loop", daemon=True).start()
+        return _loop
+
+
+def _run(coro, timeout):
+    """在共享事件循环中执行协程; 超时后取消并返回 None"""
+    future = asyncio.run_coroutine_threadsafe(coro, _event_loop())
+    try:
+        return future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        logger.warning("Job search did not finish within %.0fs", timeout)
+        return None
+
+
+def _deadline(query_count, timeout, max_concurrency):
+    """一组查询的总耗时上限: 每轮最多 max_concurrency 个并行查询, 每个查询最多 timeout 秒"""
+    rounds = -(-max(query_count, 1) // max_concurrency)
+    return timeout * rounds
+
+
+async def _fan_out(fetch, queries, location, limit, timeout, max_concurrency):
+    """并行执行 fetch(query, location, per_query), 合并去重后返回前 limit 条; 超过总耗时上限的查询被取消, 返回已完成部分"""
+    if not queries:
+        return []
+    per_query = max(1, -(-limit // len(queries)) + 2)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(query):
+        async with semaphore:
+            return await fetch(query, location, per_query)
+
+    tasks = [asyncio.ensure_future(bounded(query)) for query in queries]
+    done, pending = await asyncio.wait(tasks, timeout=_deadline(len(tasks), timeout, max_concurrency))
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning("%s of %s job searches timed out, returning partial results", len(pending), len(tasks))
+
+    result_lists = []
+    for query, task in zip(queries, tasks):
+        if task not in done:
+            result_lists.append([])
+        elif task.exception() is not None:
+            logger.warning("Job search %r failed: %s", query, task.exception())
+            result_lists.append([])
+        else:
+            result_lists.append(list(task.result() or []))
+    return merge_results(result_lists, limit)
+
+
+def search_parallel(fetch, queries, location, limit, timeout=DEFAULT_TIMEOUT, max_concurrency=DEFAULT_CONCURRENCY):
+    """同步接口: 在共享事件循环上并行执行查询, 超时返回部分结果 (最坏情况返回 [])"""
+    coro = _fan_out(fetch, queries, location, limit, timeout, max_concurrency)
+    # 留出建立会话的余量; _fan_out 自己在总耗时上限处返回部分结果
+    jobs = _run(coro, _deadline(len(queries), timeout, max_concurrency) + timeout)
+    return jobs or []
+
+
+async def _shared_session(api_key, host):
+    # 只在事件循环线程中调用, 创建过程中没有 await, 不会并发创建
+    key = (api_key, host)
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=CONNECTION_POOL_SIZE, keepalive_timeout=60, ttl_dns_cache=300),
+            headers={"x-rapidapi-key": api_key, "x-rapidapi-host": host}
+        )
+        _sessions[key] = session
+    return session
+
+
+async def _close_sessions():
+    for session in list(_sessions.values()):
+        await session.close()
+    _sessions.clear()
+
+
+def close_sessions():
+    """关闭共享的连接池 (进程退出或测试结束时调用)"""
+    if _loop is not None:
+        _run(_close_sessions(), DEFAULT_TIMEOUT)
+
+
+class AsyncLinkedInJobSearcher:
+    """基于asyncio的LinkedIn职位搜索 - 共享连接池、并发上限、多查询并行
+
+    实例不持有线程或会话, 可以随意创建; 返回上游的原始职位对象, 需要统一字段时调用 normalize_job.
+    """
+
+    def __init__(self, api_key=None, host=RAPIDAPI_HOST, path=RAPIDAPI_PATH, base_url=None,
+                 max_concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, max_queries=DEFAULT_MAX_QUERIES):
+        self.api_key = api_key or os.environ.get("RAPIDAPI_KEY", "")
+        self.host = host
+        # RAPIDAPI_BASE_URL 可指向本地替身 (replay.py)
+        self.url = (base_url or os.environ.get("RAPIDAPI_BASE_URL") or f"https://{host}") + path
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_queries = max_queries
+
+    async def search_one(self, query, location, limit):
+        """执行单个查询, 失败时返回空列表, 不影响其他查询"""
+        session = await _shared_session(self.api_key, self.host)
+        params = {"title_filter": query, "location_filter": location or "", "limit": limit}
+        try:
+            async with session.get(self.url, params=params, timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status != 200:
+                    logger.warning("RapidAPI search %r failed: HTTP %s", query, response.status)
+                    return []
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("RapidAPI search %r failed: %s", query, e)
+            return []
+
+        if isinstance(data, dict):
+            data = data.get("data") or data.get("jobs") or []
+        return [job for job in data if isinstance(job, dict)]
+
+    def _search(self, queries, location, limit):
+        return search_parallel(self.search_one, queries, location, limit, self.timeout, self.max_concurrency)
+
+    def search_jobs(self, keywords, location, limit=10):
+        """按逗号拆分关键词并行搜索, 最多 max_queries 个查询 (靠前的角色和搜索词优先)"""
+        queries = build_focused_queries(simple_search_terms=keywords, max_queries=self.max_queries)
+        return self._search(queries, location, limit)
+
+    def search_profile(self, search_fields, limit=10, max_queries=None):
+        """根据求职者搜索字段生成聚焦查询并行搜索"""
+        queries = build_focused_queries(
+            search_fields.get("primary_role", ""),
+            search_fields.get("simple_search_terms", ""),
+            search_fields.get("hard_skills", ""),
+            max_queries=max_queries or self.max_queries
+        )
+        location = search_fields.get("location_preference", "")
+        return self._search(queries, location, limit)
+
+
+def use_parallel_job_search(searcher_class, max_queries=DEFAULT_MAX_QUERIES):
+    """让已有搜索器类的 search_jobs 把拼接的关键词拆成聚焦查询并行执行 (替换类属性, 可重复调用)
+
+    每个查询仍调用原来的 search_jobs, 请求和返回的职位对象与原实现完全一致; 只有一个查询时直接调用原方法.
+    原方法是同步的, 在共享事件循环的线程池中执行, 超时的查询被放弃, 返回其余查询的结果.
+    """
+    original = searcher_class.search_jobs
+    if getattr(original, "parallel_fan_out", False):
+        return
+
+    def search_jobs(self, keywords, location, limit=10):
+        queries = build_focused_queries(simple_search_terms=keywords, max_queries=max_queries)
+        if len(queries) <= 1:
+            return original(self, keywords=keywords, location=location, limit=limit)
+
+        async def fetch(query, query_location, query_limit):
+            results = await asyncio.to_thread(original, self, keywords=query, location=query_location, limit=query_limit)
+            if results is not None and not isinstance(results, list):
+                raise TypeError(f"search_jobs returned {type(results).__name__}, expected a list")
+            return results
+
+        return search_parallel(fetch, queries, location, limit)
+
+    search_jobs.parallel_fan_out = True
+    search_jobs.__wrapped__ = original
+    searcher_class.search_jobs = search_jobs
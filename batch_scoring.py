@@ -0,0 +1,236 @@
+import re
+
+import numpy as np
+
+
+# 经验级别 -> 序数 (猎头表单使用中文, 求职者表单使用英文)
+EXPERIENCE_LEVELS = {
+    "应届": 0, "recent graduate": 0, "fresh graduates": 0,
+    "1-3年": 1, "1-3 years": 1,
+    "3-5年": 2, "3-5 years": 2,
+    "5-10年": 3, "5-10 years": 3,
+    "10年以上": 4, "10+ years": 4,
+}
+
+EDUCATION_LEVELS = {
+    "high school": 0, "高中": 0,
+    "diploma": 1, "大专": 1,
+    "bachelor": 2, "本科": 2,
+    "master": 3, "硕士": 3,
+    "phd": 4, "博士": 4,
+}
+
+# 综合分数权重 - 本模块自有的规则评分 (不是 backend.analyze_match_simple 的移植):
+# 分数 = 100 * (技能覆盖率 * 0.6 + 经验 * 0.2 + 学历 * 0.1 + 职位名称 * 0.1)
+SKILL_WEIGHT = 0.6
+EXPERIENCE_WEIGHT = 0.2
+EDUCATION_WEIGHT = 0.1
+ROLE_WEIGHT = 0.1
+# 与职位不共享任何技能的求职者能得到的最高分 - 倒排索引预筛选与预计算分数表的下限都以此为界
+NO_SKILL_SCORE_CEILING = round((EXPERIENCE_WEIGHT + EDUCATION_WEIGHT + ROLE_WEIGHT) * 100)
+
+_SKILL_SPLIT = re.compile(r"[,，;；、/\n]+")
+# "react.js" / "reactjs" / "react js" -> "react"
+_JS_SUFFIX = re.compile(r"(?<=\w)[ .]?js$")
+
+
+def normalize_skill(text):
+    """技能名规范化: 小写、合并空白、去掉 .js 后缀; 规范化后按完全相等匹配"""
+    return _JS_SUFFIX.sub("", " ".join(str(text).lower().split()))
+
+
+def split_skills(text):
+    """把技能文本拆分为规范化的技能列表"""
+    if not text:
+        return []
+    skills = []
+    for part in _SKILL_SPLIT.split(str(text)):
+        skill = normalize_skill(part)
+        if skill and skill not in skills:
+            skills.append(skill)
+    return skills
+
+
+def _level(value, levels):
+    text = str(value or "").strip().lower()
+    if text in levels:
+        return levels[text]
+    for name, level in levels.items():
+        if name in text:
+            return level
+    return -1
+
+
+def job_from_row(job):
+    """get_all_jobs_for_matching() 返回的职位行 -> 评分所需字段"""
+    return {
+        "id": job[0],
+        "title": job[1],
+        "skills": split_skills(job[4]),
+        "industry": job[6],
+        "location": job[7],
+        "experience": job[11],
+    }
+
+
+def seeker_from_row(seeker):
+    """get_all_job_seekers() 返回的求职者行 -> 评分所需字段"""
+    return {
+        "id": seeker[0],
+        "skills": split_skills(seeker[2]),
+        "experience": seeker[3],
+        "education": seeker[4],
+        "title": seeker[9],
+    }
+
+
+class SeekerMatrix:
+    """求职者特征矩阵 - 构建一次后可对任意职位做向量化批量评分"""
+
+    def __init__(self, seekers):
+        # 同一 job_seeker_id 有多行时只保留最后一行 (最新), 与 load_seekers 和 SkillIndex 一致
+        seekers = list({str(seeker["id"]): seeker for seeker in seekers}.values())
+        self.size = len(seekers)
+        self.ids = [str(seeker["id"]) for seeker in seekers]
+        # job_seeker_id -> 行下标
+        self.positions = {seeker_id: index for index, seeker_id in enumerate(self.ids)}
+        self.skill_lists = [s["skills"] for s in seekers]
+        self.experience = np.array([_level(s["experience"], EXPERIENCE_LEVELS) for s in seekers], dtype=np.int8)
+        self.education = np.array([_level(s["education"], EDUCATION_LEVELS) for s in seekers], dtype=np.int8)
+        self.titles = np.array([str(s["title"] or "").lower() for s in seekers], dtype=str)
+
+        # 技能倒排表: 技能 -> 拥有该技能的求职者下标数组
+        postings = {}
+        for index, skills in enumerate(self.skill_lists):
+            for skill in skills:
+                postings.setdefault(skill, []).append(index)
+        self.postings = {skill: np.array(ids, dtype=np.int64) for skill, ids in postings.items()}
+
+    @classmethod
+    def from_rows(cls, rows):
+        return cls([seeker_from_row(row) for row in rows])
+
+    def indices_for(self, seeker_ids):
+        """求职者ID集合 -> 升序行下标数组"""
+        indices = [self.positions[str(seeker_id)] for seeker_id in seeker_ids if str(seeker_id) in self.positions]
+        return np.array(sorted(indices), dtype=np.int64)
+
+    def score_components(self, job, rows=None):
+        """各评分维度的向量 (0-1): skill / experience / education / role
+
+        rows 为行下标数组时只计算这些行 (倒排索引预筛选后的候选池), 向量按 rows 的顺序排列.
+        """
+        experience = self.experience if rows is None else self.experience[rows]
+        education = self.education if rows is None else self.education[rows]
+        titles = self.titles if rows is None else self.titles[rows]
+        n = len(experience)
+        required = job["skills"]
+
+        # 技能覆盖率
+        if required:
+            hits = np.zeros(self.size, dtype=np.float32)
+            for skill in required:
+                postings = self.postings.get(skill)
+                if postings is not None:
+                    hits[postings] += 1
+            skill_score = (hits if rows is None else hits[rows]) / len(required)
+        else:
+            skill_score = np.full(n, 0.5, dtype=np.float32)
+
+        # 经验: 每少一个级别扣分, 未知按中等处理
+        job_level = _level(job["experience"], EXPERIENCE_LEVELS)
+        if job_level < 0:
+            experience_score = np.full(n, 0.5, dtype=np.float32)
+        else:
+            shortfall = np.maximum(job_level - experience, 0)
+            experience_score = np.clip(1.0 - shortfall * 0.34, 0.0, 1.0).astype(np.float32)
+            experience_score[experience < 0] = 0.5
+
+        # 学历
+        education_score = np.where(education < 0, 0.5, education / 4.0).astype(np.float32)
+
+        # 职位名称关键词重合
+        role_score = np.zeros(n, dtype=np.float32)
+        for token in str(job["title"] or "").lower().split():
+            if len(token) > 1:
+                role_score = np.maximum(role_score, (np.char.find(titles, token) >= 0).astype(np.float32))
+
+        return {
+            "skill": skill_score,
+            "experience": experience_score,
+            "education": education_score,
+            "role": role_score,
+        }
+
+    def score(self, job, components=None):
+        """一次向量化计算所有求职者对该职位的分数 (0-100)"""
+        if components is None:
+            components = self.score_components(job)
+        total = (
+            SKILL_WEIGHT * components["skill"]
+            + EXPERIENCE_WEIGHT * components["experience"]
+            + EDUCATION_WEIGHT * components["education"]
+            + ROLE_WEIGHT * components["role"]
+        )
+        return np.rint(total * 100).astype(np.int32)
+
+    def top_k(self, job, k, min_score=0, components=None):
+        """返回真正的前K名 (下标, 分数), 按分数降序; 下标是 components 向量中的位置"""
+        scores = self.score(job, components)
+        candidates = np.flatnonzero(scores >= min_score)
+        if candidates.size == 0 or k <= 0:
+            return []
+        if candidates.size > k:
+            part = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), int(scores[i])) for i in order]
+
+    def skill_gaps(self, job, index):
+        """职位要求中该求职者具备 / 缺少的技能"""
+        seeker_skills = set(self.skill_lists[index])
+        matched = [s for s in job["skills"] if s in seeker_skills]
+        missing = [s for s in job["skills"] if s not in matched]
+        return matched, missing
+
+    def explain(self, job, index, score, breakdown):
+        """为单个候选人生成分析结果"""
+        matched, missing = self.skill_gaps(job, index)
+        return build_analysis(score, matched, missing, breakdown)
+
+
+def build_analysis(score, matched, missing, breakdown):
+    """由分数、各维度得分和技能差异生成分析结果
+
+    字段沿用 analyze_match_simple 的 match_score / key_strengths / potential_gaps / recommendation;
+    这里无法计算的薪资匹配、文化契合不输出.
+    """
+    if score >= 80:
+        recommendation = "高度匹配，建议优先联系"
+    elif score >= 60:
+        recommendation = "基本匹配，可安排初步沟通"
+    else:
+        recommendation = "匹配度一般，建议作为备选"
+
+    return {
+        "match_score": score,
+        "key_strengths": [f"具备 {skill}" for skill in matched[:5]],
+        "potential_gaps": [f"缺少 {skill}" for skill in missing[:5]],
+        "recommendation": recommendation,
+        "score_breakdown": breakdown,
+    }
+
+
+def score_candidates(job_row, matrix, top_k=10, min_score=0, candidates=None):
+    """对一个职位批量评分矩阵中的求职者, 返回前K名 [(job_seeker_id, 分析结果)]
+
+    candidates 为预筛选出的行下标数组时只对这些行评分; 矩阵始终包含全部求职者, 不随候选池变化.
+    """
+    job = job_from_row(job_row)
+    components = matrix.score_components(job, candidates)
+    results = []
+    for position, score in matrix.top_k(job, top_k, min_score, components):
+        index = position if candidates is None else int(candidates[position])
+        breakdown = {name: float(values[position]) for name, values in components.items()}
+        results.append((matrix.ids[index], matrix.explain(job, index, score, breakdown)))
+    return results
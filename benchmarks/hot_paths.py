@@ -0,0 +1,374 @@
+"""热点路径基准: 用确定性合成数据测量不同数据规模下的匹配、列表、统计与搜索排序耗时
+
+用法:
+    python benchmarks/hot_paths.py [--sizes 100,1000,10000] [--seed 42] [--repeat 5]
+                                   [--json results.json] [--compare baseline.json --threshold 0.25]
+
+每个规模使用独立的临时数据库 (与应用相同的建表与迁移). 上游 API (RapidAPI / OpenAI) 以确定性
+的假实现代替; backend 不可导入时, 依赖它的基准记为 skipped. 与 --compare 的基线相比中位数变慢
+超过阈值时返回 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime
+
+import synthetic
+from synthetic import ROOT
+
+
+DEFAULT_SIZES = "100,1000,10000"
+DEFAULT_THRESHOLD = 0.25
+# 中位数差异低于该值 (毫秒) 视为噪声, 不判为回归
+NOISE_FLOOR_MS = 1.0
+# 全量预计算超过该 职位 x 求职者 组合数时跳过
+MAX_REBUILD_PAIRS = 1_000_000
+# backend.analyze_match_simple 逐个调用, 最多评分这么多求职者
+MAX_ANALYZE_SEEKERS = 2000
+EMBEDDING_DIM = 256
+SEARCH_RESULTS_PER_QUERY = 25
+
+
+class Skip(Exception):
+    """当前环境无法运行该基准"""
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=None):
+    """注册基准: setup(ctx) 返回 (被测函数, 每次调用处理的条数)"""
+    def decorator(setup):
+        BENCHMARKS.append((name, setup, repeat))
+        return setup
+    return decorator
+
+
+def measure(fn, repeat, warmup=1):
+    """重复调用 fn, 返回毫秒统计"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def _import_backend():
+    try:
+        import backend
+    except ImportError as e:
+        raise Skip(f"backend not importable: {e}")
+    return backend
+
+
+# ---------- 假上游 ----------
+
+class FakeLinkedInSearcher:
+    """代替 RapidAPI 的确定性搜索: 同一查询总是返回相同的原始职位"""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.calls = 0
+
+    def search_jobs(self, keywords, location, limit=10):
+        self.calls += 1
+        return synthetic.raw_linkedin_jobs(limit, self.seed, f"{keywords}|{location}")
+
+
+def fake_embedding(text, dim=EMBEDDING_DIM):
+    """代替 OpenAI 向量的特征哈希: 相同文本得到相同向量, 共享词越多越相似"""
+    import numpy as np
+
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in text.lower().split():
+        bucket = zlib.crc32(token.encode("utf-8"))
+        vector[bucket % dim] += 1.0 if bucket & 1 else -1.0
+    return vector
+
+
+# ---------- 基准 ----------
+
+@benchmark("batch_scoring.score_candidates.cold")
+def bench_score_candidates_cold(ctx):
+    from batch_scoring import SeekerMatrix
+    from batch_scoring import score_candidates
+
+    job_row, seeker_rows = ctx["job_row"], ctx["seeker_rows"]
+    return lambda: score_candidates(job_row, SeekerMatrix.from_rows(seeker_rows), top_k=10), len(seeker_rows)
+
+
+@benchmark("batch_scoring.score_candidates.warm")
+def bench_score_candidates_warm(ctx):
+    from batch_scoring import SeekerMatrix
+    from batch_scoring import score_candidates
+
+    job_row, seeker_rows = ctx["job_row"], ctx["seeker_rows"]
+    matrix = SeekerMatrix.from_rows(seeker_rows)
+    return lambda: score_candidates(job_row, matrix, top_k=10), len(seeker_rows)
+
+
+@benchmark("backend.analyze_match_simple")
+def bench_analyze_match_simple(ctx):
+    analyze_match_simple = _import_backend().analyze_match_simple
+
+    job_row = ctx["job_row"]
+    seeker_rows = ctx["seeker_rows"][:MAX_ANALYZE_SEEKERS]
+
+    def run():
+        for seeker in seeker_rows:
+            analyze_match_simple(job_row, seeker)
+    return run, len(seeker_rows)
+
+
+@benchmark("backend.get_all_jobs_for_matching")
+def bench_get_all_jobs(ctx):
+    get_all_jobs_for_matching = _import_backend().get_all_jobs_for_matching
+    return get_all_jobs_for_matching, ctx["jobs"]
+
+
+@benchmark("backend.get_all_job_seekers")
+def bench_get_all_seekers(ctx):
+    get_all_job_seekers = _import_backend().get_all_job_seekers
+    return get_all_job_seekers, ctx["seekers"]
+
+
+@benchmark("job_stats.get_job_statistics")
+def bench_job_statistics(ctx):
+    from job_stats import get_job_statistics
+    return get_job_statistics, ctx["jobs"]
+
+
+@benchmark("headhunter_search.query_and_count")
+def bench_headhunter_search(ctx):
+    from headhunter_search import count_head_hunter_jobs
+    from headhunter_search import query_head_hunter_jobs
+
+    def run():
+        query_head_hunter_jobs("python engineer", page_size=20)
+        count_head_hunter_jobs("python engineer")
+    return run, ctx["jobs"]
+
+
+@benchmark("match_scores.rebuild", repeat=1)
+def bench_match_rebuild(ctx):
+    from match_scores import MatchScoreWorker
+    from match_scores import load_active_jobs
+
+    pairs = ctx["seekers"] * len(load_active_jobs())
+    if pairs > MAX_REBUILD_PAIRS:
+        raise Skip(f"{pairs} job x seeker pairs exceeds {MAX_REBUILD_PAIRS}")
+    worker = MatchScoreWorker()
+    return worker.rebuild, pairs
+
+
+@benchmark("match_scores.top_matches")
+def bench_top_matches(ctx):
+    from match_scores import MatchScoreWorker
+    from match_scores import top_matches
+
+    worker = MatchScoreWorker()
+    if not worker.is_built():
+        raise Skip("match_scores was not built for this size")
+    job_id = ctx["job_row"][0]
+    return lambda: top_matches(job_id, 60, 20), 1
+
+
+@benchmark("search.fetch_merge_rank")
+def bench_search_pipeline(ctx):
+    try:
+        from async_job_search import build_focused_queries
+        from async_job_search import merge_results
+        from async_job_search import normalize_job
+    except ImportError as e:
+        raise Skip(f"async_job_search not importable: {e}")
+    from job_search import search_cache
+    from job_search import search_jobs_cached
+    from vector_store import LocalVectorStore
+
+    # 本地职位向量索引, 规模与本轮职位数相同
+    store = LocalVectorStore(os.path.join(ctx["directory"], "vectors"), EMBEDDING_DIM)
+    postings = list(synthetic.job_postings(ctx["jobs"], ctx["seed"]))
+    store.upsert(
+        [str(i) for i in range(len(postings))],
+        [fake_embedding(f"{p['job_title']} {p['required_skills']}") for p in postings],
+        [{"title": p["job_title"]} for p in postings]
+    )
+
+    profile = next(synthetic.seeker_profiles(1, ctx["seed"]))
+    searcher = FakeLinkedInSearcher(ctx["seed"])
+    queries = build_focused_queries(profile["primary_role"], profile["simple_search_terms"], profile["hard_skills"])
+    profile_vector = fake_embedding(f"{profile['primary_role']} {profile['hard_skills']}")
+
+    def run():
+        search_cache.clear()
+        result_lists = [
+            [normalize_job(raw) for raw in search_jobs_cached(searcher, query, "Hong Kong", SEARCH_RESULTS_PER_QUERY)]
+            for query in queries
+        ]
+        jobs = merge_results(result_lists, SEARCH_RESULTS_PER_QUERY)
+        for job in jobs:
+            job["similarity"] = float(fake_embedding(f"{job['title']} {job['description']}") @ profile_vector)
+        jobs.sort(key=lambda job: job["similarity"], reverse=True)
+        store.query(profile_vector, top_k=10)
+    return run, ctx["jobs"]
+
+
+# ---------- 运行与比较 ----------
+
+def _listing_rows(ctx):
+    """列表函数的行: backend 可用时用真实函数, 否则按相同布局从合成数据构造"""
+    try:
+        backend = _import_backend()
+        return backend.get_all_jobs_for_matching(), backend.get_all_job_seekers()
+    except Skip:
+        today = datetime.now().date().isoformat()
+        jobs = [
+            synthetic.matching_job_row(job_id, job)
+            for job_id, job in enumerate(synthetic.job_postings(ctx["jobs"], ctx["seed"]), start=1)
+            if job["job_valid_until"] >= today
+        ]
+        seekers = [synthetic.listing_seeker_row(p) for p in synthetic.seeker_profiles(ctx["seekers"], ctx["seed"])]
+        return jobs, seekers
+
+
+def run_size(size, seed, repeat, selected):
+    from db_pool import connection_manager
+
+    directory = tempfile.mkdtemp(prefix="smartcareer_bench_")
+    cwd = os.getcwd()
+    results = []
+    try:
+        # 数据库路径是相对路径, 每个规模在自己的目录中建库
+        os.chdir(directory)
+        connection_manager.close_all()
+        start = time.perf_counter()
+        synthetic.populate(size, size, seed)
+        print(f"[{size}] populated {size} seekers and {size} jobs in {time.perf_counter() - start:.2f}s")
+
+        ctx = {"size": size, "seed": seed, "seekers": size, "jobs": size, "directory": directory}
+        job_rows, ctx["seeker_rows"] = _listing_rows(ctx)
+        if not job_rows:
+            raise RuntimeError("no active jobs were generated")
+        ctx["job_row"] = job_rows[0]
+
+        for name, setup, fixed_repeat in BENCHMARKS:
+            if selected and not any(pattern in name for pattern in selected):
+                continue
+            entry = {"benchmark": name, "size": size}
+            try:
+                fn, items = setup(ctx)
+                runs = fixed_repeat or repeat
+                entry.update(measure(fn, runs, warmup=0 if fixed_repeat else 1))
+                entry["items"] = items
+                if items:
+                    entry["per_item_us"] = round(entry["median_ms"] * 1000 / items, 3)
+                print(f"[{size}] {name:42s} median {entry['median_ms']:10.3f} ms  p95 {entry['p95_ms']:10.3f} ms")
+            except Skip as e:
+                entry["skipped"] = str(e)
+                print(f"[{size}] {name:42s} skipped: {e}")
+            results.append(entry)
+    finally:
+        connection_manager.close_all()
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, threshold):
+    """返回中位数变慢超过阈值的条目"""
+    previous = {
+        (entry["benchmark"], entry["size"]): entry
+        for entry in baseline.get("results", [])
+        if "median_ms" in entry
+    }
+    regressions = []
+    for entry in results:
+        old = previous.get((entry["benchmark"], entry["size"]))
+        if old is None or "median_ms" not in entry:
+            continue
+        delta = entry["median_ms"] - old["median_ms"]
+        ratio = entry["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        entry["baseline_median_ms"] = old["median_ms"]
+        entry["change"] = round(ratio - 1, 4)
+        if ratio > 1 + threshold and delta > NOISE_FLOOR_MS:
+            regressions.append(entry)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Smart Career hot paths on synthetic data")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated seeker/job counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline results from an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed median slowdown")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = []
+    for size in sizes:
+        results.extend(run_size(size, args.seed, args.repeat, args.only))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if regressions:
+        for entry in regressions:
+            print(f"FAIL: {entry['benchmark']} @ {entry['size']}: {entry['baseline_median_ms']:.3f} ms -> "
+                  f"{entry['median_ms']:.3f} ms (+{entry['change']:.0%})", file=sys.stderr)
+        return 1
+    if args.compare:
+        print(f"OK: no benchmark slowed down by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
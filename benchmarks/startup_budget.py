@@ -0,0 +1,197 @@
+"""启动耗时检查: 测量 streamlit_app.py 顶层导入的冷启动时间和首次脚本运行, 超出预算或提前导入重量级模块时失败
+
+首次运行用 streamlit.testing 的 AppTest 执行整个脚本, 并记录每个模块由哪个线程首次导入:
+重量级模块只允许在后台预热线程 (prewarm-*) 中导入, 在脚本线程中同步导入即失败.
+
+用法:
+    python benchmarks/startup_budget.py [--budget 2.0] [--first-run-budget 4.0] [--skip-first-run] [--json report.json]
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+
+# 这些模块只能在页面内部按需导入
+FORBIDDEN_EAGER_IMPORTS = ["backend", "database", "pandas", "pinecone", "numpy", "openai", "aiohttp"]
+
+DEFAULT_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "2.0"))
+DEFAULT_FIRST_RUN_BUDGET_SECONDS = float(os.environ.get("STARTUP_FIRST_RUN_BUDGET_SECONDS", "4.0"))
+BACKGROUND_THREAD_PREFIX = "prewarm-"
+
+# 在子进程中执行: 审计钩子记录每个模块首次导入时所在的线程, 然后用 AppTest 运行一次应用脚本
+FIRST_RUN_CODE = """
+import json
+import sys
+import threading
+import time
+
+first_import = {}
+
+def audit(event, args):
+    if event == "import" and args[0] not in first_import:
+        first_import[args[0]] = threading.current_thread().name
+
+sys.addaudithook(audit)
+
+from streamlit.testing.v1 import AppTest
+
+start = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "elapsed_s": elapsed,
+    "imports": first_import,
+    "exceptions": [str(getattr(e, "message", e)) for e in app.exception],
+}))
+"""
+
+
+def top_level_imports(path=APP):
+    """解析应用文件中模块级别的 import 语句"""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def measure(modules):
+    """在全新的解释器中导入模块, 解析 -X importtime 输出"""
+    code = "; ".join(f"import {module}" for module in modules)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # 表头
+        name = parts[2].rstrip()
+        # 列分隔符后固定一个空格, 之后每层嵌套缩进两个空格
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imported[name.strip()] = {"cumulative_s": cumulative_us / 1e6, "depth": depth}
+
+    errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+    return result.returncode, wall, imported, errors
+
+
+def measure_first_run(timeout):
+    """在全新的解释器中执行一次应用脚本, 返回 (returncode, 结果字典, 错误输出)"""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_RUN_CODE, APP, str(timeout)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    lines = result.stdout.strip().splitlines()
+    try:
+        report = json.loads(lines[-1]) if lines else None
+    except ValueError:
+        report = None
+    return result.returncode, report, result.stderr.strip().splitlines()
+
+
+def synchronous_heavy_imports(imports):
+    """脚本线程 (非后台预热线程) 首次导入的重量级模块"""
+    found = {}
+    for module, thread in imports.items():
+        root = module.split(".")[0]
+        if root in FORBIDDEN_EAGER_IMPORTS and not thread.startswith(BACKGROUND_THREAD_PREFIX):
+            found.setdefault(root, thread)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check Smart Career cold-start import time")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="seconds")
+    parser.add_argument("--first-run-budget", type=float, default=DEFAULT_FIRST_RUN_BUDGET_SECONDS,
+                        help="seconds for the first script run")
+    parser.add_argument("--skip-first-run", action="store_true", help="only measure top-level imports")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    modules = top_level_imports()
+    returncode, wall, imported, errors = measure(modules)
+
+    top_level = sorted(
+        ((name, info["cumulative_s"]) for name, info in imported.items() if info["depth"] == 0),
+        key=lambda item: item[1], reverse=True
+    )
+    eager = [
+        name for name in FORBIDDEN_EAGER_IMPORTS
+        if name in imported
+    ]
+
+    report = {
+        "modules": modules,
+        "wall_s": round(wall, 4),
+        "budget_s": args.budget,
+        "slowest": [{"module": name, "cumulative_s": round(seconds, 4)} for name, seconds in top_level[:15]],
+        "forbidden_eager_imports": eager,
+    }
+
+    print(f"Cold start: {wall:.3f}s (budget {args.budget:.3f}s)")
+    for item in report["slowest"]:
+        print(f"  {item['cumulative_s']:8.4f}s  {item['module']}")
+
+    first_run = None
+    if not args.skip_first_run:
+        first_returncode, first_run, first_errors = measure_first_run(timeout=max(args.first_run_budget * 5, 30))
+        if first_returncode != 0 or first_run is None:
+            print("First run failed:\n" + "\n".join(first_errors[-10:]), file=sys.stderr)
+            return 2
+        first_run["synchronous_heavy_imports"] = synchronous_heavy_imports(first_run.pop("imports"))
+        first_run["budget_s"] = args.first_run_budget
+        report["first_run"] = first_run
+        print(f"First script run: {first_run['elapsed_s']:.3f}s (budget {args.first_run_budget:.3f}s)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if returncode != 0:
+        print("Import failed:\n" + "\n".join(errors[-10:]), file=sys.stderr)
+        return 2
+    if eager:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(eager)}", file=sys.stderr)
+        return 1
+    if wall > args.budget:
+        print(f"FAIL: cold start {wall:.3f}s exceeds budget {args.budget:.3f}s", file=sys.stderr)
+        return 1
+    if first_run is not None:
+        if first_run["exceptions"]:
+            print("FAIL: first run raised:\n" + "\n".join(first_run["exceptions"]), file=sys.stderr)
+            return 1
+        synchronous = first_run["synchronous_heavy_imports"]
+        if synchronous:
+            print("FAIL: heavy modules imported on the script thread during the first run: "
+                  + ", ".join(f"{name} ({thread})" for name, thread in synchronous.items()), file=sys.stderr)
+            return 1
+        if first_run["elapsed_s"] > args.first_run_budget:
+            print(f"FAIL: first run {first_run['elapsed_s']:.3f}s exceeds budget {args.first_run_budget:.3f}s",
+                  file=sys.stderr)
+            return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""确定性合成数据: 生成 job_seekers 与 head_hunter_jobs 行, 用于基准测试
+
+同一 seed 总是生成相同的数据, 不同提交之间的结果可以直接比较.
+"""
+import os
+import random
+import sys
+from datetime import date
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from db_pool import HEAD_HUNTER_DB  # noqa: E402
+from db_pool import HEAD_HUNTER_TABLE  # noqa: E402
+from db_pool import JOB_SEEKER_DB  # noqa: E402
+from db_pool import transaction  # noqa: E402
+from job_import import COMPANY_SIZES  # noqa: E402
+from job_import import CURRENCIES  # noqa: E402
+from job_import import EMPLOYMENT_TYPES  # noqa: E402
+from job_import import EXPERIENCE_LEVELS  # noqa: E402
+from job_import import INDUSTRIES  # noqa: E402
+from job_import import JOB_COLUMNS  # noqa: E402
+from job_import import VISA_OPTIONS  # noqa: E402
+from job_import import WORK_LOCATIONS  # noqa: E402
+from job_import import WORK_TYPES  # noqa: E402
+from resume_stream import PROFILE_COLUMNS  # noqa: E402
+
+
+SKILL_POOL = [
+    "python", "sql", "java", "javascript", "typescript", "react", "vue", "node.js", "go", "rust",
+    "c++", "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "spark", "kafka", "airflow",
+    "pandas", "pytorch", "tensorflow", "excel", "tableau", "power bi", "figma", "project management",
+    "agile", "scrum", "financial modeling", "accounting", "sales", "marketing", "seo", "copywriting",
+    "cantonese", "mandarin", "english", "negotiation",
+]
+ROLES = [
+    "software engineer", "data analyst", "data scientist", "product manager", "project manager",
+    "frontend developer", "backend developer", "devops engineer", "business analyst",
+    "marketing manager", "financial analyst", "ux designer", "sales manager", "accountant",
+]
+EDUCATION = ["PhD", "Master", "Bachelor", "Diploma", "High School"]
+SEEKER_EXPERIENCE = ["Recent Graduate", "1-3 years", "3-5 years", "5-10 years", "10+ years"]
+SEEKER_LOCATIONS = ["Hong Kong", "Mainland China", "Overseas", "No Preference"]
+COMPANIES = [f"Company {i}" for i in range(200)]
+
+
+def seeker_profiles(count, seed=42):
+    """生成 count 个求职者资料 (字段与 save_job_seeker_info 参数一致)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        role = rng.choice(ROLES)
+        skills = rng.sample(SKILL_POOL, rng.randint(3, 10))
+        yield {
+            "job_seeker_id": f"seed{seed}-{i:07d}",
+            "education_level": rng.choice(EDUCATION),
+            "major": rng.choice(["Computer Science", "Finance", "Marketing", "Statistics", "Design"]),
+            "graduation_status": rng.choice(["Graduated", "Fresh graduates", "Currently studying"]),
+            "university_background": rng.choice(["985 Universities", "Overseas Universities", "Other"]),
+            "languages": ", ".join(rng.sample(["English", "Cantonese", "Mandarin", "Japanese"], 2)),
+            "certificates": rng.choice(["", "AWS SAA", "CPA", "PMP", "CFA Level 1"]),
+            "hard_skills": ", ".join(skills),
+            "soft_skills": ", ".join(rng.sample(["communication", "leadership", "teamwork", "ownership"], 2)),
+            "work_experience": rng.choice(SEEKER_EXPERIENCE),
+            "project_experience": f"Delivered {rng.randint(1, 9)} projects as {role}",
+            "location_preference": rng.choice(SEEKER_LOCATIONS),
+            "industry_preference": rng.choice(["Technology", "Finance", "Consulting", "Retail"]),
+            "salary_expectation": f"{rng.randint(20, 90) * 1000} HKD",
+            "benefits_expectation": rng.choice(["Medical", "Hybrid work", "Bonus"]),
+            "primary_role": role,
+            "simple_search_terms": f"{role}, {skills[0]}",
+        }
+
+
+def job_postings(count, seed=42, today=None, active_ratio=0.8):
+    """生成 count 个职位 (字段与 save_head_hunter_job 的 job_data 一致), 约 active_ratio 仍在有效期内"""
+    rng = random.Random(seed + 1)
+    today = today or date.today()
+    for i in range(count):
+        role = rng.choice(ROLES)
+        min_salary = rng.randint(15, 80) * 1000
+        if rng.random() < active_ratio:
+            valid_until = today + timedelta(days=rng.randint(0, 90))
+        else:
+            valid_until = today - timedelta(days=rng.randint(1, 90))
+        yield {
+            "job_title": f"{rng.choice(['Senior ', 'Junior ', ''])}{role}".title(),
+            "job_description": f"Join {rng.choice(COMPANIES)} as a {role} working on product {i}.",
+            "main_responsibilities": "\n".join(f"- responsibility {n}" for n in range(rng.randint(2, 5))),
+            "required_skills": ", ".join(rng.sample(SKILL_POOL, rng.randint(2, 6))),
+            "client_company": rng.choice(COMPANIES),
+            "industry": rng.choice(INDUSTRIES),
+            "work_location": rng.choice(WORK_LOCATIONS),
+            "work_type": rng.choice(WORK_TYPES),
+            "company_size": rng.choice(COMPANY_SIZES),
+            "employment_type": rng.choice(EMPLOYMENT_TYPES),
+            "experience_level": rng.choice(EXPERIENCE_LEVELS),
+            "visa_support": rng.choice(VISA_OPTIONS),
+            "min_salary": min_salary,
+            "max_salary": min_salary + rng.randint(5, 40) * 1000,
+            "currency": rng.choice(CURRENCIES),
+            "benefits": rng.choice(["", "Medical insurance", "Stock options", "15 days annual leave"]),
+            "application_method": "Send CV to recruit@example.com",
+            "job_valid_until": valid_until.isoformat(),
+        }
+
+
+def raw_linkedin_jobs(count, seed=42, query=""):
+    """模拟 RapidAPI LinkedIn 搜索返回的原始职位"""
+    rng = random.Random(f"{seed}:{query}")
+    return [
+        {
+            "id": f"li-{rng.randint(0, count * 4)}",
+            "title": f"{rng.choice(ROLES)} ({query})".title(),
+            "organization": rng.choice(COMPANIES),
+            "locations_derived": [rng.choice(["Hong Kong", "Singapore", "London"])],
+            "date_posted": "2026-01-01",
+            "url": "https://www.linkedin.com/jobs/view/0",
+            "description_text": " ".join(rng.sample(SKILL_POOL, 8)),
+        }
+        for _ in range(count)
+    ]
+
+
+def _create_tables_like_database():
+    """database 模块不可用时按其表结构建表"""
+    with transaction(JOB_SEEKER_DB) as conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_seekers (id INTEGER PRIMARY KEY AUTOINCREMENT, job_seeker_id TEXT, "
+            "timestamp TEXT, " + ", ".join(f"{column} TEXT" for column in PROFILE_COLUMNS) + ")"
+        )
+    with transaction(HEAD_HUNTER_DB) as conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {HEAD_HUNTER_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, "
+            + ", ".join(
+                f"{column} INTEGER" if column in ("min_salary", "max_salary") else f"{column} TEXT"
+                for column in JOB_COLUMNS
+            ) + ")"
+        )
+
+
+def populate(seekers, jobs, seed=42):
+    """在当前目录建库 (与应用相同的建表与迁移) 并写入合成数据; 调用方负责切换到临时目录"""
+    try:
+        from database import init_database
+        from database import init_head_hunter_database
+        init_database()
+        init_head_hunter_database()
+    except ImportError:
+        _create_tables_like_database()
+
+    from migrations import run_migrations
+    run_migrations()
+
+    timestamp = "2026-01-01 00:00:00"
+    seeker_columns = ["job_seeker_id", "timestamp"] + PROFILE_COLUMNS
+    with transaction(JOB_SEEKER_DB) as conn:
+        conn.executemany(
+            f"INSERT INTO job_seekers ({', '.join(seeker_columns)}) VALUES ({', '.join('?' * len(seeker_columns))})",
+            ([p["job_seeker_id"], timestamp] + [p[c] for c in PROFILE_COLUMNS] for p in seeker_profiles(seekers, seed))
+        )
+
+    job_columns = ["timestamp"] + JOB_COLUMNS
+    with transaction(HEAD_HUNTER_DB) as conn:
+        conn.executemany(
+            f"INSERT INTO {HEAD_HUNTER_TABLE} ({', '.join(job_columns)}) VALUES ({', '.join('?' * len(job_columns))})",
+            ([timestamp] + [j[c] for c in JOB_COLUMNS] for j in job_postings(jobs, seed))
+        )
+
+
+def matching_job_row(job_id, job):
+    """get_all_jobs_for_matching() 的行布局"""
+    return (
+        job_id, job["job_title"], job["job_description"], job["main_responsibilities"], job["required_skills"],
+        job["client_company"], job["industry"], job["work_location"], job["work_type"], job["company_size"],
+        job["employment_type"], job["experience_level"], job["visa_support"], job["min_salary"],
+        job["max_salary"], job["currency"], job["benefits"], job["application_method"], job["job_valid_until"],
+    )
+
+
+def listing_seeker_row(profile):
+    """get_all_job_seekers() 的行布局"""
+    return (
+        profile["job_seeker_id"], profile["job_seeker_id"], profile["hard_skills"], profile["work_experience"],
+        profile["education_level"], profile["location_preference"], profile["industry_preference"],
+        profile["salary_expectation"], profile["languages"], profile["primary_role"],
+    )
@@ -0,0 +1,283 @@
+"""批量导入简历: 遍历目录或 zip 中的 CV, 并行限速调用简历分析, 分批写入 job_seekers
+
+用法:
+    python bulk_ingest.py CVS_DIR_OR_ZIP [--concurrency 4] [--rpm 60] [--batch-size 100] [--json report.json]
+
+分析器与页面上传相同 (backend.process_resume), 并共用同一个简历分析缓存, 两条路径得到的资料一致.
+已成功导入的文件 (按内容哈希) 记录在 resume_ingest_log 中, 中断后重新运行会跳过它们.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from datetime import datetime
+
+from cache import DiskCache
+from cache import resume_cache_key
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+from db_pool import run_script
+from db_pool import transaction
+from document_extract import extract_cv_text
+from document_extract import text_upload
+from resume_stream import PROFILE_COLUMNS
+from resume_stream import build_autofill_data
+
+
+logger = logging.getLogger(__name__)
+
+CV_EXTENSIONS = (".pdf", ".docx")
+ANALYZE_RETRIES = 3
+
+
+def create_ingest_schema(conn):
+    """迁移步骤: 批量导入的断点记录表"""
+    run_script(conn, '''
+        CREATE TABLE IF NOT EXISTS resume_ingest_log (
+            file_hash TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            job_seeker_id TEXT,
+            status TEXT NOT NULL,
+            error TEXT,
+            ingested_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+    ''')
+
+
+def iter_cv_sources(path):
+    """返回 (文件名, 读取函数) - 支持目录 (递归) 和 zip 压缩包"""
+    if zipfile.is_zipfile(path):
+        archive = zipfile.ZipFile(path)
+        lock = threading.Lock()
+
+        def reader(member):
+            def read():
+                with lock:
+                    return archive.read(member)
+            return read
+
+        for member in sorted(archive.namelist()):
+            if member.lower().endswith(CV_EXTENSIONS) and not member.endswith("/"):
+                yield member, reader(member)
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(CV_EXTENSIONS):
+                full_path = os.path.join(root, name)
+
+                def read(full_path=full_path):
+                    with open(full_path, "rb") as f:
+                        return f.read()
+
+                yield os.path.relpath(full_path, path), read
+
+
+class RateLimiter:
+    """线程安全的匀速限流器: 每分钟最多 rate 次调用"""
+
+    def __init__(self, rate_per_minute):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def ingested_hashes(db_path=JOB_SEEKER_DB):
+    """已成功导入的文件哈希"""
+    rows = get_connection(db_path).execute(
+        "SELECT file_hash FROM resume_ingest_log WHERE status = 'ok'"
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+class ResumeIngestor:
+    """分析单个CV, 结果由调用方分批写库"""
+
+    def __init__(self, limiter, backend, cache=None):
+        self.limiter = limiter
+        self.backend = backend
+        self.cache = cache
+
+    def analyze(self, name, data):
+        """与页面上传相同: 进程池中提取文本, 再交给 backend.process_resume, 返回 (resume_data, ai_analysis)"""
+        cv_text = extract_cv_text(data, name)
+        for attempt in range(ANALYZE_RETRIES):
+            self.limiter.acquire()
+            try:
+                return self.backend.process_resume(text_upload(cv_text, name), os.path.basename(name))
+            except Exception as e:
+                if attempt == ANALYZE_RETRIES - 1:
+                    raise
+                logger.warning("Resume analysis failed (%s), retrying", e)
+                time.sleep(2 ** attempt)
+
+    def process(self, name, data):
+        """返回 (profile, error) - profile 为 save_job_seeker_info 所需的字段"""
+        try:
+            # 与页面默认 (非流式) 分析相同的缓存键, 已在页面分析过的CV不再请求
+            cache_key = resume_cache_key(data)
+            cached = self.cache.get(cache_key) if self.cache else None
+            if cached:
+                ai_analysis = cached["ai_analysis"]
+            else:
+                resume_data, ai_analysis = self.analyze(name, data)
+                if self.cache:
+                    self.cache.set(cache_key, {
+                        "resume_data": resume_data,
+                        "ai_analysis": ai_analysis
+                    })
+            return build_autofill_data(ai_analysis), None
+        except Exception as e:
+            return None, str(e)
+
+
+def write_batch(batch, db_path=JOB_SEEKER_DB):
+    """在一个事务中写入求职者和断点记录; batch 为 (file_hash, name, profile, error) 列表"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    seekers = []
+    log_rows = []
+    for file_hash, name, profile, error in batch:
+        if profile is None:
+            log_rows.append((file_hash, name, None, "failed", error))
+            continue
+        job_seeker_id = str(uuid.uuid4())
+        seekers.append([job_seeker_id, timestamp] + [profile[column] for column in PROFILE_COLUMNS])
+        log_rows.append((file_hash, name, job_seeker_id, "ok", None))
+
+    columns = ["job_seeker_id", "timestamp"] + PROFILE_COLUMNS
+    with transaction(db_path) as conn:
+        if seekers:
+            conn.executemany(
+                f"INSERT INTO job_seekers ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                seekers
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO resume_ingest_log (file_hash, filename, job_seeker_id, status, error) "
+            "VALUES (?, ?, ?, ?, ?)",
+            log_rows
+        )
+    return len(seekers)
+
+
+def ingest(path, concurrency=4, rpm=60, batch_size=100, limit=None, progress=print):
+    """批量导入目录或 zip 中的简历, 返回统计信息"""
+    from backend import JobSeekerBackend
+
+    done = ingested_hashes()
+    ingestor = ResumeIngestor(
+        RateLimiter(rpm),
+        JobSeekerBackend(),
+        cache=DiskCache("resume_cache.db", ttl_seconds=30 * 24 * 3600, max_entries=2000)
+    )
+
+    stats = {"seen": 0, "skipped": 0, "ok": 0, "failed": 0, "errors": []}
+    start = time.perf_counter()
+    batch = []
+
+    def flush():
+        if batch:
+            stats["ok"] += write_batch(batch)
+            batch.clear()
+            elapsed = time.perf_counter() - start
+            processed = stats["ok"] + stats["failed"]
+            progress(f"{processed} processed ({stats['ok']} ok, {stats['failed']} failed, "
+                     f"{stats['skipped']} skipped) - {processed / elapsed * 60:.1f} CVs/min")
+
+    def collect(future):
+        file_hash, name, (profile, error) = future.result()
+        if profile is None:
+            stats["failed"] += 1
+            stats["errors"].append({"file": name, "error": error})
+        batch.append((file_hash, name, profile, error))
+        if len(batch) >= batch_size:
+            flush()
+
+    def run(name, data, file_hash):
+        return file_hash, name, ingestor.process(name, data)
+
+    # 限制在途任务数量, 避免整个目录的文件同时读入内存
+    pending = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ingest") as executor:
+        for name, read in iter_cv_sources(path):
+            if limit is not None and stats["seen"] >= limit:
+                break
+            stats["seen"] += 1
+            data = read()
+            file_hash = hashlib.sha256(data).hexdigest()
+            if file_hash in done:
+                stats["skipped"] += 1
+                continue
+            done.add(file_hash)  # 同一批次中的重复文件只处理一次
+
+            pending.add(executor.submit(run, name, data, file_hash))
+            if len(pending) >= concurrency * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    collect(future)
+
+        for future in pending:
+            collect(future)
+    flush()
+
+    elapsed = time.perf_counter() - start
+    processed = stats["ok"] + stats["failed"]
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["cvs_per_minute"] = round(processed / elapsed * 60, 1) if elapsed else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import CVs into Smart Career")
+    parser.add_argument("path", help="directory or .zip archive of PDF/DOCX CVs")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent GPT-4 analyses")
+    parser.add_argument("--rpm", type=float, default=60, help="max GPT-4 requests per minute")
+    parser.add_argument("--batch-size", type=int, default=100, help="rows per database transaction")
+    parser.add_argument("--limit", type=int, help="stop after this many files")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from database import init_database
+    from migrations import MIGRATIONS
+    from migrations import migrate
+    init_database()
+    # 只迁移求职者库 - 只导入简历的机器上可能还没有职位库
+    migrate(JOB_SEEKER_DB, MIGRATIONS[JOB_SEEKER_DB])
+
+    stats = ingest(args.path, concurrency=args.concurrency, rpm=args.rpm,
+                   batch_size=args.batch_size, limit=args.limit)
+
+    print(f"Imported {stats['ok']} CVs, {stats['failed']} failed, {stats['skipped']} already imported "
+          f"in {stats['elapsed_s']}s ({stats['cvs_per_minute']} CVs/min)")
+    for item in stats["errors"][:20]:
+        print(f"  FAILED {item['file']}: {item['error']}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+
+    return 1 if stats["failed"] and not stats["ok"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
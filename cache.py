@@ -0,0 +1,218 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from db_pool import get_connection
+from db_pool import transaction
+
+
+# 简历分析缓存键的组成部分 - 修改提示词或模型时提升版本号, 旧缓存自动失效
+RESUME_ANALYSIS_MODEL = "gpt-4"
+RESUME_PROMPT_VERSION = "v1"
+
+
+def resume_cache_key(file_bytes, model=RESUME_ANALYSIS_MODEL, prompt_version=RESUME_PROMPT_VERSION):
+    """根据简历内容哈希和提示词/模型版本生成缓存键"""
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    return f"resume:{model}:{prompt_version}:{digest}"
+
+
+class DiskCache:
+    """基于SQLite的磁盘缓存, 支持TTL过期、LRU淘汰和容量上限"""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=1000, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._init_table()
+
+    def _init_table(self):
+        with transaction(self.path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)")
+
+    def get(self, key):
+        """读取缓存, 未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock, transaction(self.path) as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            # 更新访问时间, 用于LRU淘汰
+            conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return json.loads(value)
+
+    def set(self, key, value):
+        """写入缓存并按条目数和总大小淘汰最久未访问的记录"""
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock, transaction(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        # 先清理过期条目
+        if self.ttl_seconds:
+            cur = conn.execute(
+                "DELETE FROM cache_entries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self.evictions += cur.rowcount
+
+        count, total_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+
+        # 超出上限时按访问时间从旧到新淘汰
+        while count > self.max_entries or total_size > self.max_bytes:
+            row = conn.execute(
+                "SELECT key, size FROM cache_entries ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (row[0],))
+            count -= 1
+            total_size -= row[1]
+            self.evictions += 1
+
+    def invalidate(self, key):
+        """删除单个缓存条目"""
+        with self._lock, transaction(self.path) as conn:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock, transaction(self.path) as conn:
+            conn.execute("DELETE FROM cache_entries")
+
+    def stats(self):
+        """返回命中/未命中计数和当前占用"""
+        count, total_size = get_connection(self.path).execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+        ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": count,
+            "bytes": total_size,
+        }
+
+
+class TTLCache:
+    """进程内共享的TTL缓存, 相同键的并发计算只会执行一次"""
+
+    def __init__(self, ttl_seconds=600, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < now:
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key):
+        """读取缓存, 未命中返回 None"""
+        with self._lock:
+            found, value = self._lookup(key, time.time())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """写入缓存, 超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """命中则直接返回; 否则由第一个请求者计算, 其余并发请求等待其结果"""
+        while True:
+            with self._lock:
+                found, value = self._lookup(key, time.time())
+                if found:
+                    self.hits += 1
+                    return value
+
+                event = self._inflight.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    break
+
+            # 其他会话正在计算同一个键, 等待后重新检查
+            event.wait()
+
+        try:
+            value = compute()
+            # 空结果通常意味着上游失败, 不缓存以便下次重试
+            if value:
+                self.set(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """返回命中/未命中计数"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._data),
+        }
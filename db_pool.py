@@ -0,0 +1,183 @@
+import sqlite3
+import threading
+import types
+import weakref
+from contextlib import contextmanager
+
+
+JOB_SEEKER_DB = "job_seeker.db"
+HEAD_HUNTER_DB = "head_hunter_jobs.db"
+HEAD_HUNTER_TABLE = "head_hunter_jobs"
+
+# 连接级参数: WAL 允许读写并发, NORMAL 同步在 WAL 下仍保证一致性
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+]
+
+# 等待写锁的时间 (秒), 与旧代码 sqlite3.connect(..., timeout=30) 一致
+BUSY_TIMEOUT_SECONDS = 30
+
+# sqlite3 模块内置的预编译语句缓存大小 (每个连接)
+STATEMENT_CACHE_SIZE = 256
+
+
+def _close_connections(connections):
+    for conn in connections.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    connections.clear()
+
+
+class _ThreadConnections:
+    """一个线程的连接表; 线程结束时 threading.local 释放它, 终结器随之关闭其中的连接"""
+
+    def __init__(self):
+        self.connections = {}
+
+
+class ConnectionManager:
+    """进程级连接管理 - 每个线程对每个数据库文件复用一个已调优的连接
+
+    Streamlit 每次 rerun 都在新线程上执行脚本, 因此连接随所属线程结束而关闭, 管理器只弱引用各线程的连接表.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = weakref.WeakSet()
+        self.opened = 0
+
+    def _thread_connections(self):
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ThreadConnections()
+            # 终结器可能在其他线程执行, 所以连接以 check_same_thread=False 打开 (每个连接仍只由所属线程使用)
+            weakref.finalize(holder, _close_connections, holder.connections).atexit = False
+            with self._lock:
+                self._threads.add(holder)
+        return holder.connections
+
+    def get(self, db_path):
+        """获取当前线程的连接, 首次使用时创建并应用 PRAGMA"""
+        connections = self._thread_connections()
+        conn = connections.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(
+                db_path, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False
+            )
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            connections[db_path] = conn
+            with self._lock:
+                self.opened += 1
+        return conn
+
+    def open_count(self):
+        """当前仍打开的连接数 (存活线程持有的连接)"""
+        with self._lock:
+            return sum(len(holder.connections) for holder in self._threads)
+
+    def close_all(self):
+        """关闭所有线程创建的连接 (进程退出或测试时使用)"""
+        with self._lock:
+            holders = list(self._threads)
+        for holder in holders:
+            _close_connections(holder.connections)
+        self._local = threading.local()
+
+
+connection_manager = ConnectionManager()
+
+
+def get_connection(db_path):
+    """获取当前线程的池化连接 - 调用方不应关闭它"""
+    return connection_manager.get(db_path)
+
+
+@contextmanager
+def transaction(db_path):
+    """在池化连接上执行一个事务, 异常时回滚"""
+    conn = get_connection(db_path)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def run_script(conn, script):
+    """逐条执行多语句SQL, 不像 executescript 那样提前提交当前事务"""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ""
+    if statement.strip():
+        conn.execute(statement)
+
+
+class PooledConnection:
+    """池化连接的代理, 供按调用打开 / 关闭连接的旧代码使用
+
+    close() 不关闭底层连接, 只回滚本句柄打开之后才开始且仍未提交的事务 - 外层调用方已开始的事务不受嵌套调用影响;
+    row_factory 只作用于本代理创建的游标, 不影响共享连接.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._outer_transaction = conn.in_transaction
+        self.row_factory = conn.row_factory
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def close(self):
+        if self._conn.in_transaction and not self._outer_transaction:
+            self._conn.rollback()
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def pooled_connect(database, *args, **kwargs):
+    """sqlite3.connect 的替代: 文件数据库返回当前线程的池化连接, 内存库或 URI 连接照常创建"""
+    if database == ":memory:" or kwargs.get("uri"):
+        return sqlite3.connect(database, *args, **kwargs)
+    return PooledConnection(get_connection(str(database)))
+
+
+def use_pooled_connections(module):
+    """让模块内的 sqlite3.connect 改用连接池 (JobSeekerDB / HeadhunterDB 与 database 中的辅助函数)"""
+    if getattr(module, "sqlite3", None) is not sqlite3:
+        return False
+    pooled_sqlite3 = types.ModuleType("sqlite3")
+    pooled_sqlite3.__dict__.update(vars(sqlite3))
+    pooled_sqlite3.connect = pooled_connect
+    module.sqlite3 = pooled_sqlite3
+    return True
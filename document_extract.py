@@ -0,0 +1,329 @@
+import io
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+
+from metrics import instrument
+
+
+logger = logging.getLogger(__name__)
+
+# 上传与解析限制 - 防止超大或损坏的简历长时间占用服务器
+MAX_UPLOAD_BYTES = int(os.environ.get("CV_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.environ.get("CV_MAX_PAGES", "30"))
+MAX_TEXT_CHARS = int(os.environ.get("CV_MAX_TEXT_CHARS", "200000"))
+EXTRACT_TIMEOUT = float(os.environ.get("CV_EXTRACT_TIMEOUT", "30"))
+EXTRACT_WORKERS = int(os.environ.get("CV_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 小于该大小的上传直接在内存中传给子进程, 更大的写入临时文件后由子进程 mmap 读取
+SPOOL_THRESHOLD = 1024 * 1024
+COPY_CHUNK_SIZE = 256 * 1024
+# XML 不允许的控制字符 (PDF 文本中常见的换页符等), 写入 DOCX 前去除
+_XML_INVALID_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+PAGES_PER_TASK = 4
+
+
+class ExtractionError(ValueError):
+    """简历文件无法在限制内解析"""
+
+
+# ---------- 子进程中执行的函数 ----------
+
+def _open_source(source):
+    """source 为 bytes 或临时文件路径; 文件以只读 mmap 打开, 不整体读入内存"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source), None
+    f = open(source, "rb")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), f
+
+
+def _close_source(stream, f):
+    stream.close()
+    if f is not None:
+        f.close()
+
+
+def _pdf_page_count(source):
+    from pypdf import PdfReader
+
+    stream, f = _open_source(source)
+    try:
+        return len(PdfReader(stream).pages)
+    finally:
+        _close_source(stream, f)
+
+
+def _pdf_pages_text(source, start, stop):
+    from pypdf import PdfReader
+
+    stream, f = _open_source(source)
+    try:
+        reader = PdfReader(stream)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    finally:
+        _close_source(stream, f)
+
+
+def _docx_text(source):
+    from docx import Document
+
+    stream, f = _open_source(source)
+    try:
+        document = Document(stream)
+        return "\n".join(paragraph.text for paragraph in document.paragraphs)
+    finally:
+        _close_source(stream, f)
+
+
+def _worker_main(conn):
+    """解析进程主循环: 逐个接收 (函数, 参数), 返回 ("ok", 结果) 或 ("error", 信息)"""
+    while True:
+        try:
+            fn, args = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            conn.send(("ok", fn(*args)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+# ---------- 进程池 ----------
+
+class _Worker:
+    """一个常驻解析进程及其管道"""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(1)
+        self.conn.close()
+
+
+class ExtractionTask:
+    """已提交给某个解析进程的任务"""
+
+    def __init__(self, pool, worker):
+        self._pool = pool
+        self._worker = worker
+
+    def get(self, timeout):
+        """等待结果; 超时或进程崩溃时只终止这一个进程, 其他会话的任务不受影响"""
+        worker, self._worker = self._worker, None
+        try:
+            if not worker.conn.poll(max(timeout, 0)):
+                self._pool.discard(worker)
+                raise multiprocessing.TimeoutError()
+            status, value = worker.conn.recv()
+        except multiprocessing.TimeoutError:
+            raise
+        except Exception as e:
+            # 进程崩溃 (EOFError) 或结果无法读取
+            self._pool.discard(worker)
+            raise ExtractionError(f"Extraction worker failed: {e}")
+        self._pool.release(worker)
+        if status == "error":
+            raise ExtractionError(value)
+        return value
+
+    def cancel(self):
+        """放弃尚未取回结果的任务 (进程可能仍在解析, 直接终止)"""
+        if self._worker is not None:
+            self._pool.discard(self._worker)
+            self._worker = None
+
+
+class ExtractionPool:
+    """进程级解析进程池 - 进程常驻复用, 每个任务独占一个进程, 超时只终止该进程并在下次使用时补充"""
+
+    def __init__(self, workers=EXTRACT_WORKERS):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers)
+        self._idle = []
+        self._lock = threading.Lock()
+        # spawn: 不复制 Streamlit 进程中的线程与连接
+        self._context = multiprocessing.get_context("spawn")
+
+    def submit(self, fn, args, block=True, timeout=None):
+        """取一个空闲进程执行任务; 非阻塞且没有空闲进程时返回 None, 等待超时抛出 TimeoutError"""
+        if not self._slots.acquire(block, timeout):
+            if block:
+                raise multiprocessing.TimeoutError()
+            return None
+        with self._lock:
+            while self._idle and not self._idle[-1].process.is_alive():
+                self._idle.pop().kill()
+            worker = self._idle.pop() if self._idle else None
+        try:
+            if worker is None:
+                worker = _Worker(self._context)
+            worker.conn.send((fn, args))
+        except Exception:
+            if worker is not None:
+                worker.kill()
+            self._slots.release()
+            raise
+        return ExtractionTask(self, worker)
+
+    def release(self, worker):
+        with self._lock:
+            self._idle.append(worker)
+        self._slots.release()
+
+    def discard(self, worker):
+        worker.kill()
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+extraction_pool = ExtractionPool()
+
+
+def _wait(task, deadline, timeout, filename):
+    try:
+        return task.get(deadline - time.monotonic())
+    except multiprocessing.TimeoutError:
+        raise ExtractionError(f"Timed out after {timeout:.0f}s while reading {filename}")
+    except ExtractionError as e:
+        raise ExtractionError(f"Could not read {filename}: {e}")
+
+
+def _submit(fn, args, deadline, timeout, filename, block=True):
+    try:
+        return extraction_pool.submit(fn, args, block=block, timeout=max(deadline - time.monotonic(), 0))
+    except multiprocessing.TimeoutError:
+        raise ExtractionError(f"Timed out after {timeout:.0f}s waiting to read {filename}")
+
+
+# ---------- 上传暂存 ----------
+
+def spool_upload(upload, max_bytes=MAX_UPLOAD_BYTES):
+    """分块读取上传文件; 小文件返回 bytes, 大文件写入临时文件并返回路径 (调用方负责删除)"""
+    if isinstance(upload, (bytes, bytearray)):
+        if len(upload) > max_bytes:
+            raise ExtractionError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+        return bytes(upload)
+
+    size = getattr(upload, "size", None)
+    if size is not None and size > max_bytes:
+        raise ExtractionError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+
+    upload.seek(0)
+    head = upload.read(SPOOL_THRESHOLD + 1)
+    if len(head) <= SPOOL_THRESHOLD:
+        return head
+
+    fd, path = tempfile.mkstemp(prefix="cv_", suffix=".upload")
+    total = len(head)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(head)
+            while True:
+                chunk = upload.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ExtractionError(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+                f.write(chunk)
+    except Exception:
+        os.unlink(path)
+        raise
+    return path
+
+
+# ---------- 对外接口 ----------
+
+def iter_cv_pages(upload, filename, max_pages=MAX_PAGES, timeout=EXTRACT_TIMEOUT):
+    """逐页返回简历文本 - 解析在进程池中进行, 前面的页面解析完即可返回"""
+    source = spool_upload(upload)
+    deadline = time.monotonic() + timeout
+    pending = deque()
+    try:
+        if filename.lower().endswith(".pdf"):
+            task = _submit(_pdf_page_count, (source,), deadline, timeout, filename)
+            page_count = _wait(task, deadline, timeout, filename)
+            if page_count > max_pages:
+                logger.info("%s has %s pages, reading the first %s", filename, page_count, max_pages)
+                page_count = max_pages
+
+            # 按页分块并行解析, 按顺序返回. 已有任务在途时只使用空闲进程而不等待,
+            # 避免多个会话各占一部分进程、互相等待对方释放
+            starts = deque(range(0, page_count, PAGES_PER_TASK))
+            while starts or pending:
+                while starts:
+                    start = starts[0]
+                    task = _submit(_pdf_pages_text, (source, start, min(start + PAGES_PER_TASK, page_count)),
+                                   deadline, timeout, filename, block=not pending)
+                    if task is None:
+                        break
+                    pending.append(task)
+                    starts.popleft()
+                for text in _wait(pending.popleft(), deadline, timeout, filename):
+                    yield text
+
+        elif filename.lower().endswith(".docx"):
+            task = _submit(_docx_text, (source,), deadline, timeout, filename)
+            yield _wait(task, deadline, timeout, filename)
+
+        else:
+            raise ExtractionError(f"Unsupported file type: {filename}")
+    finally:
+        for task in pending:
+            task.cancel()
+        if isinstance(source, str):
+            os.unlink(source)
+
+
+@instrument("resume.extract_text")
+def extract_cv_text(upload, filename, max_chars=MAX_TEXT_CHARS):
+    """提取简历全文, 超过 max_chars 的部分被截断"""
+    parts = []
+    total = 0
+    pages = iter_cv_pages(upload, filename)
+    try:
+        for text in pages:
+            parts.append(text)
+            total += len(text)
+            if total >= max_chars:
+                break
+    finally:
+        pages.close()
+
+    text = "\n".join(parts)[:max_chars]
+    if not text.strip():
+        raise ExtractionError(f"No text could be extracted from {filename}")
+    return text
+
+
+def text_upload(text, filename):
+    """把已提取的文本封装为只含段落的 DOCX 上传 (BytesIO, 带 name), 供只接受 PDF/DOCX 的 backend.process_resume 使用
+
+    原始文件已在进程池中按大小、页数和超时限制解析完毕, backend 只需读取这份纯文本文档.
+    """
+    from docx import Document
+
+    document = Document()
+    for line in _XML_INVALID_CHARS.sub("", text).splitlines():
+        document.add_paragraph(line)
+    upload = io.BytesIO()
+    document.save(upload)
+    upload.seek(0)
+    upload.name = os.path.splitext(os.path.basename(filename))[0] + ".docx"
+    return upload
@@ -0,0 +1,99 @@
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import get_connection
+from db_pool import run_script
+from metrics import instrument
+
+
+FTS_TABLE = "head_hunter_jobs_fts"
+
+# trigram 分词器要求查询至少3个字符, 更短的查询退回 LIKE
+MIN_FTS_QUERY_LENGTH = 3
+
+
+def create_search_schema(conn):
+    """创建全文索引(标题/公司/描述)、行业索引及同步触发器 (迁移步骤)"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone()
+
+    # trigram 分词支持中文子串搜索, 与原来的 `in` 判断语义一致
+    run_script(conn, f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            job_title, client_company, job_description,
+            content='{HEAD_HUNTER_TABLE}', content_rowid='id',
+            tokenize='trigram'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_fts_insert AFTER INSERT ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, job_title, client_company, job_description)
+            VALUES (NEW.id, NEW.job_title, NEW.client_company, NEW.job_description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_fts_delete AFTER DELETE ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, job_title, client_company, job_description)
+            VALUES ('delete', OLD.id, OLD.job_title, OLD.client_company, OLD.job_description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_jobs_fts_update AFTER UPDATE ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, job_title, client_company, job_description)
+            VALUES ('delete', OLD.id, OLD.job_title, OLD.client_company, OLD.job_description);
+            INSERT INTO {FTS_TABLE} (rowid, job_title, client_company, job_description)
+            VALUES (NEW.id, NEW.job_title, NEW.client_company, NEW.job_description);
+        END;
+
+        CREATE INDEX IF NOT EXISTS idx_head_hunter_jobs_industry ON {HEAD_HUNTER_TABLE}(industry, id);
+    ''')
+
+    # 首次创建时为已有职位建立索引
+    if not exists:
+        conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _filters(search_term, industry):
+    clauses = []
+    params = []
+
+    term = (search_term or "").strip()
+    if term:
+        if len(term) >= MIN_FTS_QUERY_LENGTH:
+            clauses.append(f"j.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)")
+            # 作为短语查询, 避免用户输入被解析为FTS语法
+            params.append('"' + term.replace('"', '""') + '"')
+        else:
+            clauses.append("(j.job_title LIKE ? OR j.client_company LIKE ? OR j.job_description LIKE ?)")
+            params.extend([f"%{term}%"] * 3)
+
+    if industry:
+        clauses.append("j.industry = ?")
+        params.append(industry)
+
+    return clauses, params
+
+
+@instrument("sqlite.query_head_hunter_jobs")
+def query_head_hunter_jobs(search_term="", industry=None, before_id=None, page_size=20, db_path=HEAD_HUNTER_DB):
+    """按关键词和行业筛选职位, 按ID倒序做键集分页 (before_id 为上一页最后一条的ID)"""
+    clauses, params = _filters(search_term, industry)
+    if before_id is not None:
+        clauses.append("j.id < ?")
+        params.append(before_id)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return get_connection(db_path).execute(
+        f"SELECT j.* FROM {HEAD_HUNTER_TABLE} j {where} ORDER BY j.id DESC LIMIT ?",
+        params + [page_size]
+    ).fetchall()
+
+
+@instrument("sqlite.count_head_hunter_jobs")
+def count_head_hunter_jobs(search_term="", industry=None, db_path=HEAD_HUNTER_DB):
+    """统计符合条件的职位数"""
+    clauses, params = _filters(search_term, industry)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return get_connection(db_path).execute(
+        f"SELECT COUNT(*) FROM {HEAD_HUNTER_TABLE} j {where}", params
+    ).fetchone()[0]
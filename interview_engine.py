@@ -0,0 +1,340 @@
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import get_llm_cache
+from llm_cache import llm_cache_key
+from metrics import instrument
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+INTERVIEW_MODEL = os.environ.get("INTERVIEW_MODEL", "gpt-4")
+TOTAL_QUESTIONS = 10
+# 每道题的类型, 依次循环
+QUESTION_PLAN = ["技术", "行为", "情景", "技术", "项目经验", "行为", "技术", "情景", "职业规划", "综合"]
+QUESTION_TIMEOUT = float(os.environ.get("INTERVIEW_QUESTION_TIMEOUT", "60"))
+# 进程内保留的进行中面试数; 超出后最久未使用的被丢弃, 需要时从会话存储恢复
+MAX_LIVE_ENGINES = int(os.environ.get("INTERVIEW_MAX_LIVE", "200"))
+# 评估流被中断 (rerun、网络错误) 时记录的占位, 保证回答与评估一一对应
+EVALUATION_INTERRUPTED = "(evaluation interrupted)"
+
+# 所有面试会话共享的后台线程 - 预生成题目, 不占用页面线程
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("INTERVIEW_WORKERS", "8")), thread_name_prefix="interview"
+)
+
+
+def describe_job(job):
+    """职位行 (与 get_all_jobs_for_matching 布局相同) 或字典 -> 提示词文本"""
+    if isinstance(job, dict):
+        return "\n".join(f"{key}: {value}" for key, value in job.items() if value)
+    fields = [("Title", 1), ("Company", 5), ("Description", 2), ("Responsibilities", 3),
+              ("Required skills", 4), ("Experience", 11)]
+    return "\n".join(f"{name}: {job[index]}" for name, index in fields if len(job) > index and job[index])
+
+
+def describe_profile(profile):
+    if not profile:
+        return "No profile provided."
+    if isinstance(profile, dict):
+        return "\n".join(f"{key}: {value}" for key, value in profile.items() if value)
+    return ", ".join(str(value) for value in profile if value)
+
+
+def _history_text(questions, answers):
+    return "\n".join(
+        f"Q{i + 1}: {question}\nA{i + 1}: {answer}"
+        for i, (question, answer) in enumerate(zip(questions, answers))
+    ) or "(none yet)"
+
+
+def question_messages(job_text, profile_text, questions, answers, index, total):
+    """第 index 题的提示词; 已有回答时要求结合最近的回答追问"""
+    kind = QUESTION_PLAN[index % len(QUESTION_PLAN)]
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an experienced interviewer running a mock interview. "
+                "Reply with the next question only, in the candidate's language, no numbering or preamble."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Job:\n{job_text}\n\nCandidate:\n{profile_text}\n\n"
+                f"Interview so far:\n{_history_text(questions, answers)}\n\n"
+                f"Ask question {index + 1} of {total}. Type: {kind}. "
+                "Do not repeat earlier topics; build on the most recent answer where it makes sense."
+            ),
+        },
+    ]
+
+
+def evaluation_messages(job_text, question, answer):
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You evaluate mock interview answers. Start with a line 'Score: N/10', "
+                "then give two or three short sentences of specific feedback and one improvement tip."
+            ),
+        },
+        {"role": "user", "content": f"Job:\n{job_text}\n\nQuestion: {question}\n\nAnswer: {answer or '(no answer)'}"},
+    ]
+
+
+def summary_messages(job_text, questions, answers, evaluations):
+    transcript = "\n\n".join(
+        f"Q{i + 1}: {q}\nA{i + 1}: {a}\nEvaluation: {e}"
+        for i, (q, a, e) in enumerate(zip(questions, answers, evaluations))
+    )
+    return [
+        {
+            "role": "system",
+            "content": "Summarize the mock interview: overall score out of 100, strengths, gaps and next steps.",
+        },
+        {"role": "user", "content": f"Job:\n{job_text}\n\n{transcript}"},
+    ]
+
+
+def parse_score(evaluation):
+    """从评估文本中取 'Score: N/10'"""
+    match = re.search(r"(\d+(?:\.\d+)?)\s*/\s*10", evaluation or "")
+    return float(match.group(1)) if match else None
+
+
+class InterviewEngine:
+    """流水线式模拟面试
+
+    候选人作答第 i 题时, 后台已在生成第 i+1 题 (基于第 i-1 题之前的回答); 提交后, 评估在页面线程
+    流式输出, 同时后台用最新回答生成再下一题. 每题的等待只剩一次评估调用.
+    """
+
+    def __init__(self, job, profile, total_questions=TOTAL_QUESTIONS, model=INTERVIEW_MODEL, client=None):
+        self.job_text = describe_job(job)
+        self.profile_text = describe_profile(profile)
+        self.total_questions = total_questions
+        self.model = model
+        self._client = client
+        self._lock = threading.Lock()
+
+        self.questions = []
+        self.answers = []
+        self.evaluations = []
+        self._pending = {}
+
+    @classmethod
+    def restore(cls, job, profile, questions, answers, evaluations, total_questions=TOTAL_QUESTIONS, **kwargs):
+        """从已保存的面试记录恢复 (服务重启或被移出进程内缓存后), 并继续预生成下一题"""
+        engine = cls(job, profile, total_questions=total_questions, **kwargs)
+        engine.questions = list(questions)
+        engine.answers = list(answers)
+        engine.evaluations = list(evaluations)
+        if engine.questions and not engine.finished:
+            engine._prefetch(len(engine.questions))
+        return engine
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        return self._client
+
+    # ---------- 模型调用 ----------
+
+    # 与 backend 的生成函数共用 LLM 缓存; 提示词完整包含在 messages 中, 相同职位、背景和问答历史直接命中
+
+    def _cache_key(self, messages, stage):
+        return llm_cache_key(stage, self.model, "chat", messages)
+
+    def _cache_set(self, key, text):
+        if not text:
+            return
+        try:
+            get_llm_cache().set(key, {"value": text})
+        except Exception as e:
+            logger.warning("Could not cache interview response: %s", e)
+
+    def _complete(self, messages, stage):
+        key = self._cache_key(messages, stage)
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            return cached["value"]
+        with metrics.timed(stage):
+            response = self.client.chat.completions.create(model=self.model, messages=messages, temperature=0.7)
+        text = (response.choices[0].message.content or "").strip()
+        self._cache_set(key, text)
+        return text
+
+    def _stream(self, messages, stage):
+        key = self._cache_key(messages, stage)
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            yield cached["value"]
+            return
+        parts = []
+        with metrics.timed(stage):
+            stream = self.client.chat.completions.create(
+                model=self.model, messages=messages, temperature=0.3,
+                stream=True, stream_options={"include_usage": True}
+            )
+            for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    metrics.record_tokens(self.model, chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+        # 只缓存完整输出
+        self._cache_set(key, "".join(parts))
+
+    def _generate_question(self, index, questions, answers):
+        messages = question_messages(self.job_text, self.profile_text, questions, answers, index, self.total_questions)
+        return self._complete(messages, "interview.generate_question")
+
+    # ---------- 预生成 ----------
+
+    def _prefetch(self, index):
+        """在后台生成第 index 题; 只使用此刻已有的问答, 不等待尚未提交的回答"""
+        with self._lock:
+            if index >= self.total_questions or index in self._pending or index < len(self.questions):
+                return
+            future = _executor.submit(self._generate_question, index, list(self.questions), list(self.answers))
+            self._pending[index] = future
+        future.add_done_callback(lambda done: self._question_ready(index, done))
+
+    def _question_ready(self, index, future):
+        """题目生成完成: 加入题目列表; 上一题已作答时立即开始生成再下一题 (包含最新回答)"""
+        try:
+            question = future.result()
+        except Exception as e:
+            logger.warning("Prefetching question %s failed: %s", index + 1, e)
+            with self._lock:
+                self._pending.pop(index, None)
+            return
+        self._append(index, question)
+
+    def _append(self, index, question):
+        with self._lock:
+            self._pending.pop(index, None)
+            if len(self.questions) == index:
+                self.questions.append(question)
+            answered = len(self.answers) >= index
+        if answered:
+            self._prefetch(index + 1)
+
+    # ---------- 面试流程 ----------
+
+    @property
+    def current_index(self):
+        return len(self.answers)
+
+    @property
+    def finished(self):
+        return len(self.answers) >= self.total_questions
+
+    @property
+    def current_question(self):
+        """当前待回答的题目; 面试结束或题目仍在生成时为 None"""
+        if self.finished or len(self.questions) <= self.current_index:
+            return None
+        return self.questions[self.current_index]
+
+    @instrument("interview.start")
+    def start(self):
+        """生成第一题, 并立即在后台预生成第二题"""
+        self._append(0, self._generate_question(0, [], []))
+        return self.questions[0]
+
+    def submit_answer(self, answer):
+        """记录回答并返回评估的文本流; 评估流式输出期间, 后台用本回答生成再下一题"""
+        index = self.current_index
+        question = self.questions[index]
+        with self._lock:
+            # 回答与评估占位同时记录, 评估流未读完也不会错位
+            self.answers.append(answer)
+            self.evaluations.append(EVALUATION_INTERRUPTED)
+            next_ready = len(self.questions) > index + 1
+        if next_ready:
+            self._prefetch(index + 2)
+        else:
+            # 下一题仍在生成 (或预生成失败), 完成后由回调继续
+            self._prefetch(index + 1)
+        return self._evaluate(index, question, answer)
+
+    def _evaluate(self, index, question, answer):
+        parts = []
+        completed = False
+        try:
+            for text in self._stream(evaluation_messages(self.job_text, question, answer), "interview.evaluate"):
+                parts.append(text)
+                yield text
+            completed = True
+        finally:
+            if parts:
+                evaluation = "".join(parts) if completed else f"{''.join(parts)}\n\n{EVALUATION_INTERRUPTED}"
+                with self._lock:
+                    self.evaluations[index] = evaluation
+
+    def wait_for_next_question(self, timeout=QUESTION_TIMEOUT):
+        """页面显示下一题前调用; 通常题目已在作答和评估期间准备好"""
+        index = self.current_index
+        if self.finished or len(self.questions) > index:
+            metrics.increment("interview.prefetch_ready")
+            return self.current_question
+
+        metrics.increment("interview.prefetch_waited")
+        with metrics.timed("interview.wait_next_question"):
+            with self._lock:
+                future = self._pending.get(index)
+            try:
+                if future is None:
+                    raise RuntimeError("no prefetch in flight")
+                question = future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning("Generating question %s in the foreground: %s", index + 1, e)
+                with self._lock:
+                    questions, answers = list(self.questions), list(self.answers)
+                question = self._generate_question(index, questions, answers)
+        self._append(index, question)
+        return self.current_question
+
+    def stream_summary(self):
+        return self._stream(
+            summary_messages(self.job_text, self.questions, self.answers, self.evaluations), "interview.summary"
+        )
+
+    def scores(self):
+        return [parse_score(evaluation) for evaluation in self.evaluations]
+
+
+_live_engines = OrderedDict()
+_live_lock = threading.Lock()
+
+
+def get_live_engine(key):
+    """进程内正在进行的面试 (含预生成中的题目), 不在 st.session_state 中保存"""
+    with _live_lock:
+        engine = _live_engines.get(key)
+        if engine is not None:
+            _live_engines.move_to_end(key)
+        return engine
+
+
+def keep_live_engine(key, engine):
+    with _live_lock:
+        _live_engines[key] = engine
+        _live_engines.move_to_end(key)
+        while len(_live_engines) > MAX_LIVE_ENGINES:
+            _live_engines.popitem(last=False)
+
+
+def drop_live_engine(key):
+    with _live_lock:
+        _live_engines.pop(key, None)
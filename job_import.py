@@ -0,0 +1,251 @@
+"""批量导入职位: 流式读取 CSV / JSONL, 按发布表单的规则校验, 分批事务写入 head_hunter_jobs
+
+用法:
+    python job_import.py jobs.csv [--format csv|jsonl] [--batch-size 5000] [--json report.json]
+
+列名与 save_head_hunter_job 的 job_data 键相同; 无效行和写入失败的行会被跳过并报告, 不中断导入.
+"""
+import argparse
+import csv
+import io
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from datetime import timedelta
+
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import transaction
+
+
+# 发布表单中的选项 (表单与批量导入共用)
+EMPLOYMENT_TYPES = ["全职", "兼职", "合同", "实习"]
+INDUSTRIES = ["科技", "金融", "咨询", "医疗", "教育", "制造", "零售", "其他"]
+WORK_LOCATIONS = ["香港", "内地", "海外", "远程"]
+COMPANY_SIZES = ["初创公司(1-50)", "中小型企业(51-200)", "大型企业(201-1000)", "跨国公司(1000+)"]
+WORK_TYPES = ["远程", "混合", "办公室"]
+EXPERIENCE_LEVELS = ["应届", "1-3年", "3-5年", "5-10年", "10年以上"]
+VISA_OPTIONS = ["不提供", "工作签证", "协助办理", "需自有签证"]
+CURRENCIES = ["HKD", "USD", "CNY", "EUR", "GBP"]
+
+REQUIRED_TEXT_FIELDS = [
+    "job_title", "job_description", "main_responsibilities", "required_skills",
+    "client_company", "application_method",
+]
+
+SELECT_FIELDS = {
+    "employment_type": EMPLOYMENT_TYPES,
+    "industry": INDUSTRIES,
+    "work_location": WORK_LOCATIONS,
+    "company_size": COMPANY_SIZES,
+    "work_type": WORK_TYPES,
+    "experience_level": EXPERIENCE_LEVELS,
+}
+
+# head_hunter_jobs 中除 id / timestamp 外的列, 顺序与 job_data 相同
+JOB_COLUMNS = [
+    "job_title", "job_description", "main_responsibilities", "required_skills",
+    "client_company", "industry", "work_location", "work_type", "company_size",
+    "employment_type", "experience_level", "visa_support", "min_salary", "max_salary",
+    "currency", "benefits", "application_method", "job_valid_until",
+]
+
+DEFAULT_VALID_DAYS = 30
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def _salary(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return int(float(_text(value).replace(",", "")))
+
+
+def validate_job(record, today=None):
+    """按发布表单的规则校验一条职位, 返回 (job_data, errors)"""
+    errors = []
+    job_data = {}
+
+    for field in REQUIRED_TEXT_FIELDS:
+        job_data[field] = _text(record.get(field))
+        if not job_data[field]:
+            errors.append(f"{field}: 必填")
+
+    for field, options in SELECT_FIELDS.items():
+        job_data[field] = _text(record.get(field))
+        if job_data[field] not in options:
+            errors.append(f"{field}: 必须是 {' / '.join(options)} 之一")
+
+    job_data["visa_support"] = _text(record.get("visa_support")) or VISA_OPTIONS[0]
+    if job_data["visa_support"] not in VISA_OPTIONS:
+        errors.append(f"visa_support: 必须是 {' / '.join(VISA_OPTIONS)} 之一")
+
+    job_data["currency"] = (_text(record.get("currency")) or CURRENCIES[0]).upper()
+    if job_data["currency"] not in CURRENCIES:
+        errors.append(f"currency: 必须是 {' / '.join(CURRENCIES)} 之一")
+
+    salaries_valid = True
+    for field in ("min_salary", "max_salary"):
+        try:
+            job_data[field] = _salary(record.get(field))
+            if job_data[field] <= 0:
+                raise ValueError()
+        except (TypeError, ValueError):
+            errors.append(f"{field}: 必须是正整数")
+            salaries_valid = False
+    if salaries_valid and job_data["min_salary"] >= job_data["max_salary"]:
+        errors.append("最高薪资必须大于最低薪资")
+
+    job_data["benefits"] = _text(record.get("benefits"))
+
+    today = today or datetime.now().date()
+    valid_until = _text(record.get("job_valid_until"))
+    if not valid_until:
+        job_data["job_valid_until"] = (today + timedelta(days=DEFAULT_VALID_DAYS)).strftime("%Y-%m-%d")
+    else:
+        try:
+            job_data["job_valid_until"] = datetime.strptime(valid_until, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            errors.append("job_valid_until: 日期格式应为 YYYY-MM-DD")
+
+    return job_data, errors
+
+
+def iter_records(stream, fmt):
+    """逐行读取文本流, 返回 (行号, 记录) - 解析失败的行返回 (行号, 异常)"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("each line must be a JSON object")
+        except ValueError as e:
+            yield line_number, e
+            continue
+        yield line_number, record
+
+
+def detect_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+INSERT_JOB = (
+    f"INSERT INTO {HEAD_HUNTER_TABLE} ({', '.join(['timestamp'] + JOB_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(JOB_COLUMNS) + 1))})"
+)
+
+
+def _insert_batch(batch, db_path, report):
+    """写入一批 (行号, 行) - 数据库错误记入 report["errors"], 不中断导入
+
+    约束错误时逐行重试, 只跳过违反约束的行; 其他错误 (例如数据库被锁) 时整批记为失败.
+    """
+    try:
+        with transaction(db_path) as conn:
+            conn.executemany(INSERT_JOB, [row for _, row in batch])
+        report["imported"] += len(batch)
+        return
+    except sqlite3.IntegrityError:
+        pass
+    except sqlite3.Error as e:
+        report["errors"].extend({"line": line_number, "errors": [f"写入失败: {e}"]} for line_number, _ in batch)
+        return
+
+    for line_number, row in batch:
+        try:
+            with transaction(db_path) as conn:
+                conn.execute(INSERT_JOB, row)
+            report["imported"] += 1
+        except sqlite3.Error as e:
+            report["errors"].append({"line": line_number, "errors": [f"写入失败: {e}"]})
+
+
+def import_jobs(stream, fmt, batch_size=DEFAULT_BATCH_SIZE, db_path=HEAD_HUNTER_DB, progress=None):
+    """流式导入职位, 返回 {'total', 'imported', 'errors': [{'line', 'errors'}], 'elapsed_s'}"""
+    start = time.perf_counter()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    today = datetime.now().date()
+
+    report = {"total": 0, "imported": 0, "errors": []}
+    batch = []
+    for line_number, record in iter_records(stream, fmt):
+        report["total"] += 1
+        if isinstance(record, Exception):
+            report["errors"].append({"line": line_number, "errors": [f"无法解析: {record}"]})
+            continue
+
+        job_data, errors = validate_job(record, today)
+        if errors:
+            report["errors"].append({"line": line_number, "errors": errors})
+            continue
+
+        batch.append((line_number, [timestamp] + [job_data[column] for column in JOB_COLUMNS]))
+        if len(batch) >= batch_size:
+            _insert_batch(batch, db_path, report)
+            batch = []
+            if progress:
+                progress(report)
+
+    if batch:
+        _insert_batch(batch, db_path, report)
+
+    report["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def import_upload(upload, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """导入 st.file_uploader 上传的文件"""
+    stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+    try:
+        return import_jobs(stream, detect_format(upload.name), batch_size=batch_size, progress=progress)
+    finally:
+        stream.detach()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import job postings into Smart Career")
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    from database import init_head_hunter_database
+    from migrations import MIGRATIONS
+    from migrations import migrate
+    init_head_hunter_database()
+    # 只迁移职位库 - 只发布职位的机器上可能还没有求职者库
+    migrate(HEAD_HUNTER_DB, MIGRATIONS[HEAD_HUNTER_DB])
+
+    with open(args.path, "r", encoding="utf-8-sig", newline="") as f:
+        report = import_jobs(
+            f, args.format or detect_format(args.path), batch_size=args.batch_size,
+            progress=lambda r: print(f"  {r['imported']} imported, {len(r['errors'])} rejected")
+        )
+
+    print(f"Imported {report['imported']} of {report['total']} rows in {report['elapsed_s']}s, "
+          f"{len(report['errors'])} rejected")
+    for item in report["errors"][:20]:
+        print(f"  line {item['line']}: {'; '.join(item['errors'])}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return 1 if report["errors"] and not report["imported"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
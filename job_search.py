@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+
+from cache import TTLCache
+from metrics import metrics
+
+
+# 搜索结果缓存时间(秒), 可通过环境变量调整
+JOB_SEARCH_CACHE_TTL = int(os.environ.get("JOB_SEARCH_CACHE_TTL", "900"))
+
+# 进程级共享缓存 - 所有会话复用同一份上游搜索结果
+search_cache = TTLCache(ttl_seconds=JOB_SEARCH_CACHE_TTL, max_entries=512)
+metrics.register_cache("job_search", search_cache.stats)
+
+
+def build_search_keywords(primary_role, simple_search_terms, hard_skills):
+    """把求职者的角色、搜索词和技能拼接为搜索关键词"""
+    search_keywords = ", ".join(
+        field for field in [primary_role, simple_search_terms, hard_skills]
+        if field and field.strip()
+    )
+    return search_keywords or "General"
+
+
+def normalize_search_key(keywords, location, limit, employment_types=None):
+    """规范化搜索参数, 使大小写、空格和顺序不同的相同查询命中同一缓存"""
+    terms = sorted({term.strip().lower() for term in (keywords or "").split(",") if term.strip()})
+    types = sorted({t.strip().upper() for t in (employment_types or []) if t.strip()})
+    return (
+        ",".join(terms),
+        (location or "").strip().lower(),
+        int(limit),
+        ",".join(types),
+    )
+
+
+def profile_fingerprint(*profile_parts):
+    """对求职者资料做规范化哈希, 匹配结果依赖资料内容"""
+    payload = json.dumps(profile_parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def search_jobs_cached(searcher, keywords, location, limit, employment_types=None):
+    """带缓存的原始职位搜索, 相同查询在TTL内只请求一次上游"""
+    key = ("search",) + normalize_search_key(keywords, location, limit, employment_types)
+    return search_cache.get_or_compute(
+        key,
+        lambda: searcher.search_jobs(keywords=keywords, location=location, limit=limit)
+    )
+
+
+def search_and_match_cached(backend, resume_data, ai_analysis, keywords, location, limit, employment_types=None):
+    """搜索并匹配职位的唯一入口 - 一次上游搜索直接进入匹配, 结果按查询和资料缓存"""
+    key = (
+        ("match",)
+        + normalize_search_key(keywords, location, limit, employment_types)
+        + (profile_fingerprint(resume_data, ai_analysis),)
+    )
+    return search_cache.get_or_compute(
+        key,
+        lambda: backend.search_and_match_jobs(
+            resume_data=resume_data,
+            ai_analysis=ai_analysis,
+            num_jobs=limit
+        )
+    )
@@ -0,0 +1,143 @@
+from datetime import date
+
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import get_connection
+from db_pool import run_script
+from metrics import instrument
+
+
+# 统计维度 -> 职位表列名
+STAT_DIMENSIONS = {
+    "industry": "industry",
+    "location": "work_location",
+    "experience": "experience_level",
+    "currency": "currency",
+}
+
+
+# 维度值为 NULL 的职位记为 '' - 主键列中的 NULL 互不相等, ON CONFLICT 和递减触发器都匹配不到
+def _dimension_triggers():
+    increments = "\n".join(
+        f"""
+                INSERT INTO job_stats_dim (dimension, value, job_count) VALUES ('{dim}', COALESCE(NEW.{col}, ''), 1)
+                ON CONFLICT(dimension, value) DO UPDATE SET job_count = job_count + 1;"""
+        for dim, col in STAT_DIMENSIONS.items()
+    )
+    decrements = "\n".join(
+        f"""
+                UPDATE job_stats_dim SET job_count = job_count - 1
+                WHERE dimension = '{dim}' AND value = COALESCE(OLD.{col}, '');"""
+        for dim, col in STAT_DIMENSIONS.items()
+    )
+    return increments, decrements
+
+
+def _midpoint(row):
+    # 缺少薪资的职位按 0 计入薪资总和, 避免 NOT NULL 约束使职位写入失败
+    return f"COALESCE(({row}.min_salary + {row}.max_salary) / 2.0, 0)"
+
+
+def create_stats_schema(conn):
+    """创建汇总表和维护触发器 - 职位增删改在同一事务内更新统计 (迁移步骤)"""
+    increments, decrements = _dimension_triggers()
+    add_expiry = f'''
+                INSERT INTO job_stats_expiry (valid_until, job_count, salary_midpoint_sum)
+                VALUES (COALESCE(NEW.job_valid_until, ''), 1, {_midpoint("NEW")})
+                ON CONFLICT(valid_until) DO UPDATE SET
+                    job_count = job_count + 1,
+                    salary_midpoint_sum = salary_midpoint_sum + {_midpoint("NEW")};'''
+    remove_expiry = f'''
+                UPDATE job_stats_expiry SET
+                    job_count = job_count - 1,
+                    salary_midpoint_sum = salary_midpoint_sum - {_midpoint("OLD")}
+                WHERE valid_until = COALESCE(OLD.job_valid_until, '');'''
+    cleanup = '''
+                DELETE FROM job_stats_dim WHERE job_count <= 0;
+                DELETE FROM job_stats_expiry WHERE job_count <= 0;'''
+    watched = ", ".join(list(STAT_DIMENSIONS.values()) + ["job_valid_until", "min_salary", "max_salary"])
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_stats_expiry'"
+    ).fetchone()
+
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS job_stats_dim (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL DEFAULT '',
+            job_count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        );
+
+        -- 按有效期汇总: 有效职位数 = 有效期 >= 今天的行之和, 过期无需任何写操作
+        CREATE TABLE IF NOT EXISTS job_stats_expiry (
+            valid_until TEXT NOT NULL DEFAULT '' PRIMARY KEY,
+            job_count INTEGER NOT NULL,
+            salary_midpoint_sum REAL NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_job_stats_insert AFTER INSERT ON {HEAD_HUNTER_TABLE}
+        BEGIN{increments}{add_expiry}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_job_stats_delete AFTER DELETE ON {HEAD_HUNTER_TABLE}
+        BEGIN{decrements}{remove_expiry}{cleanup}
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_job_stats_update AFTER UPDATE OF {watched} ON {HEAD_HUNTER_TABLE}
+        BEGIN{decrements}{remove_expiry}{increments}{add_expiry}{cleanup}
+        END;
+    ''')
+
+    # 首次创建时从现有职位回填
+    if not exists:
+        for dim, col in STAT_DIMENSIONS.items():
+            conn.execute(f'''
+                INSERT INTO job_stats_dim (dimension, value, job_count)
+                SELECT '{dim}', COALESCE({col}, ''), COUNT(*) FROM {HEAD_HUNTER_TABLE} GROUP BY COALESCE({col}, '')
+            ''')
+        conn.execute(f'''
+            INSERT INTO job_stats_expiry (valid_until, job_count, salary_midpoint_sum)
+            SELECT COALESCE(job_valid_until, ''), COUNT(*), SUM(COALESCE((min_salary + max_salary) / 2.0, 0))
+            FROM {HEAD_HUNTER_TABLE} GROUP BY COALESCE(job_valid_until, '')
+        ''')
+
+
+def rebuild_stats_schema(conn):
+    """按当前定义重建汇总表和触发器并重新回填 - 旧版本的 NULL 维度值无法被触发器维护 (迁移步骤)"""
+    run_script(conn, '''
+        DROP TRIGGER IF EXISTS trg_job_stats_insert;
+        DROP TRIGGER IF EXISTS trg_job_stats_delete;
+        DROP TRIGGER IF EXISTS trg_job_stats_update;
+        DROP TABLE IF EXISTS job_stats_dim;
+        DROP TABLE IF EXISTS job_stats_expiry;
+    ''')
+    create_stats_schema(conn)
+
+
+@instrument("sqlite.get_job_statistics")
+def get_job_statistics(db_path=HEAD_HUNTER_DB, today=None):
+    """读取汇总统计, 耗时与职位总数无关"""
+    today = (today or date.today()).strftime("%Y-%m-%d")
+
+    conn = get_connection(db_path)
+    total, active, salary_sum = conn.execute('''
+        SELECT COALESCE(SUM(job_count), 0),
+               COALESCE(SUM(CASE WHEN valid_until >= ? THEN job_count ELSE 0 END), 0),
+               COALESCE(SUM(salary_midpoint_sum), 0)
+        FROM job_stats_expiry
+    ''', (today,)).fetchone()
+
+    distributions = {dim: {} for dim in STAT_DIMENSIONS}
+    for dim, value, count in conn.execute(
+        "SELECT dimension, value, job_count FROM job_stats_dim ORDER BY dimension, job_count DESC"
+    ):
+        distributions.setdefault(dim, {})[value] = count
+
+    return {
+        "total": total,
+        "active": active,
+        "expired": total - active,
+        "avg_salary": salary_sum / total if total else 0,
+        **distributions,
+    }
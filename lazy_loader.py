@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# 加载失败后的重试间隔 (秒), 每次失败翻倍
+RETRY_INITIAL_SECONDS = 1.0
+RETRY_MAX_SECONDS = 60.0
+
+
+class BackgroundLoader:
+    """在后台线程中预先构建重量级对象 (导入大模块、建立客户端等), 首次使用时等待其完成
+
+    加载失败不是永久的: 退避时间过后的下一次 get() / peek() 会重新加载, 与 st.cache_resource 遇到异常后重试一致.
+    """
+
+    def __init__(self, factory, name, retry_initial=RETRY_INITIAL_SECONDS, retry_max=RETRY_MAX_SECONDS):
+        self.factory = factory
+        self.name = name
+        self.retry_initial = retry_initial
+        self.retry_max = retry_max
+        self._thread = None
+        self._lock = threading.Lock()
+        self._value = None
+        self._error = None
+        self._failures = 0
+        self._retry_at = 0.0
+        self._done = threading.Event()
+
+    def _run(self, done):
+        try:
+            value = self.factory()
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                delay = min(self.retry_initial * 2 ** (self._failures - 1), self.retry_max)
+                self._retry_at = time.monotonic() + delay
+                self._error = e
+            logger.warning("Background load of %s failed (attempt %s), retrying after %.0fs: %s",
+                           self.name, self._failures, delay, e)
+        else:
+            with self._lock:
+                self._value = value
+                self._error = None
+                self._failures = 0
+        finally:
+            done.set()
+
+    def _attempt(self):
+        """返回当前这次加载的完成事件; 尚未开始, 或上次失败且已过退避时间时启动新的加载"""
+        with self._lock:
+            retry = self._error is not None and self._done.is_set() and time.monotonic() >= self._retry_at
+            if self._thread is None or retry:
+                self._done = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._done,), name=f"prewarm-{self.name}", daemon=True
+                )
+                self._thread.start()
+            return self._done
+
+    def start(self):
+        """启动预热 (重复调用无副作用)"""
+        self._attempt()
+        return self
+
+    def get(self):
+        """返回构建好的对象; 仍在加载时阻塞等待, 加载失败时抛出原始异常 (退避期内不重试)"""
+        self._attempt().wait()
+        with self._lock:
+            if self._error is not None:
+                raise self._error
+            return self._value
+
+    def peek(self):
+        """已就绪则返回对象, 否则返回 None (不阻塞; 失败且已过退避时间时在后台重试)"""
+        done = self._attempt()
+        with self._lock:
+            if done.is_set() and self._error is None:
+                return self._value
+        return None
@@ -0,0 +1,114 @@
+import os
+from datetime import date
+
+from cache import TTLCache
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+from db_pool import run_script
+from metrics import metrics
+
+
+# 版本号未变时结果一直有效; TTL 只用于回收不再使用的旧版本
+LISTING_CACHE_TTL = int(os.environ.get("LISTING_CACHE_TTL", "3600"))
+
+# 进程级共享 - 所有会话读取同一份职位 / 求职者列表, 相同键的并发加载只执行一次
+listing_cache = TTLCache(ttl_seconds=LISTING_CACHE_TTL, max_entries=64)
+metrics.register_cache("listings", listing_cache.stats)
+
+
+def _create_version_schema(conn, table):
+    """表级版本计数器: 任何写入 (保存求职者、发布职位、批量导入) 都由触发器加一"""
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+
+        INSERT OR IGNORE INTO table_versions (name, version) VALUES ('{table}', 0);
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_insert
+        AFTER INSERT ON {table}
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_update
+        AFTER UPDATE ON {table}
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_version_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+        END;
+    ''')
+
+
+def create_job_version_schema(conn):
+    """职位表版本计数器 (迁移步骤)"""
+    _create_version_schema(conn, HEAD_HUNTER_TABLE)
+
+
+def create_seeker_version_schema(conn):
+    """求职者表版本计数器 (迁移步骤)"""
+    _create_version_schema(conn, "job_seekers")
+
+
+def table_version(db_path, table):
+    """主键查询, 每次读取列表前调用"""
+    row = get_connection(db_path).execute(
+        "SELECT version FROM table_versions WHERE name = ?", (table,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def cached_read(name, db_path, table, loader, today=None):
+    """按 (名称, 表版本, 日期) 缓存读取结果 - 写入后版本变化自动失效, 日期变化时有效期筛选随之更新
+
+    返回的对象在会话之间共享, 调用方不应修改.
+    """
+    key = (name, table_version(db_path, table), (today or date.today()).isoformat())
+    return listing_cache.get_or_compute(key, loader)
+
+
+def get_all_jobs_for_matching():
+    from backend import get_all_jobs_for_matching as load
+    return cached_read("get_all_jobs_for_matching", HEAD_HUNTER_DB, HEAD_HUNTER_TABLE, load)
+
+
+def get_all_job_seekers():
+    from backend import get_all_job_seekers as load
+    return cached_read("get_all_job_seekers", JOB_SEEKER_DB, "job_seekers", load)
+
+
+def get_jobs_for_interview():
+    from backend import get_jobs_for_interview as load
+    return cached_read("get_jobs_for_interview", HEAD_HUNTER_DB, HEAD_HUNTER_TABLE, load)
+
+
+def count_active_jobs(db_path=HEAD_HUNTER_DB):
+    """有效期内的职位数 (job_valid_until >= 今天) - 走 job_valid_until 索引, 不读取职位内容
+
+    与 get_all_jobs_for_matching / get_jobs_for_interview 的有效期筛选一致; 按职位表版本和日期缓存.
+    """
+    today = date.today().isoformat()
+    return cached_read(
+        "count_active_jobs", db_path, HEAD_HUNTER_TABLE,
+        lambda: get_connection(db_path).execute(
+            f"SELECT COUNT(*) FROM {HEAD_HUNTER_TABLE} WHERE job_valid_until >= ?", (today,)
+        ).fetchone()[0]
+    )
+
+
+def count_job_seekers(db_path=JOB_SEEKER_DB):
+    """求职者人数 (同一 job_seeker_id 的多条记录算一人, 与匹配评分使用的求职者集合一致) - 走 job_seeker_id 索引"""
+    return cached_read(
+        "count_job_seekers", db_path, "job_seekers",
+        lambda: get_connection(db_path).execute(
+            "SELECT COUNT(DISTINCT job_seeker_id) FROM job_seekers"
+        ).fetchone()[0]
+    )
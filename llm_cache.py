@@ -0,0 +1,101 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from cache import DiskCache
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# 匹配分析与面试题目 / 评估的共享缓存
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL_DAYS", "30")) * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024
+LLM_CACHE_MODEL = os.environ.get("LLM_CACHE_MODEL", "gpt-4")
+# 需要整体失效时提升 (例如切换了模型供应商)
+LLM_CACHE_VERSION = "v1"
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """进程级共享的 LLM 响应缓存, 首次使用时创建并注册命中率指标"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(
+                LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL,
+                max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES
+            )
+            metrics.register_cache("llm", _cache.stats)
+        return _cache
+
+
+def _code_digest(code, digest):
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(const, digest)
+        else:
+            digest.update(repr(const).encode("utf-8"))
+
+
+def prompt_fingerprint(fn):
+    """函数字节码与常量 (含提示词文本) 的哈希 - 修改提示词或逻辑后旧缓存自动失效"""
+    digest = hashlib.sha256()
+    _code_digest(fn.__code__, digest)
+    return digest.hexdigest()[:16]
+
+
+def llm_cache_key(namespace, model, prompt, inputs):
+    """规范化哈希: 相同模型、提示词和输入 (职位行 / 求职者行的全部内容) 得到相同的键"""
+    payload = json.dumps(
+        [LLM_CACHE_VERSION, namespace, model, prompt, inputs],
+        sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":")
+    )
+    return f"llm:{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def cached_llm_call(namespace, fn, model=LLM_CACHE_MODEL):
+    """包装一个生成函数: 输入中任一行的内容变化都会得到新的键, 因此无需显式失效"""
+    prompt = prompt_fingerprint(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        cache = get_llm_cache()
+        key = llm_cache_key(namespace, model, prompt, [args, kwargs])
+        cached = cache.get(key)
+        if cached is not None:
+            return cached["value"]
+
+        value = fn(*args, **kwargs)
+        if value is not None:
+            try:
+                cache.set(key, {"value": value})
+            except Exception as e:
+                logger.warning("Could not cache %s result: %s", namespace, e)
+        return value
+
+    wrapper.__llm_cached__ = True
+    return wrapper
+
+
+def cache_llm_attributes(owner, prefix, names, model=LLM_CACHE_MODEL):
+    """为模块上的生成函数加缓存 (原地替换属性, 模块内部调用同样命中缓存)"""
+    wrapped = []
+    for name in names:
+        value = getattr(owner, name, None)
+        if value is None or not callable(value) or getattr(value, "__llm_cached__", False):
+            continue
+        if getattr(value, "__instrumented__", False) or not hasattr(value, "__code__"):
+            # 已被计时包装时无法取到提示词指纹; 调用方应先加缓存再加计时
+            continue
+        setattr(owner, name, cached_llm_call(f"{prefix}.{name}", value, model))
+        wrapped.append(name)
+    return wrapped
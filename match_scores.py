@@ -0,0 +1,407 @@
+import json
+import logging
+import threading
+from datetime import date
+
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+from db_pool import run_script
+from db_pool import transaction
+from listing_cache import cached_read
+from metrics import instrument
+
+
+logger = logging.getLogger(__name__)
+
+
+def match_score_floor():
+    """不高于该分数的组合不存储: 即不共享任何技能时的最高分, 由评分权重推导
+
+    batch_scoring 依赖 numpy, 本模块在启动迁移时导入, 因此按需导入它.
+    """
+    from batch_scoring import NO_SKILL_SCORE_CEILING
+    return NO_SKILL_SCORE_CEILING
+
+
+def create_match_schema(conn):
+    """职位库中的预计算匹配分数表与职位变更队列 (迁移步骤)"""
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS match_scores (
+            job_id INTEGER NOT NULL,
+            job_seeker_id TEXT NOT NULL,
+            score INTEGER NOT NULL,
+            skill_score REAL NOT NULL,
+            experience_score REAL NOT NULL,
+            education_score REAL NOT NULL,
+            role_score REAL NOT NULL,
+            matched_skills TEXT NOT NULL,
+            missing_skills TEXT NOT NULL,
+            PRIMARY KEY (job_id, job_seeker_id)
+        ) WITHOUT ROWID;
+
+        -- 招聘匹配页面: WHERE job_id = ? ORDER BY score DESC LIMIT K
+        CREATE INDEX IF NOT EXISTS idx_match_scores_rank ON match_scores(job_id, score DESC);
+        CREATE INDEX IF NOT EXISTS idx_match_scores_seeker ON match_scores(job_seeker_id);
+
+        CREATE TABLE IF NOT EXISTS match_job_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL
+        );
+
+        -- jobs / seekers 高水位; 行不存在表示尚未完成首次全量构建
+        CREATE TABLE IF NOT EXISTS match_sync_state (
+            name TEXT PRIMARY KEY,
+            high_water INTEGER NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_job_insert AFTER INSERT ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO match_job_queue (job_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_job_update
+        AFTER UPDATE OF job_title, required_skills, experience_level, job_valid_until ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO match_job_queue (job_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_job_delete AFTER DELETE ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO match_job_queue (job_id) VALUES (OLD.id);
+        END;
+    ''')
+
+
+def create_match_queue_schema(conn):
+    """求职者库中的求职者变更队列 (迁移步骤)"""
+    run_script(conn, '''
+        CREATE TABLE IF NOT EXISTS match_seeker_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_seeker_id TEXT
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_seeker_insert AFTER INSERT ON job_seekers
+        BEGIN
+            INSERT INTO match_seeker_queue (job_seeker_id) VALUES (NEW.job_seeker_id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_seeker_update
+        AFTER UPDATE OF job_seeker_id, hard_skills, work_experience, education_level, primary_role ON job_seekers
+        BEGIN
+            INSERT INTO match_seeker_queue (job_seeker_id) VALUES (OLD.job_seeker_id);
+            INSERT INTO match_seeker_queue (job_seeker_id) VALUES (NEW.job_seeker_id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_match_seeker_delete AFTER DELETE ON job_seekers
+        BEGIN
+            INSERT INTO match_seeker_queue (job_seeker_id) VALUES (OLD.job_seeker_id);
+        END;
+    ''')
+
+
+def reset_match_scores(conn):
+    """评分规则变化后清除构建标记, 后台线程随后全量重建; 重建完成前页面回退到实时评分 (迁移步骤)"""
+    conn.execute("DELETE FROM match_sync_state WHERE name = 'jobs'")
+
+
+def _job(row):
+    from batch_scoring import split_skills
+
+    job_id, title, required_skills, experience = row
+    return {"id": job_id, "title": title, "skills": split_skills(required_skills), "experience": experience}
+
+
+def _seeker(row):
+    from batch_scoring import split_skills
+
+    job_seeker_id, hard_skills, experience, education, primary_role = row
+    return {
+        "id": str(job_seeker_id),
+        "skills": split_skills(hard_skills),
+        "experience": experience,
+        "education": education,
+        "title": primary_role,
+    }
+
+
+def load_active_jobs(job_ids=None, db_path=HEAD_HUNTER_DB, today=None):
+    """有效期内的职位 (可限定ID)"""
+    sql = f"SELECT id, job_title, required_skills, experience_level FROM {HEAD_HUNTER_TABLE} WHERE job_valid_until >= ?"
+    params = [(today or date.today()).isoformat()]
+    if job_ids is not None:
+        sql += f" AND id IN ({','.join('?' * len(job_ids))})"
+        params.extend(job_ids)
+    return [_job(row) for row in get_connection(db_path).execute(sql, params).fetchall()]
+
+
+def load_seekers(seeker_ids=None, db_path=JOB_SEEKER_DB):
+    """求职者评分字段; 同一 job_seeker_id 有多行时以最新一行为准"""
+    sql = "SELECT job_seeker_id, hard_skills, work_experience, education_level, primary_role FROM job_seekers"
+    params = []
+    if seeker_ids is not None:
+        sql += f" WHERE job_seeker_id IN ({','.join('?' * len(seeker_ids))})"
+        params.extend(seeker_ids)
+    rows = get_connection(db_path).execute(sql + " ORDER BY id", params).fetchall()
+    return list({str(row[0]): _seeker(row) for row in rows}.values())
+
+
+def _score_rows(matrix, job, seeker_ids):
+    """对一个职位评分矩阵中的全部求职者, 返回超过下限的 match_scores 行"""
+    components = matrix.score_components(job)
+    scores = matrix.score(job, components)
+    rows = []
+    for index in (scores > match_score_floor()).nonzero()[0]:
+        matched, missing = matrix.skill_gaps(job, index)
+        rows.append((
+            job["id"], seeker_ids[index], int(scores[index]),
+            float(components["skill"][index]), float(components["experience"][index]),
+            float(components["education"][index]), float(components["role"][index]),
+            json.dumps(matched, ensure_ascii=False), json.dumps(missing, ensure_ascii=False),
+        ))
+    return rows
+
+
+def build_matrix(seekers):
+    from batch_scoring import SeekerMatrix
+    return SeekerMatrix(seekers)
+
+
+def live_seeker_matrix(db_path=JOB_SEEKER_DB):
+    """实时评分用的全部求职者矩阵 - 与预计算分数表读取相同的字段 (load_seekers), 两条路径结果一致
+
+    按 job_seekers 表版本缓存, 所有会话共享; 求职者数据变化后自动重建.
+    """
+    return cached_read(
+        "live_seeker_matrix", db_path, "job_seekers", lambda: build_matrix(load_seekers(db_path=db_path))
+    )
+
+
+# 每个写事务覆盖的职位数 - 评分在事务外完成, 写锁只在写入这一小批时持有, 职位发布 / 编辑不必等待整轮构建
+SCORE_WRITE_CHUNK = 16
+
+INSERT_SCORES = '''
+    INSERT OR REPLACE INTO match_scores (job_id, job_seeker_id, score, skill_score, experience_score,
+                                         education_score, role_score, matched_skills, missing_skills)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+@instrument("sqlite.top_matches")
+def top_matches(job_id, min_score, limit, db_path=HEAD_HUNTER_DB, seekers_db=JOB_SEEKER_DB):
+    """预计算的前K名: [(job_seeker_id, analysis)]
+
+    分数表不能代表当前数据时返回 None, 由调用方回退到实时评分: 尚未完成首次构建、该职位的变更仍在队列中、
+    该职位还没有任何分数行 (刚发布), 或有求职者变更尚未处理.
+    """
+    from batch_scoring import build_analysis
+
+    conn = get_connection(db_path)
+    state = dict(conn.execute("SELECT name, high_water FROM match_sync_state").fetchall())
+    if "jobs" not in state:
+        return None
+    if conn.execute(
+        "SELECT 1 FROM match_job_queue WHERE job_id = ? AND seq > ? LIMIT 1", (job_id, state["jobs"])
+    ).fetchone() is not None:
+        return None
+    if conn.execute("SELECT 1 FROM match_scores WHERE job_id = ? LIMIT 1", (job_id,)).fetchone() is None:
+        return None
+    if get_connection(seekers_db).execute(
+        "SELECT 1 FROM match_seeker_queue WHERE seq > ? LIMIT 1", (state.get("seekers", 0),)
+    ).fetchone() is not None:
+        return None
+
+    rows = conn.execute('''
+        SELECT job_seeker_id, score, skill_score, experience_score, education_score, role_score,
+               matched_skills, missing_skills
+        FROM match_scores
+        WHERE job_id = ? AND score >= ?
+        ORDER BY score DESC
+        LIMIT ?
+    ''', (job_id, min_score, limit)).fetchall()
+
+    results = []
+    for seeker_id, score, skill, experience, education, role, matched, missing in rows:
+        breakdown = {"skill": skill, "experience": experience, "education": education, "role": role}
+        results.append((seeker_id, build_analysis(score, json.loads(matched), json.loads(missing), breakdown)))
+    return results
+
+
+class MatchScoreWorker(threading.Thread):
+    """后台维护匹配分数表: 首次全量构建, 之后按两个变更队列增量更新, 并清理过期职位"""
+
+    def __init__(self, jobs_db=HEAD_HUNTER_DB, seekers_db=JOB_SEEKER_DB, batch_size=500, poll_interval=30.0):
+        super().__init__(name="match-scores", daemon=True)
+        self.jobs_db = jobs_db
+        self.seekers_db = seekers_db
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._rebuild = threading.Event()
+        self._expired_on = None
+
+    def wake(self):
+        """有求职者保存或职位发布时唤醒线程, 调用方立即返回"""
+        self._wake.set()
+
+    def request_rebuild(self):
+        """在后台重新全量构建"""
+        self._rebuild.set()
+        self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                if self._rebuild.is_set() or not self.is_built():
+                    self._rebuild.clear()
+                    self.rebuild()
+                processed = self.sync_once()
+                backoff = 1.0
+            except Exception as e:
+                logger.warning("Match score sync failed, retrying in %.0fs: %s", backoff, e)
+                processed = 0
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 300.0)
+                continue
+
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def is_built(self):
+        return get_connection(self.jobs_db).execute(
+            "SELECT 1 FROM match_sync_state WHERE name = 'jobs'"
+        ).fetchone() is not None
+
+    def _queue_heads(self):
+        job_head = get_connection(self.jobs_db).execute("SELECT COALESCE(MAX(seq), 0) FROM match_job_queue").fetchone()[0]
+        seeker_head = get_connection(self.seekers_db).execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM match_seeker_queue"
+        ).fetchone()[0]
+        return job_head, seeker_head
+
+    def rebuild(self):
+        """全量构建: 先记录队列位置再读取数据, 构建期间的变更之后会被增量处理"""
+        job_head, seeker_head = self._queue_heads()
+        seekers = load_seekers(db_path=self.seekers_db)
+        jobs = load_active_jobs(db_path=self.jobs_db)
+        matrix = build_matrix(seekers)
+        seeker_ids = [seeker["id"] for seeker in seekers]
+
+        # 构建期间分数表不完整: 先清除构建标记, top_matches 回退到实时评分
+        with transaction(self.jobs_db) as conn:
+            conn.execute("DELETE FROM match_sync_state")
+        self._write_scores(matrix, jobs, seeker_ids, replace_jobs=True)
+        with transaction(self.jobs_db) as conn:
+            # 不在本次构建范围内的职位 (已删除或过期) 留下的旧分数
+            conn.execute(f'''
+                DELETE FROM match_scores WHERE job_id NOT IN (
+                    SELECT id FROM {HEAD_HUNTER_TABLE} WHERE job_valid_until >= ?
+                )
+            ''', (date.today().isoformat(),))
+            conn.executemany(
+                "INSERT OR REPLACE INTO match_sync_state (name, high_water) VALUES (?, ?)",
+                [("jobs", job_head), ("seekers", seeker_head)]
+            )
+        logger.info("Rebuilt match scores for %s jobs x %s seekers", len(jobs), len(seekers))
+
+    def _write_scores(self, matrix, jobs, seeker_ids, replace_jobs=False):
+        """按 SCORE_WRITE_CHUNK 个职位一批评分并写入, 每批一个短事务; replace_jobs 时先删除这批职位的旧分数"""
+        for start in range(0, len(jobs), SCORE_WRITE_CHUNK):
+            chunk = jobs[start:start + SCORE_WRITE_CHUNK]
+            rows = [row for job in chunk for row in _score_rows(matrix, job, seeker_ids)]
+            with transaction(self.jobs_db) as conn:
+                if replace_jobs:
+                    conn.execute(
+                        f"DELETE FROM match_scores WHERE job_id IN ({','.join('?' * len(chunk))})",
+                        [job["id"] for job in chunk]
+                    )
+                conn.executemany(INSERT_SCORES, rows)
+
+    def sync_once(self):
+        """处理一批变更队列项并清理过期职位, 返回处理的队列条数"""
+        return self._sync_seekers() + self._sync_jobs() + self._drop_expired()
+
+    def _high_water(self, name):
+        return get_connection(self.jobs_db).execute(
+            "SELECT high_water FROM match_sync_state WHERE name = ?", (name,)
+        ).fetchone()[0]
+
+    def _sync_seekers(self):
+        high_water = self._high_water("seekers")
+        queue = get_connection(self.seekers_db).execute(
+            "SELECT seq, job_seeker_id FROM match_seeker_queue WHERE seq > ? ORDER BY seq LIMIT ?",
+            (high_water, self.batch_size)
+        ).fetchall()
+        if not queue:
+            return 0
+
+        seeker_ids = sorted({str(seeker_id) for _, seeker_id in queue if seeker_id is not None})
+        seekers = load_seekers(seeker_ids, db_path=self.seekers_db)
+        jobs = load_active_jobs(db_path=self.jobs_db)
+        matrix = build_matrix(seekers)
+        present = [seeker["id"] for seeker in seekers]
+
+        # 高水位推进前 top_matches 看到待处理的求职者变更, 回退到实时评分, 不会读到写了一半的分数
+        new_high_water = queue[-1][0]
+        if seeker_ids:
+            with transaction(self.jobs_db) as conn:
+                conn.execute(
+                    f"DELETE FROM match_scores WHERE job_seeker_id IN ({','.join('?' * len(seeker_ids))})",
+                    seeker_ids
+                )
+        if seekers:
+            self._write_scores(matrix, jobs, present)
+        with transaction(self.jobs_db) as conn:
+            conn.execute("UPDATE match_sync_state SET high_water = ? WHERE name = 'seekers'", (new_high_water,))
+
+        with transaction(self.seekers_db) as conn:
+            conn.execute("DELETE FROM match_seeker_queue WHERE seq <= ?", (new_high_water,))
+        return len(queue)
+
+    def _sync_jobs(self):
+        high_water = self._high_water("jobs")
+        conn = get_connection(self.jobs_db)
+        queue = conn.execute(
+            "SELECT seq, job_id FROM match_job_queue WHERE seq > ? ORDER BY seq LIMIT ?",
+            (high_water, self.batch_size)
+        ).fetchall()
+        if not queue:
+            return 0
+
+        job_ids = sorted({job_id for _, job_id in queue})
+        jobs = load_active_jobs(job_ids, db_path=self.jobs_db)
+        seekers = load_seekers(db_path=self.seekers_db) if jobs else []
+        matrix = build_matrix(seekers)
+        seeker_ids = [seeker["id"] for seeker in seekers]
+
+        # 同上: 这些职位在高水位推进前回退到实时评分
+        new_high_water = queue[-1][0]
+        with transaction(self.jobs_db) as conn:
+            conn.execute(f"DELETE FROM match_scores WHERE job_id IN ({','.join('?' * len(job_ids))})", job_ids)
+        self._write_scores(matrix, jobs, seeker_ids)
+        with transaction(self.jobs_db) as conn:
+            conn.execute("UPDATE match_sync_state SET high_water = ? WHERE name = 'jobs'", (new_high_water,))
+            conn.execute("DELETE FROM match_job_queue WHERE seq <= ?", (new_high_water,))
+        return len(queue)
+
+    def _drop_expired(self):
+        """职位过期不会触发任何写操作, 每天清理一次过期职位的分数"""
+        today = date.today()
+        if self._expired_on == today:
+            return 0
+        with transaction(self.jobs_db) as conn:
+            conn.execute(f'''
+                DELETE FROM match_scores WHERE job_id IN (
+                    SELECT id FROM {HEAD_HUNTER_TABLE} WHERE job_valid_until < ?
+                )
+            ''', (today.isoformat(),))
+        self._expired_on = today
+        return 0
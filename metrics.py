@@ -0,0 +1,287 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+# 每个阶段保留最近的样本用于计算分位数, 调用次数与总耗时为累计值
+SAMPLE_WINDOW = int(os.environ.get("METRICS_SAMPLE_WINDOW", "2048"))
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "smartcareer"
+# 设置后在该端口提供 Prometheus /metrics
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+
+
+def _quantile(sorted_samples, q):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return sorted_samples[index]
+
+
+class StageStats:
+    """单个阶段的耗时统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        self.total_seconds += seconds
+        self.samples.append(seconds)
+        if error:
+            self.errors += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        summary = {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": self.total_seconds,
+            "mean_s": self.total_seconds / self.count if self.count else 0.0,
+        }
+        for q in QUANTILES:
+            summary[f"p{int(q * 100)}_s"] = _quantile(ordered, q)
+        return summary
+
+
+class MetricsRegistry:
+    """进程级指标: 各阶段耗时、计数器、LLM token 用量、缓存命中率"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+        self.tokens = {}
+        self.caches = {}
+
+    def observe(self, stage, seconds, error=False):
+        with self._lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.observe(seconds, error)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_tokens(self, model, prompt_tokens=0, completion_tokens=0):
+        with self._lock:
+            usage = self.tokens.setdefault(model or "unknown", {"prompt": 0, "completion": 0})
+            usage["prompt"] += prompt_tokens or 0
+            usage["completion"] += completion_tokens or 0
+
+    def register_cache(self, name, stats_fn):
+        """注册缓存; stats_fn 返回含 hits / misses 的字典 (DiskCache.stats / TTLCache.stats)"""
+        with self._lock:
+            self.caches[name] = stats_fn
+
+    @contextmanager
+    def timed(self, stage):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, error)
+
+    def snapshot(self):
+        """当前所有指标的字典快照"""
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in self.stages.items()}
+            counters = dict(self.counters)
+            tokens = {model: dict(usage) for model, usage in self.tokens.items()}
+            cache_fns = dict(self.caches)
+
+        caches = {}
+        for name, stats_fn in cache_fns.items():
+            try:
+                stats = stats_fn()
+            except Exception as e:
+                logger.warning("Cache stats for %s failed: %s", name, e)
+                continue
+            lookups = stats.get("hits", 0) + stats.get("misses", 0)
+            caches[name] = {
+                "hits": stats.get("hits", 0),
+                "misses": stats.get("misses", 0),
+                "hit_rate": stats.get("hits", 0) / lookups if lookups else 0.0,
+                "entries": stats.get("entries", 0),
+            }
+        return {"stages": stages, "counters": counters, "tokens": tokens, "caches": caches}
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.tokens.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def timed(stage):
+    """记录一个代码块的耗时: with timed("sqlite.search"): ..."""
+    return metrics.timed(stage)
+
+
+def instrument(stage):
+    """函数装饰器: 记录每次调用的耗时与异常"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metrics.timed(stage):
+                return fn(*args, **kwargs)
+        wrapper.__instrumented__ = True
+        return wrapper
+    return decorator
+
+
+def instrument_attributes(owner, prefix, names=None):
+    """为类或模块上的可调用对象加计时 (原地替换属性, 只处理一次)
+
+    names 为空时处理所有公开函数; 对类替换后, 已有实例和模块内部调用同样会被计时.
+    """
+    if names is None:
+        # 只处理在该类 / 模块中定义的函数, 不包括导入进来的其他对象
+        module_name = owner.__name__ if inspect.ismodule(owner) else owner.__module__
+        names = [
+            name for name, value in vars(owner).items()
+            if not name.startswith("_") and inspect.isfunction(value) and value.__module__ == module_name
+        ]
+    wrapped = []
+    for name in names:
+        value = getattr(owner, name, None)
+        if value is None or not callable(value) or getattr(value, "__instrumented__", False):
+            continue
+        raw = vars(owner).get(name, value)
+        if isinstance(raw, (staticmethod, classmethod)):
+            continue
+        setattr(owner, name, instrument(f"{prefix}.{name}")(value))
+        wrapped.append(name)
+    return wrapped
+
+
+def _record_usage(response, model):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        metrics.record_tokens(
+            getattr(response, "model", None) or model,
+            getattr(usage, "prompt_tokens", 0),
+            getattr(usage, "completion_tokens", 0)
+        )
+
+
+def instrument_openai():
+    """为 OpenAI SDK 的对话与向量调用计时并记录 token 用量 - 覆盖 backend 内部的 GPT-4 调用
+
+    流式请求只记录到首个响应返回的耗时, token 由调用方从最后一个分块中记录.
+    """
+    try:
+        from openai.resources.chat.completions import Completions
+        from openai.resources.embeddings import Embeddings
+    except ImportError:
+        return False
+
+    def wrap(cls, stage):
+        original = cls.create
+        if getattr(original, "__instrumented__", False):
+            return
+
+        @functools.wraps(original)
+        def create(self, *args, **kwargs):
+            with metrics.timed(f"{stage}.{kwargs.get('model', 'unknown')}"):
+                response = original(self, *args, **kwargs)
+            if not kwargs.get("stream"):
+                _record_usage(response, kwargs.get("model"))
+            return response
+
+        create.__instrumented__ = True
+        cls.create = create
+
+    wrap(Completions, "openai.chat")
+    wrap(Embeddings, "openai.embeddings")
+    return True
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(snapshot=None):
+    """Prometheus 文本格式导出"""
+    snapshot = snapshot or metrics.snapshot()
+    p = METRIC_PREFIX
+    lines = [
+        f"# HELP {p}_stage_latency_seconds Latency of instrumented stages.",
+        f"# TYPE {p}_stage_latency_seconds summary",
+    ]
+    for stage, stats in sorted(snapshot["stages"].items()):
+        label = f'stage="{_label(stage)}"'
+        for q in QUANTILES:
+            lines.append(f'{p}_stage_latency_seconds{{{label},quantile="{q}"}} {stats[f"p{int(q * 100)}_s"]:.6f}')
+        lines.append(f"{p}_stage_latency_seconds_sum{{{label}}} {stats['total_s']:.6f}")
+        lines.append(f"{p}_stage_latency_seconds_count{{{label}}} {stats['count']}")
+
+    lines += [f"# HELP {p}_stage_errors_total Calls that raised.", f"# TYPE {p}_stage_errors_total counter"]
+    for stage, stats in sorted(snapshot["stages"].items()):
+        lines.append(f'{p}_stage_errors_total{{stage="{_label(stage)}"}} {stats["errors"]}')
+
+    lines += [f"# HELP {p}_llm_tokens_total LLM tokens used.", f"# TYPE {p}_llm_tokens_total counter"]
+    for model, usage in sorted(snapshot["tokens"].items()):
+        for kind, count in sorted(usage.items()):
+            lines.append(f'{p}_llm_tokens_total{{model="{_label(model)}",kind="{kind}"}} {count}')
+
+    lines += [f"# HELP {p}_events_total Application counters.", f"# TYPE {p}_events_total counter"]
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.append(f'{p}_events_total{{name="{_label(name)}"}} {value}')
+
+    lines += [
+        f"# HELP {p}_cache_requests_total Cache lookups by result.",
+        f"# TYPE {p}_cache_requests_total counter",
+    ]
+    for name, stats in sorted(snapshot["caches"].items()):
+        lines.append(f'{p}_cache_requests_total{{cache="{_label(name)}",result="hit"}} {stats["hits"]}')
+        lines.append(f'{p}_cache_requests_total{{cache="{_label(name)}",result="miss"}} {stats["misses"]}')
+    lines += [f"# HELP {p}_cache_entries Entries currently cached.", f"# TYPE {p}_cache_entries gauge"]
+    for name, stats in sorted(snapshot["caches"].items()):
+        lines.append(f'{p}_cache_entries{{cache="{_label(name)}"}} {stats["entries"]}')
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """在后台线程提供 /metrics (Streamlit 本身不能添加 HTTP 路由)"""
+    from http.server import BaseHTTPRequestHandler
+    from http.server import ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Serving metrics on %s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,99 @@
+import logging
+
+from bulk_ingest import create_ingest_schema
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+from headhunter_search import create_search_schema
+from job_stats import create_stats_schema
+from job_stats import rebuild_stats_schema
+from listing_cache import create_job_version_schema
+from listing_cache import create_seeker_version_schema
+from match_scores import create_match_queue_schema
+from match_scores import create_match_schema
+from match_scores import reset_match_scores
+from vector_sync import create_sync_schema
+
+
+logger = logging.getLogger(__name__)
+
+
+def _hot_query_indexes_head_hunter(conn):
+    # get_all_jobs_for_matching / get_jobs_for_interview 按有效期筛选
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_head_hunter_jobs_valid_until ON {HEAD_HUNTER_TABLE}(job_valid_until)")
+
+
+def _hot_query_indexes_job_seekers(conn):
+    # get_job_seeker_by_id / get_job_seeker_search_fields 按 job_seeker_id 查询
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_job_seekers_job_seeker_id ON job_seekers(job_seeker_id)")
+
+
+# 每个数据库的有序迁移: (版本号, 名称, 迁移函数) - 只能追加, 不能修改已发布的版本
+MIGRATIONS = {
+    HEAD_HUNTER_DB: [
+        (1, "full-text search", create_search_schema),
+        (2, "job statistics", create_stats_schema),
+        (3, "vector sync queue", create_sync_schema),
+        (4, "hot query indexes", _hot_query_indexes_head_hunter),
+        (5, "match scores", create_match_schema),
+        (6, "table version counter", create_job_version_schema),
+        (7, "rescore matches with exact skill matching", reset_match_scores),
+        (8, "job statistics without NULL keys", rebuild_stats_schema),
+    ],
+    JOB_SEEKER_DB: [
+        (1, "hot query indexes", _hot_query_indexes_job_seekers),
+        (2, "bulk ingest log", create_ingest_schema),
+        (3, "match score queue", create_match_queue_schema),
+        (4, "table version counter", create_seeker_version_schema),
+    ],
+}
+
+
+def current_version(db_path):
+    """读取数据库当前的 schema 版本"""
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if row is None:
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(db_path, migrations):
+    """在写锁内应用未执行的迁移 - 多个进程同时启动时只有一个会执行, 其余看到最新版本后跳过"""
+    conn = get_connection(db_path)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    # BEGIN IMMEDIATE 立即获取写锁, 版本检查与迁移在同一事务内完成
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+        applied = []
+        for target, name, step in migrations:
+            if target <= version:
+                continue
+            step(conn)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (target, name))
+            applied.append(target)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if applied:
+        logger.info("Applied migrations %s to %s", applied, db_path)
+    return applied
+
+
+def run_migrations():
+    """对所有数据库执行迁移"""
+    return {db_path: migrate(db_path, steps) for db_path, steps in MIGRATIONS.items()}
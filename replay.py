@@ -0,0 +1,611 @@
+"""上游服务的录制 / 回放替身: RapidAPI、OpenAI、Pinecone
+
+一个本地 HTTP 服务按路径前缀模拟三个上游 (/rapidapi, /openai/v1, /pinecone), 可注入延迟与错误率:
+    fake    - 全部返回确定性的合成响应
+    record  - 转发到真实上游, 成功的响应写入磁带库 (SQLite)
+    replay  - 优先回放磁带库中的响应, 未录制的请求返回合成响应
+
+用法:
+    python replay.py serve [--mode replay] [--port 8765] [--latency-ms 150] [--jitter-ms 100] [--error-rate 0.02]
+    python replay.py load [--base-url http://127.0.0.1:8765] [--sessions 100] [--concurrency 8] [--json load.json]
+
+应用设置 UPSTREAM_BASE_URL 后, backend / OpenAI / Pinecone / 异步职位搜索都会改为请求本地替身.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from urllib.request import Request
+from urllib.request import urlopen
+
+from metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_MODE = os.environ.get("UPSTREAM_MODE", "replay")
+UPSTREAM_BASE_URL = os.environ.get("UPSTREAM_BASE_URL", "")
+CASSETTE_PATH = os.environ.get("UPSTREAM_CASSETTES", "upstream_cassettes.db")
+FAKE_UPSTREAM_PORT = int(os.environ.get("FAKE_UPSTREAM_PORT", "8765"))
+
+RAPIDAPI_HOST = "linkedin-job-search-api.p.rapidapi.com"
+# 录制模式下转发的真实地址
+REAL_UPSTREAMS = {
+    "rapidapi": f"https://{RAPIDAPI_HOST}",
+    "openai": "https://api.openai.com/v1",
+    "pinecone": os.environ.get("PINECONE_UPSTREAM_HOST", ""),
+}
+# 本地替身上的路径前缀
+ROUTES = {"rapidapi": "/rapidapi", "openai": "/openai/v1", "pinecone": "/pinecone"}
+
+FAKE_EMBEDDING_DIM = 1536
+# 流式响应中每个分块之间的间隔, 模拟逐 token 输出
+FAKE_TOKEN_DELAY_MS = float(os.environ.get("FAKE_TOKEN_DELAY_MS", "15"))
+# 转发时不复制的请求头
+HOP_HEADERS = {"host", "content-length", "accept-encoding", "connection"}
+
+
+# ---------- 磁带库 ----------
+
+def cassette_key(service, method, path, query, body):
+    """请求的规范化哈希: 查询参数排序, JSON 请求体按键排序, 与请求头无关"""
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            body = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+    payload = json.dumps([service, method.upper(), path, sorted(query), body or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """录制的上游响应 - 以请求哈希为键, 多线程服务共享一个连接"""
+
+    def __init__(self, path=CASSETTE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cassettes (
+                key TEXT PRIMARY KEY,
+                service TEXT NOT NULL,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                content_type TEXT NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """返回 (status, content_type, body), 未录制时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, content_type, body FROM cassettes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0], row[1], bytes(row[2])
+
+    def put(self, key, service, method, path, status, content_type, body):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cassettes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, service, method, path, status, content_type, body, time.time())
+            )
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM cassettes").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": count}
+
+
+# ---------- 延迟与错误注入 ----------
+
+class FaultInjector:
+    """每个请求先等待 latency + 指数分布抖动 (形成长尾), 再按 error_rate 返回 429 / 500 / 503"""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.expovariate(1 / self.jitter_ms) if self.jitter_ms else 0
+        seconds = (self.latency_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def error_status(self):
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice([429, 500, 503])
+        return None
+
+
+# ---------- 合成响应 ----------
+
+def _seeded(*parts):
+    return random.Random(hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest())
+
+
+def fake_embedding(text, dim=FAKE_EMBEDDING_DIM):
+    """特征哈希向量: 相同文本得到相同向量, 共享词越多越相似"""
+    vector = [0.0] * dim
+    for token in str(text).lower().split():
+        bucket = int.from_bytes(hashlib.md5(token.encode("utf-8")).digest()[:4], "little")
+        vector[bucket % dim] += 1.0 if bucket & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def fake_linkedin_jobs(query):
+    """RapidAPI 职位搜索的合成结果"""
+    title = query.get("title_filter", "") or "General"
+    location = query.get("location_filter", "") or "Hong Kong"
+    limit = min(int(query.get("limit", 10) or 10), 100)
+    rng = _seeded("rapidapi", title, location)
+    return [
+        {
+            "id": f"fake-{rng.randrange(10 ** 9)}",
+            "title": f"{rng.choice(['Senior ', 'Junior ', ''])}{title}".strip(),
+            "organization": f"Company {rng.randrange(500)}",
+            "locations_derived": [location],
+            "date_posted": "2026-01-01",
+            "url": "https://www.linkedin.com/jobs/view/0",
+            "description_text": f"We are hiring a {title} in {location}.",
+        }
+        for _ in range(limit)
+    ]
+
+
+def _fake_resume_analysis(rng):
+    from resume_stream import RESUME_FIELDS
+
+    analysis = {}
+    for name, _ in RESUME_FIELDS:
+        if name == "confidence":
+            analysis[name] = round(rng.uniform(0.6, 0.95), 2)
+        elif name in ("skills", "core_strengths"):
+            analysis[name] = rng.sample(["Python", "SQL", "Excel", "Leadership", "Communication", "AWS"], 3)
+        else:
+            analysis[name] = f"synthetic {name.replace('_', ' ')}"
+    return analysis
+
+
+def fake_chat_content(body):
+    """按提示词生成确定性回复: 要求 JSON 时返回简历分析字段, 否则返回一段文本"""
+    messages = body.get("messages") or []
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    rng = _seeded("openai", body.get("model"), prompt)
+    if "JSON" in prompt:
+        return json.dumps(_fake_resume_analysis(rng), ensure_ascii=False)
+    return f"Synthetic reply #{rng.randrange(10 ** 6)}: please describe a project you are proud of."
+
+
+def _usage(prompt, completion):
+    prompt_tokens = max(1, len(prompt) // 4)
+    completion_tokens = max(1, len(completion) // 4)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def fake_chat_completion(body):
+    content = fake_chat_content(body)
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(json.dumps(body.get("messages")), content),
+    }
+
+
+def fake_chat_stream(body):
+    """流式对话的 SSE 事件 (每个元素是一个完整事件)"""
+    content = fake_chat_content(body)
+    base = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body.get("model", "gpt-4")}
+    pieces = [content[i:i + 12] for i in range(0, len(content), 12)]
+    for piece in pieces:
+        yield {**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield {**base, "choices": [], "usage": _usage(json.dumps(body.get("messages")), content)}
+
+
+def fake_embeddings(body):
+    inputs = body.get("input")
+    if not isinstance(inputs, list) or (inputs and isinstance(inputs[0], int)):
+        inputs = [inputs]
+    dim = int(body.get("dimensions") or FAKE_EMBEDDING_DIM)
+
+    data = []
+    for index, text in enumerate(inputs):
+        vector = fake_embedding(text, dim)
+        if body.get("encoding_format") == "base64":
+            vector = base64.b64encode(struct.pack(f"<{dim}f", *vector)).decode("ascii")
+        data.append({"object": "embedding", "index": index, "embedding": vector})
+    tokens = sum(max(1, len(str(text)) // 4) for text in inputs)
+    return {"object": "list", "data": data, "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+
+class FakePinecone:
+    """Pinecone 数据面接口的内存实现 (upsert / query / delete / describe_index_stats)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.namespaces = {}
+
+    def handle(self, path, body):
+        namespace = body.get("namespace", "")
+        with self._lock:
+            vectors = self.namespaces.setdefault(namespace, {})
+            if path == "/vectors/upsert":
+                for item in body.get("vectors", []):
+                    vectors[str(item["id"])] = (item["values"], item.get("metadata") or {})
+                return {"upsertedCount": len(body.get("vectors", []))}
+            if path == "/vectors/delete":
+                for vector_id in body.get("ids", []):
+                    vectors.pop(str(vector_id), None)
+                return {}
+            if path == "/query":
+                return {"namespace": namespace, "matches": self._query(vectors, body)}
+            if path == "/describe_index_stats":
+                counts = {name: {"vectorCount": len(items)} for name, items in self.namespaces.items()}
+                dimension = next((len(v[0]) for items in self.namespaces.values() for v in items.values()), 0)
+                return {"namespaces": counts, "dimension": dimension,
+                        "totalVectorCount": sum(c["vectorCount"] for c in counts.values())}
+        return None
+
+    @staticmethod
+    def _query(vectors, body):
+        query = body.get("vector") or []
+        query_norm = math.sqrt(sum(v * v for v in query)) or 1.0
+        scored = []
+        for vector_id, (values, metadata) in vectors.items():
+            norm = math.sqrt(sum(v * v for v in values)) or 1.0
+            score = sum(a * b for a, b in zip(query, values)) / (query_norm * norm)
+            scored.append((score, vector_id, metadata))
+        scored.sort(reverse=True)
+        return [
+            {"id": vector_id, "score": score, **({"metadata": metadata} if body.get("includeMetadata") else {})}
+            for score, vector_id, metadata in scored[:int(body.get("topK", 10))]
+        ]
+
+
+# ---------- 替身服务 ----------
+
+class FakeUpstreams:
+    """按模式处理一个上游请求, 返回 (status, content_type, body 或 SSE 事件迭代器)"""
+
+    def __init__(self, mode=UPSTREAM_MODE, store=None, injector=None):
+        if mode not in ("fake", "record", "replay"):
+            raise ValueError(f"Unknown upstream mode: {mode}")
+        self.mode = mode
+        self.store = store if store is not None or mode == "fake" else CassetteStore()
+        self.injector = injector or FaultInjector()
+        self.pinecone = FakePinecone()
+        if self.store is not None:
+            metrics.register_cache("upstream_cassettes", self.store.stats)
+
+    def handle(self, service, method, path, query, body, headers):
+        self.injector.delay()
+        status = self.injector.error_status()
+        if status is not None:
+            metrics.increment(f"replay.injected_error.{service}")
+            return status, "application/json", json.dumps({"error": {"message": "injected failure"}}).encode()
+
+        key = cassette_key(service, method, path, query, body)
+        if self.mode == "record":
+            return self._record(key, service, method, path, query, body, headers)
+        if self.mode == "replay":
+            recorded = self.store.get(key)
+            if recorded is not None:
+                return recorded
+            metrics.increment(f"replay.synthesized.{service}")
+        return self._synthesize(service, path, dict(query), body)
+
+    def _record(self, key, service, method, path, query, body, headers):
+        base = REAL_UPSTREAMS.get(service)
+        if not base:
+            raise ValueError(f"No real upstream configured for {service}")
+        url = base + path + (f"?{urlencode(query)}" if query else "")
+        forwarded = {name: value for name, value in headers.items() if name.lower() not in HOP_HEADERS}
+        request = Request(url, data=body or None, headers=forwarded, method=method)
+        try:
+            with urlopen(request, timeout=120) as response:
+                status, content_type, payload = response.status, response.headers.get("Content-Type", ""), response.read()
+        except HTTPError as e:
+            status, content_type, payload = e.code, e.headers.get("Content-Type", ""), e.read()
+        # 只录制成功响应, 限流和服务端错误由注入器模拟
+        if status < 400:
+            self.store.put(key, service, method, path, status, content_type, payload)
+        return status, content_type, payload
+
+    def _synthesize(self, service, path, query, body):
+        data = json.loads(body) if body else {}
+        if service == "rapidapi":
+            result = fake_linkedin_jobs(query)
+        elif service == "openai" and path == "/chat/completions":
+            if data.get("stream"):
+                return 200, "text/event-stream", fake_chat_stream(data)
+            result = fake_chat_completion(data)
+        elif service == "openai" and path == "/embeddings":
+            result = fake_embeddings(data)
+        elif service == "pinecone":
+            result = self.pinecone.handle(path, data)
+        else:
+            result = None
+        if result is None:
+            return 404, "application/json", json.dumps({"error": {"message": f"no fake for {path}"}}).encode()
+        return 200, "application/json", json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+
+def start_fake_upstreams(port=FAKE_UPSTREAM_PORT, host="127.0.0.1", upstreams=None):
+    """在后台线程启动本地替身服务, 返回 server (server.url 为 UPSTREAM_BASE_URL)"""
+    from http.server import BaseHTTPRequestHandler
+    from http.server import ThreadingHTTPServer
+
+    upstreams = upstreams or FakeUpstreams()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _dispatch(self):
+            parts = urlsplit(self.path)
+            service = next((name for name, prefix in ROUTES.items() if parts.path.startswith(prefix + "/")), None)
+            if service is None:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            start = time.perf_counter()
+            try:
+                status, content_type, payload = upstreams.handle(
+                    service, self.command, parts.path[len(ROUTES[service]):],
+                    parse_qsl(parts.query), body, dict(self.headers)
+                )
+            except Exception as e:
+                logger.exception("Fake upstream %s failed", service)
+                status, content_type, payload = 502, "application/json", json.dumps({"error": str(e)}).encode()
+            finally:
+                metrics.observe(f"fake_upstream.{service}", time.perf_counter() - start)
+
+            self.send_response(status)
+            self.send_header("Content-Type", content_type or "application/json")
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            if isinstance(payload, bytes) and content_type != "text/event-stream":
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            # 流式响应: 不设置长度, 逐个事件写出后关闭连接
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            events = payload.split(b"\n\n") if isinstance(payload, bytes) else (
+                b"data: " + json.dumps(event).encode("utf-8") for event in payload
+            )
+            for event in events:
+                if not event.strip():
+                    continue
+                self.wfile.write(event.rstrip(b"\n") + b"\n\n")
+                self.wfile.flush()
+                time.sleep(FAKE_TOKEN_DELAY_MS / 1000)
+            if not isinstance(payload, bytes):
+                self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+        do_GET = _dispatch
+        do_POST = _dispatch
+        do_DELETE = _dispatch
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="fake-upstreams", daemon=True).start()
+    logger.info("Fake upstreams (%s) on %s", upstreams.mode, server.url)
+    return server
+
+
+# ---------- 客户端重定向 ----------
+
+def _redirect_requests(host, target):
+    """backend 的 requests 调用改为请求替身 (替换 Session.request, 模块级 requests.get 同样生效)"""
+    try:
+        import requests
+    except ImportError:
+        return False
+
+    original = requests.Session.request
+    if getattr(original, "__redirected__", False):
+        return True
+    prefixes = (f"https://{host}", f"http://{host}")
+
+    def request(self, method, url, *args, **kwargs):
+        for prefix in prefixes:
+            if isinstance(url, str) and url.startswith(prefix):
+                url = target + url[len(prefix):]
+                break
+        return original(self, method, url, *args, **kwargs)
+
+    request.__redirected__ = True
+    requests.Session.request = request
+    return True
+
+
+def use_fake_upstreams(base_url=None):
+    """让本进程的所有上游客户端请求替身服务; 未设置 UPSTREAM_BASE_URL 时不做任何事"""
+    base_url = (base_url or UPSTREAM_BASE_URL).rstrip("/")
+    if not base_url:
+        return False
+    # OpenAI SDK 与 create_vector_store / AsyncLinkedInJobSearcher 从环境变量读取地址
+    os.environ["OPENAI_BASE_URL"] = base_url + ROUTES["openai"]
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    os.environ["PINECONE_HOST"] = base_url + ROUTES["pinecone"]
+    os.environ.setdefault("PINECONE_API_KEY", "replay")
+    os.environ.setdefault("PINECONE_INDEX", "replay")
+    os.environ["RAPIDAPI_BASE_URL"] = base_url + ROUTES["rapidapi"]
+    _redirect_requests(RAPIDAPI_HOST, base_url + ROUTES["rapidapi"])
+    logger.info("Upstream calls redirected to %s", base_url)
+    return True
+
+
+# ---------- 压测 ----------
+
+SAMPLE_CV = (
+    "Senior data analyst with 6 years of experience in Python, SQL and Tableau. "
+    "Led a team of four, built forecasting models, Master in Statistics, based in Hong Kong."
+)
+
+
+def run_session(index):
+    """一次完整的求职者流程: 简历分析 -> 职位搜索 -> 职位向量 -> 语义检索"""
+    from async_job_search import AsyncLinkedInJobSearcher
+    from async_job_search import normalize_job
+    from resume_stream import analyze_resume_text
+    from vector_store import create_vector_store
+    from vector_sync import embed_texts
+
+    with metrics.timed("load.session"):
+        with metrics.timed("load.resume_analysis"):
+            analysis = analyze_resume_text(f"{SAMPLE_CV} Candidate #{index}.")
+        searcher = _shared("searcher", lambda: AsyncLinkedInJobSearcher(os.environ.get("RAPIDAPI_KEY", "replay")))
+        with metrics.timed("load.job_search"):
+            jobs = [normalize_job(job) for job in searcher.search_profile({
+                "primary_role": str(analysis.get("primary_role", "")),
+                "simple_search_terms": str(analysis.get("simple_search_terms", "")),
+                "hard_skills": ", ".join(analysis.get("skills") or []),
+            }, limit=20)]
+        with metrics.timed("load.embeddings"):
+            vectors = embed_texts([f"{job['title']} {job['description']}" for job in jobs] or ["empty"])
+        store = _shared("store", create_vector_store)
+        with metrics.timed("load.vector_query"):
+            store.upsert([job["id"] or str(i) for i, job in enumerate(jobs)], vectors[:len(jobs)])
+            store.query(vectors[0], top_k=10)
+
+
+_shared_objects = {}
+_shared_lock = threading.Lock()
+
+
+def _shared(name, factory):
+    with _shared_lock:
+        if name not in _shared_objects:
+            _shared_objects[name] = factory()
+        return _shared_objects[name]
+
+
+def load_test(sessions, concurrency):
+    """并发执行 sessions 次完整流程, 返回吞吐与各阶段分位数"""
+    metrics.reset()
+    start = time.perf_counter()
+    failures = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(run_session, i) for i in range(sessions)]:
+            try:
+                future.result()
+            except Exception as e:
+                failures += 1
+                logger.warning("Session failed: %s", e)
+    elapsed = time.perf_counter() - start
+    stages = {name: stats for name, stats in metrics.snapshot()["stages"].items() if name.startswith("load.")}
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_s": round(sessions / elapsed, 3) if elapsed else 0.0,
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay stand-ins for Smart Career upstream services")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="run the fake upstream server")
+    serve.add_argument("--mode", choices=["fake", "record", "replay"], default=UPSTREAM_MODE)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=FAKE_UPSTREAM_PORT)
+    serve.add_argument("--cassettes", default=CASSETTE_PATH)
+    serve.add_argument("--latency-ms", type=float, default=0)
+    serve.add_argument("--jitter-ms", type=float, default=0, help="mean of the exponential tail added to latency")
+    serve.add_argument("--error-rate", type=float, default=0.0)
+    serve.add_argument("--seed", type=int)
+
+    load = commands.add_parser("load", help="drive the resume -> search -> ranking pipeline")
+    load.add_argument("--base-url", help="running fake server; starts an in-process one when omitted")
+    load.add_argument("--sessions", type=int, default=100)
+    load.add_argument("--concurrency", type=int, default=8)
+    load.add_argument("--latency-ms", type=float, default=0, help="for the in-process server")
+    load.add_argument("--jitter-ms", type=float, default=0)
+    load.add_argument("--error-rate", type=float, default=0.0)
+    load.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "serve":
+        upstreams = FakeUpstreams(
+            args.mode,
+            store=CassetteStore(args.cassettes) if args.mode != "fake" else None,
+            injector=FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+        )
+        server = start_fake_upstreams(args.port, args.host, upstreams)
+        print(f"Fake upstreams ({args.mode}) listening on {server.url}; set UPSTREAM_BASE_URL={server.url}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    base_url = args.base_url
+    if not base_url:
+        injector = FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, seed=0)
+        base_url = start_fake_upstreams(0, upstreams=FakeUpstreams("fake", injector=injector)).url
+    os.environ["VECTOR_STORE"] = "pinecone"
+    use_fake_upstreams(base_url)
+
+    report = load_test(args.sessions, args.concurrency)
+    print(f"{report['sessions']} sessions in {report['elapsed_s']}s ({report['sessions_per_s']}/s), "
+          f"{report['failures']} failed")
+    for name, stats in sorted(report["stages"].items()):
+        print(f"  {name:24s} p50 {stats['p50_s'] * 1000:8.1f} ms  p95 {stats['p95_s'] * 1000:8.1f} ms  "
+              f"p99 {stats['p99_s'] * 1000:8.1f} ms")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import json
+import os
+
+from document_extract import extract_cv_text
+from metrics import instrument
+from metrics import metrics
+
+
+RESUME_STREAM_MODEL = os.environ.get("RESUME_STREAM_MODEL", "gpt-4")
+RESUME_STREAM_PROMPT_VERSION = "stream-v1"
+
+# 字段顺序即模型输出顺序 - 页面最先需要的字段放在前面, 以便尽早显示
+RESUME_FIELDS = [
+    ("primary_role", "string, the single best-fit job title"),
+    ("confidence", "number between 0 and 1"),
+    ("seniority_level", "string, e.g. Junior / Mid / Senior / Lead"),
+    ("skills", "array of technical skills"),
+    ("core_strengths", "array of 3-6 core strengths"),
+    ("simple_search_terms", "string, 2-4 comma separated job search keywords"),
+    ("education_level", "one of PhD, Master, Bachelor, Diploma, High School"),
+    ("major", "string"),
+    ("graduation_status", "one of Graduated, Fresh graduates, Currently studying"),
+    ("university_background", "one of 985 Universities, 211 Universities, Overseas Universities, Regular Undergraduate Universities, Other"),
+    ("languages", "array of languages"),
+    ("certificates", "array of certificates"),
+    ("work_experience", "one of Recent Graduate, 1-3 years, 3-5 years, 5-10 years, 10+ years"),
+    ("project_experience", "string, short summary of key projects"),
+    ("location_preference", "one of Hong Kong, Mainland China, Overseas, No Preference"),
+    ("industry_preference", "string"),
+    ("salary_expectation", "string"),
+    ("benefits_expectation", "string"),
+]
+
+# save_job_seeker_info 的参数顺序 (也是 job_seekers 表中的列名)
+PROFILE_COLUMNS = [
+    "education_level", "major", "graduation_status", "university_background",
+    "languages", "certificates", "hard_skills", "soft_skills", "work_experience",
+    "project_experience", "location_preference", "industry_preference",
+    "salary_expectation", "benefits_expectation",
+    "primary_role", "simple_search_terms",
+]
+
+
+def format_ai_data(data, default=""):
+    """格式化AI返回的数据"""
+    if isinstance(data, list):
+        return ", ".join(data)
+    elif isinstance(data, str):
+        return data
+    else:
+        return default
+
+
+def build_autofill_data(ai_analysis):
+    """从AI分析结果 (可以是部分结果) 提取表单数据"""
+    return {
+        # 教育背景
+        "education_level": format_ai_data(ai_analysis.get('education_level', '')),
+        "major": format_ai_data(ai_analysis.get('major', '')),
+        "graduation_status": format_ai_data(ai_analysis.get('graduation_status', '')),
+        "university_background": format_ai_data(ai_analysis.get('university_background', '')),
+
+        # 语言和证书
+        "languages": format_ai_data(ai_analysis.get('languages', '')),
+        "certificates": format_ai_data(ai_analysis.get('certificates', '')),
+
+        # 技能 - 直接使用检测到的技能
+        "hard_skills": format_ai_data(ai_analysis.get('skills', [])),  # 使用检测到的技能
+        "soft_skills": format_ai_data(ai_analysis.get('core_strengths', [])),  # 使用核心优势
+
+        # 工作经验
+        "work_experience": format_ai_data(ai_analysis.get('work_experience', '')),
+        "project_experience": format_ai_data(ai_analysis.get('project_experience', '')),
+
+        # 偏好
+        "location_preference": format_ai_data(ai_analysis.get('location_preference', '')),
+        "industry_preference": format_ai_data(ai_analysis.get('industry_preference', '')),
+
+        # 薪资
+        "salary_expectation": format_ai_data(ai_analysis.get('salary_expectation', '')),
+        "benefits_expectation": format_ai_data(ai_analysis.get('benefits_expectation', '')),
+
+        # 新增字段
+        "primary_role": format_ai_data(ai_analysis.get('primary_role', '')),
+        "simple_search_terms": format_ai_data(ai_analysis.get('simple_search_terms', ''))
+    }
+
+
+def build_messages(cv_text):
+    """构建要求模型按固定字段顺序输出JSON的提示词"""
+    field_lines = "\n".join(f'- "{name}": {description}' for name, description in RESUME_FIELDS)
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are a career analyst. Analyze the CV and reply with ONE JSON object only, "
+                "no markdown. Emit the keys in exactly this order:\n" + field_lines
+            ),
+        },
+        {"role": "user", "content": cv_text[:12000]},
+    ]
+
+
+class IncrementalJSONParser:
+    """增量解析流式输出的JSON对象, 每个顶层字段一完成就返回 (key, value)"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.started = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+
+    def feed(self, chunk):
+        """追加一段文本, 返回本次新完成的字段列表"""
+        self.buffer += chunk
+        completed = []
+
+        while self.position < len(self.buffer):
+            i = self.position
+            char = self.buffer[i]
+            self.position += 1
+
+            # 跳过 ```json 之类的前缀, 直到对象开始
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.key is None and self.value_start is None:
+                        self.key = json.loads(self.buffer[self.key_start:i + 1])
+                continue
+
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.key is None and self.value_start is None:
+                    self.key_start = i
+            elif char == ":" and self.depth == 1 and self.key is not None and self.value_start is None:
+                self.value_start = i + 1
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    completed.extend(self._complete_value(i))
+            elif char == "," and self.depth == 1:
+                completed.extend(self._complete_value(i))
+
+        return completed
+
+    def _complete_value(self, end):
+        if self.key is None or self.value_start is None:
+            return []
+        raw = self.buffer[self.value_start:end].strip()
+        key = self.key
+        self.key = None
+        self.value_start = None
+        try:
+            return [(key, json.loads(raw))]
+        except json.JSONDecodeError:
+            return []
+
+
+@instrument("resume.stream_analysis")
+def stream_resume_analysis(upload, filename, on_field=None, model=RESUME_STREAM_MODEL, client=None):
+    """流式分析简历: 每解析出一个字段就回调 on_field(key, value, partial), 返回 (resume_data, ai_analysis)"""
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI()
+
+    # 文本提取在进程池中完成, 不阻塞服务器线程
+    cv_text = extract_cv_text(upload, filename)
+    stream = client.chat.completions.create(
+        model=model,
+        messages=build_messages(cv_text),
+        temperature=0,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+
+    parser = IncrementalJSONParser()
+    ai_analysis = {}
+    for chunk in stream:
+        # 最后一个分块只包含 token 用量
+        if getattr(chunk, "usage", None):
+            metrics.record_tokens(model, chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for key, value in parser.feed(delta):
+            ai_analysis[key] = value
+            if on_field:
+                on_field(key, value, ai_analysis)
+
+    resume_data = {"filename": filename, "text": cv_text}
+    return resume_data, ai_analysis
+
+
+def analyze_resume_text(cv_text, model=RESUME_STREAM_MODEL, client=None):
+    """非流式分析已提取的简历文本 (批量导入使用), 提示词与流式分析相同"""
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI()
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=build_messages(cv_text),
+        temperature=0
+    )
+    content = response.choices[0].message.content or ""
+    ai_analysis = dict(IncrementalJSONParser().feed(content))
+    if not ai_analysis:
+        raise ValueError("Resume analysis did not return a JSON object")
+    return ai_analysis
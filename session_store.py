@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+
+from db_pool import get_connection
+from db_pool import transaction
+
+
+# 浏览器会话数据 (简历分析、表单自动填充、面试记录) 的持久化存储
+SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH", "session_store.db")
+SESSION_TTL = int(os.environ.get("SESSION_TTL_HOURS", "72")) * 3600
+CLEANUP_INTERVAL = 600
+# 超过该大小的值压缩存储
+COMPRESS_THRESHOLD = 512
+
+
+def pack(value):
+    """紧凑序列化: 无空白的 JSON, 较大的值用 zlib 压缩, 首字节标记格式"""
+    data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(data) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(data, 6)
+    return b"j" + data
+
+
+def unpack(blob):
+    blob = bytes(blob)
+    data = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    return json.loads(data.decode("utf-8"))
+
+
+class SessionStore:
+    """基于SQLite的会话状态 - st.session_state 只保存会话ID, 数据按需读取, 过期会话定期清理
+
+    值 (value) 整体读写; 记录 (segment) 只追加, 可以按区间读取, 适合面试记录这类逐条增长的数据.
+    """
+
+    def __init__(self, path=SESSION_STORE_PATH, ttl_seconds=SESSION_TTL):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+        self._init_tables()
+
+    def _init_tables(self):
+        with transaction(self.path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS session_values (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (session_id, name)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS session_segments (
+                    session_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (session_id, name, seq)
+                ) WITHOUT ROWID
+            ''')
+
+    # ---------- 会话 ----------
+
+    def new_session(self):
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with transaction(self.path) as conn:
+            conn.execute("INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?)",
+                         (session_id, now, now))
+        return session_id
+
+    def exists(self, session_id):
+        row = get_connection(self.path).execute(
+            "SELECT updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl_seconds
+
+    def _touch(self, conn, session_id):
+        conn.execute(
+            "INSERT INTO sessions (session_id, created_at, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, time.time(), time.time())
+        )
+
+    def drop(self, session_id):
+        """删除一个会话的全部数据"""
+        with transaction(self.path) as conn:
+            self._delete_sessions(conn, [session_id])
+
+    # ---------- 值 ----------
+
+    def get(self, session_id, name, default=None):
+        row = get_connection(self.path).execute(
+            "SELECT payload FROM session_values WHERE session_id = ? AND name = ?", (session_id, name)
+        ).fetchone()
+        return unpack(row[0]) if row else default
+
+    def set(self, session_id, name, value):
+        with transaction(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_values (session_id, name, payload) VALUES (?, ?, ?)",
+                (session_id, name, pack(value))
+            )
+            self._touch(conn, session_id)
+
+    def delete(self, session_id, name):
+        """删除一个值及同名的全部记录"""
+        with transaction(self.path) as conn:
+            conn.execute("DELETE FROM session_values WHERE session_id = ? AND name = ?", (session_id, name))
+            conn.execute("DELETE FROM session_segments WHERE session_id = ? AND name = ?", (session_id, name))
+            self._touch(conn, session_id)
+
+    # ---------- 记录 ----------
+
+    def append_segment(self, session_id, name, segment):
+        """追加一条记录, 返回其序号 (从0开始)"""
+        with transaction(self.path) as conn:
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM session_segments WHERE session_id = ? AND name = ?",
+                (session_id, name)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO session_segments (session_id, name, seq, payload) VALUES (?, ?, ?, ?)",
+                (session_id, name, seq, pack(segment))
+            )
+            self._touch(conn, session_id)
+        return seq
+
+    def segment_count(self, session_id, name):
+        return get_connection(self.path).execute(
+            "SELECT COUNT(*) FROM session_segments WHERE session_id = ? AND name = ?", (session_id, name)
+        ).fetchone()[0]
+
+    def segments(self, session_id, name, start=0, stop=None):
+        """按序号区间 [start, stop) 读取记录, 只解压需要的部分"""
+        sql = "SELECT payload FROM session_segments WHERE session_id = ? AND name = ? AND seq >= ?"
+        params = [session_id, name, start]
+        if stop is not None:
+            sql += " AND seq < ?"
+            params.append(stop)
+        rows = get_connection(self.path).execute(sql + " ORDER BY seq", params).fetchall()
+        return [unpack(row[0]) for row in rows]
+
+    # ---------- 清理 ----------
+
+    def _delete_sessions(self, conn, session_ids):
+        for table in ("session_values", "session_segments", "sessions"):
+            conn.executemany(f"DELETE FROM {table} WHERE session_id = ?", [(sid,) for sid in session_ids])
+
+    def cleanup(self):
+        """删除超过TTL未更新的会话, 返回删除的会话数"""
+        cutoff = time.time() - self.ttl_seconds
+        with transaction(self.path) as conn:
+            expired = [row[0] for row in conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            )]
+            if expired:
+                self._delete_sessions(conn, expired)
+        return len(expired)
+
+    def maybe_cleanup(self):
+        """每个进程最多每 CLEANUP_INTERVAL 秒清理一次"""
+        with self._lock:
+            now = time.time()
+            if now - self._last_cleanup < CLEANUP_INTERVAL:
+                return 0
+            self._last_cleanup = now
+        return self.cleanup()
+
+    def stats(self):
+        conn = get_connection(self.path)
+        sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        stored = conn.execute(
+            "SELECT (SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM session_values)"
+            " + (SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM session_segments)"
+        ).fetchone()[0]
+        return {"sessions": sessions, "bytes": stored}
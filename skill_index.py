@@ -0,0 +1,116 @@
+import sqlite3
+import threading
+
+from batch_scoring import NO_SKILL_SCORE_CEILING
+from batch_scoring import split_skills
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+
+
+def _role_tokens(text):
+    return {token for token in str(text or "").lower().replace(",", " ").split() if len(token) > 1}
+
+
+def _location_key(text):
+    return str(text or "").strip().lower()
+
+
+class SkillIndex:
+    """求职者倒排索引: 技能 / 角色词 / 地点 -> 求职者ID集合"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skills = {}
+        self.roles = {}
+        self.locations = {}
+        self._entries = {}
+        self.last_row_id = 0
+
+    @classmethod
+    def from_database(cls, db_path=JOB_SEEKER_DB):
+        """从 job_seekers 表构建索引"""
+        index = cls()
+        index.refresh(db_path)
+        return index
+
+    def refresh(self, db_path=JOB_SEEKER_DB):
+        """增量加载上次之后新插入的求职者 (例如 bulk_ingest.py 批量导入的), 返回新增数量"""
+        try:
+            rows = get_connection(db_path).execute(
+                "SELECT id, job_seeker_id, hard_skills, primary_role, location_preference "
+                "FROM job_seekers WHERE id > ? ORDER BY id",
+                (self.last_row_id,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            # 表尚未创建
+            rows = []
+
+        for row in rows:
+            self.add_seeker(*row[1:])
+        if rows:
+            self.last_row_id = rows[-1][0]
+        return len(rows)
+
+    def add_seeker(self, job_seeker_id, hard_skills, primary_role, location_preference):
+        """新增或更新一个求职者的索引条目 (save_job_seeker_info 之后调用)"""
+        seeker_id = str(job_seeker_id)
+        skills = set(split_skills(hard_skills))
+        roles = _role_tokens(primary_role)
+        location = _location_key(location_preference)
+
+        with self._lock:
+            self._remove(seeker_id)
+            for skill in skills:
+                self.skills.setdefault(skill, set()).add(seeker_id)
+            for role in roles:
+                self.roles.setdefault(role, set()).add(seeker_id)
+            if location:
+                self.locations.setdefault(location, set()).add(seeker_id)
+            self._entries[seeker_id] = (skills, roles, location)
+
+    def _remove(self, seeker_id):
+        entry = self._entries.pop(seeker_id, None)
+        if entry is None:
+            return
+        skills, roles, location = entry
+        for key, postings in [(s, self.skills) for s in skills] + [(r, self.roles) for r in roles] + [(location, self.locations)]:
+            ids = postings.get(key)
+            if ids is not None:
+                ids.discard(seeker_id)
+                if not ids:
+                    del postings[key]
+
+    def candidates_for_skills(self, required_skills):
+        """与职位至少共享一项技能的求职者 (技能名经 split_skills 规范化后完全匹配)"""
+        result = set()
+        with self._lock:
+            for skill in split_skills(required_skills):
+                result |= self.skills.get(skill, set())
+        return result
+
+    def candidates_for_role(self, role):
+        """职位名称中任一关键词匹配的求职者"""
+        result = set()
+        with self._lock:
+            for token in _role_tokens(role):
+                result |= self.roles.get(token, set())
+        return result
+
+    def candidates_for_location(self, location):
+        """地点偏好完全一致的求职者"""
+        with self._lock:
+            return set(self.locations.get(_location_key(location), set()))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def prefilter_candidates(index, matrix, job_row, min_score):
+    """用倒排索引缩小候选集, 返回矩阵中的行下标数组; 无法筛选时返回 None (全部求职者)
+
+    不共享任何技能的求职者分数上限为 NO_SKILL_SCORE_CEILING, 阈值不高于它时不筛选.
+    """
+    required = split_skills(job_row[4])
+    if not required or not len(index) or min_score <= NO_SKILL_SCORE_CEILING:
+        return None
+    return matrix.indices_for(index.candidates_for_skills(job_row[4]))
@@ -1,35 +1,45 @@
 import streamlit as st
-import sqlite3
-import pinecone
-import pandas as pd
-
-from backend import JobSeekerBackend
-from backend import LinkedInJobSearcher
-from backend import get_all_jobs_for_matching
-from backend import get_all_job_seekers
-from backend import analyze_match_simple
-from backend import show_match_statistics
-from backend import show_instructions
-
-from backend import get_jobs_for_interview
-from backend import get_job_seeker_profile
-from backend import ai_interview_page
-
-from database import JobSeekerDB
-from database import HeadhunterDB
-
-db = JobSeekerDB()
-db2 = HeadhunterDB()
-
-from database import save_job_seeker_info
-from database import save_head_hunter_job
-from database import init_database
-from database import init_head_hunter_database
-from database import get_job_seeker_search_fields
-from config import Config
+
+# 重量级模块 (backend / database / numpy / pinecone / openai) 按页面延迟导入,
+# 启动预算由 benchmarks/startup_budget.py 检查
+from db_pool import JOB_SEEKER_DB
+from db_pool import get_connection
+from cache import DiskCache
+from cache import resume_cache_key
+from document_extract import extract_cv_text
+from document_extract import text_upload
+from resume_stream import RESUME_STREAM_MODEL
+from resume_stream import RESUME_STREAM_PROMPT_VERSION
+from resume_stream import build_autofill_data
+from resume_stream import stream_resume_analysis
+from job_search import build_search_keywords
+from job_search import profile_fingerprint
+from job_search import search_and_match_cached
+from headhunter_search import count_head_hunter_jobs
+from headhunter_search import query_head_hunter_jobs
+from job_stats import get_job_statistics
+from job_import import COMPANY_SIZES
+from job_import import CURRENCIES
+from job_import import EMPLOYMENT_TYPES
+from job_import import EXPERIENCE_LEVELS
+from job_import import INDUSTRIES
+from job_import import JOB_COLUMNS
+from job_import import VISA_OPTIONS
+from job_import import WORK_LOCATIONS
+from job_import import WORK_TYPES
+from job_import import import_upload
+from job_import import validate_job
+from migrations import run_migrations
+from session_store import SessionStore
+from lazy_loader import BackgroundLoader
+from metrics import METRICS_PORT
+from metrics import metrics
+from metrics import prometheus_text
+from metrics import start_metrics_server
 
 import json
 from datetime import datetime
+from datetime import timedelta
 
 # Page config
 st.set_page_config(
@@ -38,17 +48,180 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize backend
+
+def _instrument_upstreams():
+    """为 backend / database 中的上游调用和数据库方法计时 (替换类和模块属性, 内部调用同样生效)"""
+    import backend
+    import database
+    from llm_cache import cache_llm_attributes
+    from metrics import instrument_attributes
+    from metrics import instrument_openai
+
+    generators = [name for name in dir(backend) if name.startswith(("generate_", "evaluate_"))]
+    # 匹配分析与面试生成按 (模型, 提示词, 输入行) 缓存; 先加缓存再计时, 计时包含缓存命中
+    cache_llm_attributes(backend, "backend", ["analyze_match_simple"] + generators)
+
+    instrument_attributes(backend.JobSeekerBackend, "backend", ["process_resume", "search_and_match_jobs"])
+    instrument_attributes(backend.LinkedInJobSearcher, "rapidapi", ["search_jobs"])
+    instrument_attributes(backend, "backend", [
+        "analyze_match_simple", "get_all_jobs_for_matching", "get_all_job_seekers",
+        "get_jobs_for_interview", "get_job_seeker_profile",
+    ] + generators)
+    instrument_attributes(database.JobSeekerDB, "db.job_seeker")
+    instrument_attributes(database.HeadhunterDB, "db.head_hunter")
+    instrument_attributes(database, "db")
+    instrument_openai()
+
+
+def _create_backend():
+    import backend
+    from async_job_search import use_parallel_job_search
+
+    # search_and_match_jobs 内部的 LinkedIn 搜索拆成聚焦查询并行执行, 每个查询仍走原来的请求; 先替换再计时
+    use_parallel_job_search(backend.LinkedInJobSearcher)
+    _instrument_upstreams()
+    return backend.JobSeekerBackend()
+
+
+def _create_skill_index():
+    from skill_index import SkillIndex
+    return SkillIndex.from_database()
+
+
+def _start_vector_sync():
+    from vector_store import create_vector_store
+    from vector_sync import EMBEDDING_DIM
+    from vector_sync import VectorSyncWorker
+
+    worker = VectorSyncWorker(create_vector_store(dim=EMBEDDING_DIM))
+    worker.start()
+    return worker
+
+
+def _start_match_worker():
+    from match_scores import MatchScoreWorker
+
+    worker = MatchScoreWorker()
+    worker.start()
+    return worker
+
+
+# Initialize database - 建表和迁移每个进程只在后台执行一次, rerun 不再做任何 DDL
+def bootstrap_databases():
+    import database
+    from database import init_database
+    from database import init_head_hunter_database
+    from db_pool import use_pooled_connections
+
+    # JobSeekerDB / HeadhunterDB 与 save_job_seeker_info 等辅助函数内部的 sqlite3.connect 改用连接池
+    use_pooled_connections(database)
+    init_database()
+    init_head_hunter_database()
+    return run_migrations()
+
+# 后台预热: 进程启动后立即在后台构建, 页面首次使用时通常已就绪
 @st.cache_resource
+def prewarm_loaders():
+    from replay import use_fake_upstreams
+
+    # 设置 UPSTREAM_BASE_URL 时, 在任何客户端创建前把上游请求改为发往本地录制 / 回放替身
+    use_fake_upstreams()
+    databases = BackgroundLoader(bootstrap_databases, "databases").start()
+
+    def after_databases(factory):
+        # 其余组件都读写数据库, 先等待建表和迁移完成
+        def build():
+            databases.get()
+            return factory()
+        return build
+
+    from vector_sync import VECTOR_SYNC_ENABLED
+
+    loaders = {
+        "databases": databases,
+        # Initialize backend
+        "backend": BackgroundLoader(after_databases(_create_backend), "backend").start(),
+        # 求职者技能倒排索引 - 进程内构建一次, 保存求职者时增量更新
+        "skill_index": BackgroundLoader(after_databases(_create_skill_index), "skill_index").start(),
+        # 职位 x 求职者匹配分数表 - 后台全量构建, 之后随求职者保存 / 职位发布增量更新
+        "match_scores": BackgroundLoader(after_databases(_start_match_worker), "match_scores").start(),
+    }
+    if VECTOR_SYNC_ENABLED:
+        # 职位向量后台同步 - 发布职位只写入队列, 向量生成与写入在后台批量完成 (默认关闭, 见 vector_sync.py)
+        loaders["vector_sync"] = BackgroundLoader(after_databases(_start_vector_sync), "vector_sync").start()
+    return loaders
+
+loaders = prewarm_loaders()
+
+
+def require_databases():
+    """使用数据库前调用; 建表和迁移通常早已在后台完成"""
+    loaders["databases"].get()
+
+
 def load_backend():
-    return JobSeekerBackend()
+    return loaders["backend"].get()
+
+
+def load_skill_index():
+    return loaders["skill_index"].get()
+
+
+def wake_workers(*names):
+    """通知后台线程有新数据; 线程尚未就绪或未启用时无需唤醒, 启动后会从队列中读取"""
+    for name in names:
+        loader = loaders.get(name)
+        worker = loader.peek() if loader else None
+        if worker:
+            worker.wake()
+
+
+# 简历分析磁盘缓存 - 同一份简历重复上传时不再调用GPT-4
+@st.cache_resource
+def load_resume_cache():
+    return DiskCache("resume_cache.db", ttl_seconds=30 * 24 * 3600, max_entries=2000)
+
+resume_cache = load_resume_cache()
+metrics.register_cache("resume_analysis", resume_cache.stats)
+
+
+# 会话数据 (简历分析、表单自动填充、面试记录) 存在SQLite中, st.session_state 只保存会话ID
+@st.cache_resource
+def load_session_store():
+    return SessionStore()
+
+session_store = load_session_store()
+
 
-backend = load_backend()
+def current_session_id():
+    """当前浏览器会话的存储句柄 - 只保存在 st.session_state 中, 不出现在URL里
 
+    会话ID可以读取该会话的简历分析和面试记录, 因此不能出现在可分享、可被记录的链接中.
+    代价是服务重启或打开新标签页后从新会话开始, 旧会话的数据由TTL清理.
+    """
+    session_id = st.session_state.get('session_handle')
+    if session_id is None:
+        session_id = st.session_state.session_handle = session_store.new_session()
+        session_store.maybe_cleanup()
+    if "sid" in st.query_params:
+        # 旧版本写入URL的句柄 - 不再接受, 从地址栏移除
+        del st.query_params["sid"]
+    return session_id
 
-# Initialize database
-init_database()
-init_head_hunter_database()
+
+# Prometheus 导出 - 设置 METRICS_PORT 后在独立端口提供 /metrics
+@st.cache_resource
+def start_metrics_exporter():
+    if METRICS_PORT:
+        return start_metrics_server(METRICS_PORT)
+    return None
+
+start_metrics_exporter()
+
+PUBLISHED_JOBS_PAGE_SIZE = 20
+
+# 分析结果中有固定占位符的字段
+ANALYSIS_SLOT_FIELDS = ['primary_role', 'confidence', 'seniority_level', 'skills', 'core_strengths']
 
 # Initialize session state
 if 'current_page' not in st.session_state:
@@ -72,14 +245,70 @@ def main_analyzer_page():
                 return i
         return 0
 
-    def format_ai_data(data, default=""):
-        """格式化AI返回的数据"""
-        if isinstance(data, list):
-            return ", ".join(data)
-        elif isinstance(data, str):
-            return data
-        else:
-            return default
+    def create_analysis_slots():
+        """为分析结果创建占位符"""
+        col1, col2, col3 = st.columns(3)
+        slots = {
+            'primary_role': col1.empty(),
+            'confidence': col2.empty(),
+            'seniority_level': col3.empty(),
+        }
+        slots['primary_role'].metric("🎯 Primary Role", "…")
+        slots['confidence'].metric("💯 Confidence", "…")
+        slots['seniority_level'].metric("📊 Seniority", "…")
+
+        # Skills detected by GPT-4
+        st.markdown("### 💡 Skills Detected by GPT-4")
+        slots['skills'] = st.empty()
+        slots['skills'].caption("Waiting for skills...")
+
+        # Core strengths
+        st.markdown("### 💪 Core Strengths")
+        slots['core_strengths'] = st.empty()
+        return slots
+
+    def render_analysis_field(slots, key, value):
+        """把一个已解析的字段渲染到对应占位符"""
+        if key == 'primary_role':
+            slots[key].metric("🎯 Primary Role", value or 'N/A')
+
+        elif key == 'confidence':
+            try:
+                confidence = float(value or 0) * 100
+            except (TypeError, ValueError):
+                confidence = 0
+            slots[key].metric("💯 Confidence", f"{confidence:.0f}%")
+
+        elif key == 'seniority_level':
+            slots[key].metric("📊 Seniority", value or 'N/A')
+
+        elif key == 'skills':
+            skills = value or []
+            with slots[key].container():
+                if skills:
+                    # Create skill tags
+                    skills_html = ""
+                    for skill in skills[:10]:
+                        skills_html += f'<span style="background-color: #E8F4FD; padding: 5px 10px; margin: 3px; border-radius: 5px; display: inline-block;">{skill}</span> '
+                    st.markdown(skills_html, unsafe_allow_html=True)
+
+                    if len(skills) > 10:
+                        with st.expander(f"➕ Show all {len(skills)} skills"):
+                            more_skills_html = ""
+                            for skill in skills[10:]:
+                                more_skills_html += f'<span style="background-color: #F0F0F0; padding: 5px 10px; margin: 3px; border-radius: 5px; display: inline-block;">{skill}</span> '
+                            st.markdown(more_skills_html, unsafe_allow_html=True)
+                else:
+                    st.warning("⚠️ No skills detected")
+
+        elif key == 'core_strengths':
+            strengths = value or []
+            with slots[key].container():
+                if strengths:
+                    cols = st.columns(min(3, len(strengths)))
+                    for i, strength in enumerate(strengths):
+                        with cols[i % len(cols)]:
+                            st.info(f"✓ {strength}")
 
     # Main Page - CV Upload Section
     st.header("📁 Upload Your CV")
@@ -93,105 +322,92 @@ def main_analyzer_page():
     if cv_file:
         st.success(f"✅ Uploaded: **{cv_file.name}**")
 
+        # 默认使用 backend.process_resume; 流式模式使用 resume_stream 自己的提示词, resume_data 只包含文件名和文本
+        stream_analysis = st.toggle("⚡ Stream results as they arrive", value=False, key="stream_analysis",
+                                    help="Show each part of the analysis and fill the profile fields as soon as "
+                                         "GPT-4 produces them (uses a separate streaming prompt)")
+
         if st.button("🔍 Analyze with GPT-4", type="primary", use_container_width=True, key="analyze_button"):
 
             # STEP 1: Analyze Resume
-            with st.spinner("🤖 Step 1/2: Analyzing your resume with GPT-4..."):
-                try:
-                    resume_data, ai_analysis = backend.process_resume(cv_file, cv_file.name)
-                    
-                    st.balloons()
-
-                    # 展示分析結果
-                    st.markdown("---")
-                    st.subheader("🤖 GPT-4 Career Analysis")
-
-                    col1, col2, col3 = st.columns(3)
-
-                    with col1:
-                        primary_role = ai_analysis.get('primary_role', 'N/A')
-                        st.metric("🎯 Primary Role", primary_role)
-
-                    with col2:
-                        confidence = ai_analysis.get('confidence', 0) * 100
-                        st.metric("💯 Confidence", f"{confidence:.0f}%")
-
-                    with col3:
-                        st.metric("📊 Seniority", ai_analysis.get('seniority_level', 'N/A'))
-
-                    # Skills detected by GPT-4
-                    st.markdown("### 💡 Skills Detected by GPT-4")
-                    skills = ai_analysis.get('skills', [])
-                    if skills:
-                        # Create skill tags
-                        skills_html = ""
-                        for skill in skills[:10]:
-                            skills_html += f'<span style="background-color: #E8F4FD; padding: 5px 10px; margin: 3px; border-radius: 5px; display: inline-block;">{skill}</span> '
-                        st.markdown(skills_html, unsafe_allow_html=True)
-
-                        if len(skills) > 10:
-                            with st.expander(f"➕ Show all {len(skills)} skills"):
-                                more_skills_html = ""
-                                for skill in skills[10:]:
-                                    more_skills_html += f'<span style="background-color: #F0F0F0; padding: 5px 10px; margin: 3px; border-radius: 5px; display: inline-block;">{skill}</span> '
-                                st.markdown(more_skills_html, unsafe_allow_html=True)
-                    else:
-                        st.warning("⚠️ No skills detected")
-
-                    # Core strengths
-                    st.markdown("### 💪 Core Strengths")
-                    strengths = ai_analysis.get('core_strengths', [])
-                    if strengths:
-                        cols = st.columns(min(3, len(strengths)))
-                        for i, strength in enumerate(strengths):
-                            with cols[i % len(cols)]:
-                                st.info(f"✓ {strength}")
-
-                    # 提取并格式化数据
-                    autofill_data = {
-                        # 教育背景
-                        "education_level": format_ai_data(ai_analysis.get('education_level', '')),
-                        "major": format_ai_data(ai_analysis.get('major', '')),
-                        "graduation_status": format_ai_data(ai_analysis.get('graduation_status', '')),
-                        "university_background": format_ai_data(ai_analysis.get('university_background', '')),
-                        
-                        # 语言和证书
-                        "languages": format_ai_data(ai_analysis.get('languages', '')),
-                        "certificates": format_ai_data(ai_analysis.get('certificates', '')),
-                        
-                        # 技能 - 直接使用检测到的技能
-                        "hard_skills": format_ai_data(skills),  # 使用检测到的技能
-                        "soft_skills": format_ai_data(ai_analysis.get('core_strengths', [])),  # 使用核心优势
-                        
-                        # 工作经验
-                        "work_experience": format_ai_data(ai_analysis.get('work_experience', '')),
-                        "project_experience": format_ai_data(ai_analysis.get('project_experience', '')),
-                        
-                        # 偏好
-                        "location_preference": format_ai_data(ai_analysis.get('location_preference', '')),
-                        "industry_preference": format_ai_data(ai_analysis.get('industry_preference', '')),
-                        
-                        # 薪资
-                        "salary_expectation": format_ai_data(ai_analysis.get('salary_expectation', '')),
-                        "benefits_expectation": format_ai_data(ai_analysis.get('benefits_expectation', '')),
-                        
-                        # 新增字段
-                        "primary_role": format_ai_data(ai_analysis.get('primary_role', '')),
-                        "simple_search_terms": format_ai_data(ai_analysis.get('simple_search_terms', ''))
-                    }
-                    
-                    analysis_complete = True
-                    
-                    # 存储到session state
-                    st.session_state.autofill_data = autofill_data
-                    st.session_state.analysis_complete = True
-                    st.session_state.ai_analysis = ai_analysis  # 保存ai_analysis供后续使用
-
-                    st.success("🎉 Resume analysis complete! Form has been auto-filled with your information.")
+            try:
+                if stream_analysis:
+                    cache_key = resume_cache_key(cv_file.getvalue(), model=RESUME_STREAM_MODEL,
+                                                 prompt_version=RESUME_STREAM_PROMPT_VERSION)
+                else:
+                    cache_key = resume_cache_key(cv_file.getvalue())
+                cached_analysis = resume_cache.get(cache_key)
+
+                # 展示分析結果 - 先放置占位符, 字段解析完成后逐个填充
+                st.markdown("---")
+                st.subheader("🤖 GPT-4 Career Analysis")
+                slots = create_analysis_slots()
+
+                if cached_analysis:
+                    resume_data = cached_analysis['resume_data']
+                    ai_analysis = cached_analysis['ai_analysis']
+                    for key, value in ai_analysis.items():
+                        render_analysis_field(slots, key, value)
+                    st.caption("⚡ Loaded from analysis cache")
+                elif stream_analysis:
+                    status = st.empty()
+                    status.info("🤖 Step 1/2: GPT-4 is reading your resume...")
+                    profile_preview = st.empty()
+
+                    def on_field(key, value, partial):
+                        render_analysis_field(slots, key, value)
+                        # 表单字段随分析结果到达逐个显示, 分析完成后由下方表单接替
+                        partial_autofill = build_autofill_data(partial)
+                        filled = {field: item for field, item in partial_autofill.items() if item}
+                        status.info(f"🤖 Step 1/2: Analyzing... {len(filled)}/{len(partial_autofill)} profile fields auto-filled")
+                        with profile_preview.container():
+                            for field, item in filled.items():
+                                st.markdown(f"**{field.replace('_', ' ').title()}:** {item}")
+
+                    resume_data, ai_analysis = stream_resume_analysis(cv_file, cv_file.name, on_field=on_field)
+                    status.empty()
+                    profile_preview.empty()
+                    resume_cache.set(cache_key, {
+                        'resume_data': resume_data,
+                        'ai_analysis': ai_analysis
+                    })
+                else:
+                    with st.spinner("🤖 Step 1/2: Analyzing your resume with GPT-4..."):
+                        backend = load_backend()
+                        # PDF/DOCX 在进程池中解析 (大小、页数、超时限制), backend 只读取提取出的文本
+                        cv_text = extract_cv_text(cv_file, cv_file.name)
+                        resume_data, ai_analysis = backend.process_resume(text_upload(cv_text, cv_file.name),
+                                                                          cv_file.name)
+                    for key, value in ai_analysis.items():
+                        render_analysis_field(slots, key, value)
+                    resume_cache.set(cache_key, {
+                        'resume_data': resume_data,
+                        'ai_analysis': ai_analysis
+                    })
+
+                # 没有返回的字段显示默认值
+                for key in ANALYSIS_SLOT_FIELDS:
+                    if key not in ai_analysis:
+                        render_analysis_field(slots, key, None)
+
+                st.balloons()
+
+                # 提取并格式化数据
+                autofill_data = build_autofill_data(ai_analysis)
+
+                analysis_complete = True
+
+                # 存储到会话存储, session state 中只保留完成标记
+                session_id = current_session_id()
+                session_store.set(session_id, 'autofill_data', autofill_data)
+                session_store.set(session_id, 'ai_analysis', ai_analysis)  # 保存ai_analysis供后续使用
+                st.session_state.analysis_complete = True
+
+                st.success("🎉 Resume analysis complete! Form has been auto-filled with your information.")
 
-                except Exception as e:
-                    st.error(f"❌ Error analyzing resume: {str(e)}")
-                    st.stop()
+            except Exception as e:
+                st.error(f"❌ Error analyzing resume: {str(e)}")
+                st.stop()
 
     else:
         # Welcome screen
@@ -224,8 +440,8 @@ def main_analyzer_page():
             
             st.markdown("Review and edit the auto-filled information from your CV analysis:")
 
-            # 使用session_state中的数据
-            current_data = st.session_state.get('autofill_data', {})
+            # 使用会话存储中的数据
+            current_data = session_store.get(current_session_id(), 'autofill_data', {})
 
             # 职业偏好 - 新增字段放在表单顶部
             st.subheader("🎯 Career Preferences")
@@ -363,6 +579,9 @@ def main_analyzer_page():
                     location_preference == "Please select" or not primary_role.strip() or not simple_search_terms.strip()):
                     st.error("Please complete all required fields (marked with *)!")
                 else:
+                    require_databases()
+                    from database import save_job_seeker_info
+
                     # 保存到数据库
                     job_seeker_id = save_job_seeker_info(
                         education_level, major, graduation_status, university_background,
@@ -374,6 +593,9 @@ def main_analyzer_page():
                     )
                     
                     if job_seeker_id:
+                        load_skill_index().add_seeker(job_seeker_id, hard_skills, primary_role, location_preference)
+                        wake_workers("match_scores")
+
                         # 保存到session state
                         st.session_state.job_seeker_id = job_seeker_id
                         st.success(f"✅ Information saved successfully! Your ID: {job_seeker_id}")
@@ -389,7 +611,11 @@ def main_analyzer_page():
 
 def job_recommendations_page(job_seeker_id=None):
     """职位推荐页面 - 使用真实API数据"""
+    from database import JobSeekerDB
+    from database import get_job_seeker_search_fields
+
     st.title("💼 个性化职位推荐")
+    db = JobSeekerDB()
 
     # 获取求职者数据 - 添加错误处理
     job_seeker_data = None
@@ -507,301 +733,304 @@ def job_recommendations_page(job_seeker_id=None):
         )
 
     with col2:
-        num_jobs_to_show = st.slider(
-            "Top matches to display", 
-            1, 10, 5,
-            key="jobs_show_slider"
+        search_clicked = st.button(
+            "🔍 搜索并匹配职位",
+            type="primary",
+            use_container_width=True,
+            key="job_match_search"
         )
 
     st.info(
         "💡 **Note:** Jobs are searched globally and ranked by how well they match your profile, regardless of location."
     )
     # -------------------------------------------------------
-    # 🔎 STEP 2: Search Jobs via RapidAPI (SAFE VERSION)
+    # 🔎 STEP 2: Prepare search from the stored profile
     # -------------------------------------------------------
-    with st.spinner(f"🔎 Step 2/3: Searching {num_jobs_to_search} jobs via RapidAPI..."):
-
-        try:
+    try:
+        # ----------------------------------------------------
+        # 1) Load job seeker ID safely
+        # ----------------------------------------------------
+        current_id = st.session_state.get("job_seeker_id")
+
+        if not current_id:
+            st.warning("⚠ job_seeker_id not found in session — using default search settings.")
+            search_fields = {
+                "primary_role": "",
+                "simple_search_terms": "",
+                "location_preference": "Hong Kong",
+                "hard_skills": ""
+            }
+        else:
             # ----------------------------------------------------
-            # 1) Load job seeker ID safely
+            # 2) Load DB Search Fields
             # ----------------------------------------------------
-            current_id = st.session_state.get("job_seeker_id")
+            try:
+                search_fields = get_job_seeker_search_fields(current_id)
+            except Exception as db_err:
+                st.error(f"❌ Database error when loading search settings: {db_err}")
+                search_fields = None
 
-            if not current_id:
-                st.warning("⚠ job_seeker_id not found in session — using default search settings.")
+            if not search_fields:
+                st.warning("⚠ No stored search preferences found — using default search settings.")
                 search_fields = {
                     "primary_role": "",
                     "simple_search_terms": "",
                     "location_preference": "Hong Kong",
                     "hard_skills": ""
                 }
-            else:
-                # ----------------------------------------------------
-                # 2) Load DB Search Fields
-                # ----------------------------------------------------
-                try:
-                    search_fields = get_job_seeker_search_fields(current_id)
-                except Exception as db_err:
-                    st.error(f"❌ Database error when loading search settings: {db_err}")
-                    search_fields = None
-
-                if not search_fields:
-                    st.warning("⚠ No stored search preferences found — using default search settings.")
-                    search_fields = {
-                        "primary_role": "",
-                        "simple_search_terms": "",
-                        "location_preference": "Hong Kong",
-                        "hard_skills": ""
-                    }
-
-            # Extract fields
-            primary_role        = search_fields.get("primary_role", "")
-            simple_search_terms = search_fields.get("simple_search_terms", "")
-            location_preference = search_fields.get("location_preference", "Hong Kong")
-            hard_skills         = search_fields.get("hard_skills", "")
-
-            # Construct resume_data with all fields
-                        
-            resume_data = {
-                "education_level": job_seeker_data.get("education_level", ""),
-                "major": job_seeker_data.get("major", ""),
-                "graduation_status": job_seeker_data.get("graduation_status", ""),
-                "university_background": job_seeker_data.get("university_background", ""),
-                "languages": job_seeker_data.get("languages", ""),
-                "certificates": job_seeker_data.get("certificates", ""),
-                "hard_skills": job_seeker_data.get("hard_skills", ""),
-                "soft_skills": job_seeker_data.get("soft_skills", ""),
-                "work_experience": job_seeker_data.get("work_experience", ""),
-                "project_experience": job_seeker_data.get("project_experience", ""),
-                "location_preference": job_seeker_data.get("location_preference", ""),
-                "industry_preference": job_seeker_data.get("industry_preference", ""),
-                "salary_expectation": job_seeker_data.get("salary_expectation", ""),
-                "benefits_expectation": job_seeker_data.get("benefits_expectation", ""),
-                "primary_role": job_seeker_data.get("primary_role", ""),
-                "simple_search_terms": job_seeker_data.get("simple_search_terms", ""),
-            }
-
-            # Construct ai_analysis dict, which can focus on skills, role, location, etc.
-            ai_analysis = {
-                "education_level": resume_data["education_level"],
-                "major": resume_data["major"],
-                "graduation_status": resume_data["graduation_status"],
-                "university_background": resume_data["university_background"],
-                "languages": [lang.strip() for lang in resume_data["languages"].split(",")] if resume_data["languages"] else [],
-                "certificates": [cert.strip() for cert in resume_data["certificates"].split(",")] if resume_data["certificates"] else [],
-                "skills": [skill.strip() for skill in resume_data["hard_skills"].split(",")] if resume_data["hard_skills"] else [],
-                "soft_skills": [skill.strip() for skill in resume_data["soft_skills"].split(",")] if resume_data["soft_skills"] else [],
-                "work_experience": resume_data["work_experience"],
-                "project_experience": resume_data["project_experience"],
-                "location_preference": resume_data["location_preference"],
-                "industry_preference": resume_data["industry_preference"],
-                "salary_expectation": resume_data["salary_expectation"],
-                "benefits_expectation": resume_data["benefits_expectation"],
-                "primary_role": resume_data["primary_role"],
-                "simple_search_terms": resume_data["simple_search_terms"],
-            }
-    
-            # ----------------------------------------------------
-            # 3) Build search keyword string
-            # ----------------------------------------------------
-            search_keywords = ", ".join(
-                field for field in [
-                    primary_role,
-                    simple_search_terms,
-                    hard_skills, 
-                ] if field.strip()
-            )
 
-            if not search_keywords:
-                search_keywords = "General"
+        # Extract fields
+        primary_role        = search_fields.get("primary_role", "")
+        simple_search_terms = search_fields.get("simple_search_terms", "")
+        location_preference = search_fields.get("location_preference", "Hong Kong")
+        hard_skills         = search_fields.get("hard_skills", "")
+
+        # Construct resume_data with all fields
+
+        resume_data = {
+            "education_level": job_seeker_data.get("education_level", ""),
+            "major": job_seeker_data.get("major", ""),
+            "graduation_status": job_seeker_data.get("graduation_status", ""),
+            "university_background": job_seeker_data.get("university_background", ""),
+            "languages": job_seeker_data.get("languages", ""),
+            "certificates": job_seeker_data.get("certificates", ""),
+            "hard_skills": job_seeker_data.get("hard_skills", ""),
+            "soft_skills": job_seeker_data.get("soft_skills", ""),
+            "work_experience": job_seeker_data.get("work_experience", ""),
+            "project_experience": job_seeker_data.get("project_experience", ""),
+            "location_preference": job_seeker_data.get("location_preference", ""),
+            "industry_preference": job_seeker_data.get("industry_preference", ""),
+            "salary_expectation": job_seeker_data.get("salary_expectation", ""),
+            "benefits_expectation": job_seeker_data.get("benefits_expectation", ""),
+            "primary_role": job_seeker_data.get("primary_role", ""),
+            "simple_search_terms": job_seeker_data.get("simple_search_terms", ""),
+        }
+
+        # Construct ai_analysis dict, which can focus on skills, role, location, etc.
+        ai_analysis = {
+            "education_level": resume_data["education_level"],
+            "major": resume_data["major"],
+            "graduation_status": resume_data["graduation_status"],
+            "university_background": resume_data["university_background"],
+            "languages": [lang.strip() for lang in resume_data["languages"].split(",")] if resume_data["languages"] else [],
+            "certificates": [cert.strip() for cert in resume_data["certificates"].split(",")] if resume_data["certificates"] else [],
+            "skills": [skill.strip() for skill in resume_data["hard_skills"].split(",")] if resume_data["hard_skills"] else [],
+            "soft_skills": [skill.strip() for skill in resume_data["soft_skills"].split(",")] if resume_data["soft_skills"] else [],
+            "work_experience": resume_data["work_experience"],
+            "project_experience": resume_data["project_experience"],
+            "location_preference": resume_data["location_preference"],
+            "industry_preference": resume_data["industry_preference"],
+            "salary_expectation": resume_data["salary_expectation"],
+            "benefits_expectation": resume_data["benefits_expectation"],
+            "primary_role": resume_data["primary_role"],
+            "simple_search_terms": resume_data["simple_search_terms"],
+        }
+
+        # ----------------------------------------------------
+        # 3) Build search keyword string
+        # ----------------------------------------------------
+        search_keywords = build_search_keywords(primary_role, simple_search_terms, hard_skills)
 
-            # ----------------------------------------------------
-            # 4) Show user what we are searching
-            # ----------------------------------------------------
-            st.info(
-                f"📡 Searching LinkedIn via RapidAPI:\n\n"
-                f"**Keywords:** {search_keywords}\n"
-                f"**Location:** {location_preference}"
-            )
-
-            # ----------------------------------------------------
-            # 5) Perform rapid API search
-            # ----------------------------------------------------
-            rapidapi = LinkedInJobSearcher(api_key=Config.RAPIDAPI_KEY)
-
-            rapidapi_results = rapidapi.search_jobs(
-                keywords=search_keywords,
-                location=location_preference,
-                limit=num_jobs_to_search
-            )
+    except Exception as e:
+        st.error(f"❌ Unexpected error while preparing search: {str(e)}")
+        st.stop()
 
-            if not rapidapi_results:
-                st.warning("⚠ No jobs found via RapidAPI. Try adjusting your keywords.")
-                matched_jobs = []
-            else:
-                matched_jobs = rapidapi_results
+    # 搜索结果按会话缓存, 键为资料与搜索设置的哈希 - 只有点击搜索才会请求上游
+    search_key = profile_fingerprint(
+        resume_data, ai_analysis, search_keywords, location_preference, num_jobs_to_search, employment_types
+    )
+    memo = st.session_state.get("job_match_results")
 
-        except Exception as e:
-            st.error(f"❌ Unexpected error while searching jobs: {str(e)}")
-            matched_jobs = []
+    if search_clicked:
+        st.info(
+            f"📡 Searching LinkedIn via RapidAPI:\n\n"
+            f"**Keywords:** {search_keywords}\n"
+            f"**Location:** {location_preference}"
+        )
 
         # ----------------------------------------
         # Step 2: Search and Match Jobs via Backend
+        # 单一管道: 一次上游搜索直接进入匹配, 相同查询跨会话共享缓存
         # ----------------------------------------
         with st.spinner(f"🔎 Step 2/3: Searching {num_jobs_to_search} jobs and matching..."):
-
             try:
-                matched_jobs = backend.search_and_match_jobs(
+                matched_jobs = search_and_match_cached(
+                    load_backend(),
                     resume_data=resume_data,
                     ai_analysis=ai_analysis,
-                    num_jobs=num_jobs_to_search
+                    keywords=search_keywords,
+                    location=location_preference,
+                    limit=num_jobs_to_search,
+                    employment_types=employment_types
                 )
             except Exception as e:
                 st.error(f"❌ Unexpected error while searching jobs: {str(e)}")
                 st.stop()
 
-        # ----------------------------------------
-        # 📊 STEP 3: Display Results
-        # ----------------------------------------
-        st.markdown("---")
+        memo = {"key": search_key, "matched_jobs": matched_jobs}
+        st.session_state.job_match_results = memo
 
-        if matched_jobs and len(matched_jobs) > 0:
+    if memo is None:
+        st.info("👆 调整设置后点击 **搜索并匹配职位** 开始搜索")
+        return
 
-            st.success(f"✅ Step 3/3: Found & ranked **{len(matched_jobs)}** jobs by match quality!")
-            st.markdown(f"## 🎯 Top {num_jobs_to_show} Job Matches")
+    if memo["key"] != search_key:
+        st.warning("⚙️ 搜索设置或个人资料已更改, 点击 **搜索并匹配职位** 更新结果")
 
-            st.info("📊 **Ranking Algorithm:** 60% Semantic Similarity + 40% Skill Match")
+    show_job_matches(memo["matched_jobs"])
 
-            # Display top matches
-            for i, job in enumerate(matched_jobs[:num_jobs_to_show], start=1):
 
-                combined = job.get("combined_score", 0)
+@st.fragment
+def show_job_matches(matched_jobs):
+    """职位匹配结果展示 - 独立的局部重运行, 调整展示控件不会触发上游搜索"""
+    # ----------------------------------------
+    # 📊 STEP 3: Display Results
+    # ----------------------------------------
+    st.markdown("---")
 
-                if combined >= 80:
-                    match_emoji, match_label, match_color = "🟢", "Excellent Match", "#D4EDDA"
-                elif combined >= 60:
-                    match_emoji, match_label, match_color = "🟡", "Good Match", "#FFF3CD"
-                else:
-                    match_emoji, match_label, match_color = "🟠", "Fair Match", "#F8D7DA"
+    if matched_jobs and len(matched_jobs) > 0:
 
-                expander_title = (
-                    f"**#{i}** • {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')} "
-                    f"- {match_emoji} {match_label} ({combined:.1f}%)"
-                )
+        num_jobs_to_show = st.slider(
+            "Top matches to display",
+            1, 10, 5,
+            key="jobs_show_slider"
+        )
 
-                with st.expander(expander_title, expanded=i <= 2):
+        st.success(f"✅ Step 3/3: Found & ranked **{len(matched_jobs)}** jobs by match quality!")
+        st.markdown(f"## 🎯 Top {num_jobs_to_show} Job Matches")
 
-                    # Scores
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("🎯 Combined Score", f"{combined:.1f}%")
-                    with col2:
-                        st.metric("🧠 Semantic Match", f"{job.get('semantic_score', 0):.1f}%")
-                    with col3:
-                        st.metric("✅ Skill Match", f"{job.get('skill_match_percentage', 0):.1f}%")
-                    with col4:
-                        st.metric("🔢 Skills Matched", job.get("matched_skills_count", 0))
-
-                    # Job details
-                    st.markdown("##### 📋 Job Details")
-                    detail_col1, detail_col2 = st.columns(2)
-
-                    with detail_col1:
-                        st.write(f"**📍 Location:** {job.get('location', 'Unknown')}")
-                        st.write(f"**🏢 Company:** {job.get('company', 'Unknown')}")
-
-                    with detail_col2:
-                        st.write(f"**📅 Posted:** {job.get('posted_date', 'Unknown')}")
-                        st.write(f"**💼 Role:** {job.get('title', 'Unknown')}")
-
-                    # Matched skills (candidate has)
-                    matched_skills = job.get("matched_skills", [])
-
-                    # Required skills from job (assumes this field exists as a list)
-                    required_skills = job.get("required_skills", [])
-
-                    # Skills to improve: required but NOT matched
-                    skills_to_improve = []
-                    if required_skills:
-                        required_set = set([s.lower() for s in required_skills])
-                        matched_set = set([s.lower() for s in matched_skills])
-                        missing_skills = required_set - matched_set
-                        skills_to_improve = list(missing_skills)
-
-                    # Display matched skills section
-                    if matched_skills:
-                        st.markdown("##### ✨ Your Skills That Match This Job")
-
-                        badge_html = "".join(
-                            f"""
-                            <span style="
-                                background-color:#D4EDDA;
-                                color:#155724;
-                                padding:5px 10px;
-                                margin:3px;
-                                border-radius:5px;
-                                display:inline-block;
-                                font-weight:bold;
-                            ">✓ {skill}</span>
-                            """
-                            for skill in matched_skills[:8]
-                        )
+        st.info("📊 **Ranking Algorithm:** 60% Semantic Similarity + 40% Skill Match")
 
-                        st.markdown(badge_html, unsafe_allow_html=True)
-
-                        if len(matched_skills) > 8:
-                            st.caption(f"+ {len(matched_skills) - 8} more matching skills")
-
-                    # Display skills to improve section
-                    if skills_to_improve:
-                        st.markdown("##### 🛠 Skills You May Want to Improve")
-
-                        badge_html_improve = "".join(
-                            f"""
-                            <span style="
-                                background-color:#F8D7DA;
-                                color:#721C24;
-                                padding:5px 10px;
-                                margin:3px;
-                                border-radius:5px;
-                                display:inline-block;
-                                font-weight:bold;
-                            ">✗ {skill}</span>
-                            """
-                            for skill in skills_to_improve[:8]
-                        )
+        # Display top matches
+        for i, job in enumerate(matched_jobs[:num_jobs_to_show], start=1):
 
-                        st.markdown(badge_html_improve, unsafe_allow_html=True)
-
-                        if len(skills_to_improve) > 8:
-                            st.caption(f"+ {len(skills_to_improve) - 8} more skills to consider")
-
-                    # Description
-                    description = job.get("description", "")
-                    if description:
-                        st.markdown("##### 📝 Job Description")
-                        preview = description[:500]
-                        st.text_area(
-                            "Preview",
-                            preview + ("..." if len(description) > 500 else ""),
-                            height=120,
-                            key=f"desc_{job.get('id', i)}"
-                        )
+            combined = job.get("combined_score", 0)
 
-                    # Apply link
-                    job_url = job.get("url", "")
-                    if job_url:
-                        st.link_button(
-                            "🔗 Apply Now on LinkedIn",
-                            job_url,
-                            use_container_width=True,
-                            type="primary"
-                        )
-                    else:
-                        st.info("🔗 Application link not available")
+            if combined >= 80:
+                match_emoji, match_label, match_color = "🟢", "Excellent Match", "#D4EDDA"
+            elif combined >= 60:
+                match_emoji, match_label, match_color = "🟡", "Good Match", "#FFF3CD"
+            else:
+                match_emoji, match_label, match_color = "🟠", "Fair Match", "#F8D7DA"
 
-        else:
-            st.warning("⚠️ No matched jobs found. Please try adjusting your search criteria.")
+            expander_title = (
+                f"**#{i}** • {job.get('title', 'Unknown')} at {job.get('company', 'Unknown')} "
+                f"- {match_emoji} {match_label} ({combined:.1f}%)"
+            )
+
+            with st.expander(expander_title, expanded=i <= 2):
+
+                # Scores
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("🎯 Combined Score", f"{combined:.1f}%")
+                with col2:
+                    st.metric("🧠 Semantic Match", f"{job.get('semantic_score', 0):.1f}%")
+                with col3:
+                    st.metric("✅ Skill Match", f"{job.get('skill_match_percentage', 0):.1f}%")
+                with col4:
+                    st.metric("🔢 Skills Matched", job.get("matched_skills_count", 0))
+
+                # Job details
+                st.markdown("##### 📋 Job Details")
+                detail_col1, detail_col2 = st.columns(2)
+
+                with detail_col1:
+                    st.write(f"**📍 Location:** {job.get('location', 'Unknown')}")
+                    st.write(f"**🏢 Company:** {job.get('company', 'Unknown')}")
+
+                with detail_col2:
+                    st.write(f"**📅 Posted:** {job.get('posted_date', 'Unknown')}")
+                    st.write(f"**💼 Role:** {job.get('title', 'Unknown')}")
+
+                # Matched skills (candidate has)
+                matched_skills = job.get("matched_skills", [])
+
+                # Required skills from job (assumes this field exists as a list)
+                required_skills = job.get("required_skills", [])
+
+                # Skills to improve: required but NOT matched
+                skills_to_improve = []
+                if required_skills:
+                    required_set = set([s.lower() for s in required_skills])
+                    matched_set = set([s.lower() for s in matched_skills])
+                    missing_skills = required_set - matched_set
+                    skills_to_improve = list(missing_skills)
+
+                # Display matched skills section
+                if matched_skills:
+                    st.markdown("##### ✨ Your Skills That Match This Job")
+
+                    badge_html = "".join(
+                        f"""
+                        <span style="
+                            background-color:#D4EDDA;
+                            color:#155724;
+                            padding:5px 10px;
+                            margin:3px;
+                            border-radius:5px;
+                            display:inline-block;
+                            font-weight:bold;
+                        ">✓ {skill}</span>
+                        """
+                        for skill in matched_skills[:8]
+                    )
+
+                    st.markdown(badge_html, unsafe_allow_html=True)
+
+                    if len(matched_skills) > 8:
+                        st.caption(f"+ {len(matched_skills) - 8} more matching skills")
+
+                # Display skills to improve section
+                if skills_to_improve:
+                    st.markdown("##### 🛠 Skills You May Want to Improve")
+
+                    badge_html_improve = "".join(
+                        f"""
+                        <span style="
+                            background-color:#F8D7DA;
+                            color:#721C24;
+                            padding:5px 10px;
+                            margin:3px;
+                            border-radius:5px;
+                            display:inline-block;
+                            font-weight:bold;
+                        ">✗ {skill}</span>
+                        """
+                        for skill in skills_to_improve[:8]
+                    )
+
+                    st.markdown(badge_html_improve, unsafe_allow_html=True)
+
+                    if len(skills_to_improve) > 8:
+                        st.caption(f"+ {len(skills_to_improve) - 8} more skills to consider")
+
+                # Description
+                description = job.get("description", "")
+                if description:
+                    st.markdown("##### 📝 Job Description")
+                    preview = description[:500]
+                    st.text_area(
+                        "Preview",
+                        preview + ("..." if len(description) > 500 else ""),
+                        height=120,
+                        key=f"desc_{job.get('id', i)}"
+                    )
+
+                # Apply link
+                job_url = job.get("url", "")
+                if job_url:
+                    st.link_button(
+                        "🔗 Apply Now on LinkedIn",
+                        job_url,
+                        use_container_width=True,
+                        type="primary"
+                    )
+                else:
+                    st.info("🔗 Application link not available")
+
+    else:
+        st.warning("⚠️ No matched jobs found. Please try adjusting your search criteria.")
 
 def enhanced_head_hunter_page():
     """增强的猎头页面 - 职位发布和管理"""
@@ -810,11 +1039,13 @@ def enhanced_head_hunter_page():
     # 页面选择
     page_option = st.sidebar.radio(
         "选择功能",
-        ["发布新职位", "查看已发布职位", "职位统计"]
+        ["发布新职位", "批量导入职位", "查看已发布职位", "职位统计"]
     )
 
     if page_option == "发布新职位":
         publish_new_job()
+    elif page_option == "批量导入职位":
+        bulk_import_jobs()
     elif page_option == "查看已发布职位":
         view_published_jobs()
     elif page_option == "职位统计":
@@ -822,6 +1053,8 @@ def enhanced_head_hunter_page():
 
 def publish_new_job():
     """发布新职位表单"""
+    from database import save_head_hunter_job
+
     st.header("📝 发布新职位")
 
     with st.form("head_hunter_job_form"):
@@ -832,7 +1065,7 @@ def publish_new_job():
         with col1:
             job_title = st.text_input("职位标题*", placeholder="例如：高级前端工程师")
         with col2:
-            employment_type = st.selectbox("雇佣类型*", ["请选择", "全职", "兼职", "合同", "实习"])
+            employment_type = st.selectbox("雇佣类型*", ["请选择"] + EMPLOYMENT_TYPES)
 
         job_description = st.text_area("职位描述*", height=100,
                                       placeholder="详细介绍职位的主要内容和团队情况...")
@@ -849,21 +1082,21 @@ def publish_new_job():
         col3, col4 = st.columns(2)
         with col3:
             client_company = st.text_input("客户公司名称*", placeholder="公司官方名称")
-            industry = st.selectbox("行业*", ["请选择", "科技", "金融", "咨询", "医疗", "教育", "制造", "零售", "其他"])
+            industry = st.selectbox("行业*", ["请选择"] + INDUSTRIES)
         with col4:
-            work_location = st.selectbox("工作地点*", ["请选择", "香港", "内地", "海外", "远程"])
-            company_size = st.selectbox("公司规模*", ["请选择", "初创公司(1-50)", "中小型企业(51-200)", "大型企业(201-1000)", "跨国公司(1000+)"])
+            work_location = st.selectbox("工作地点*", ["请选择"] + WORK_LOCATIONS)
+            company_size = st.selectbox("公司规模*", ["请选择"] + COMPANY_SIZES)
 
-        work_type = st.selectbox("工作类型*", ["请选择", "远程", "混合", "办公室"])
+        work_type = st.selectbox("工作类型*", ["请选择"] + WORK_TYPES)
 
         # 雇佣详情
         st.subheader("💼 雇佣详情")
 
         col5, col6 = st.columns(2)
         with col5:
-            experience_level = st.selectbox("经验级别*", ["请选择", "应届", "1-3年", "3-5年", "5-10年", "10年以上"])
+            experience_level = st.selectbox("经验级别*", ["请选择"] + EXPERIENCE_LEVELS)
         with col6:
-            visa_support = st.selectbox("签证支持", ["不提供", "工作签证", "协助办理", "需自有签证"])
+            visa_support = st.selectbox("签证支持", VISA_OPTIONS)
 
         # 薪酬与申请方式
         st.subheader("💰 薪酬与申请方式")
@@ -874,7 +1107,7 @@ def publish_new_job():
         with col8:
             max_salary = st.number_input("最高薪资*", min_value=0, value=50000, step=5000)
         with col9:
-            currency = st.selectbox("货币", ["HKD", "USD", "CNY", "EUR", "GBP"])
+            currency = st.selectbox("货币", CURRENCIES)
 
         benefits = st.text_area("福利待遇", height=80,
                               placeholder="例如：医疗保险、年假15天、绩效奖金、股票期权...")
@@ -884,90 +1117,125 @@ def publish_new_job():
                                         placeholder="申请流程和联系方式...")
 
         job_valid_until = st.date_input("职位发布有效期*",
-                                      value=datetime.now().date() + pd.Timedelta(days=30))
+                                      value=datetime.now().date() + timedelta(days=30))
 
         # 提交按钮
         submitted = st.form_submit_button("💾 发布职位", type="primary", use_container_width=True)
 
         if submitted:
-            # 验证必填字段
-            required_fields = [
-                job_title, job_description, main_responsibilities, required_skills,
-                client_company, industry, work_location, work_type, company_size,
-                employment_type, experience_level, min_salary, max_salary, application_method
-            ]
-
-            if "请选择" in [employment_type, industry, work_location, work_type, company_size, experience_level]:
-                st.error("请完成所有必填字段（标*号）！")
-            elif not all(required_fields):
-                st.error("请完成所有必填字段（标*号）！")
-            elif min_salary >= max_salary:
-                st.error("最高薪资必须大于最低薪资！")
-            
-            # 在 Streamlit app 中修改这部分代码：
+            # 与批量导入使用相同的校验规则
+            job_data, errors = validate_job({
+                'job_title': job_title,
+                'job_description': job_description,
+                'main_responsibilities': main_responsibilities,
+                'required_skills': required_skills,
+                'client_company': client_company,
+                'industry': industry,
+                'work_location': work_location,
+                'work_type': work_type,
+                'company_size': company_size,
+                'employment_type': employment_type,
+                'experience_level': experience_level,
+                'visa_support': visa_support,
+                'min_salary': min_salary,
+                'max_salary': max_salary,
+                'currency': currency,
+                'benefits': benefits,
+                'application_method': application_method,
+                'job_valid_until': job_valid_until.strftime("%Y-%m-%d")
+            })
+
+            if errors:
+                st.error("请完成所有必填字段（标*号）！\n\n" + "\n".join(f"- {error}" for error in errors))
             else:
-                # 创建字典对象
-                job_data = {
-                    'job_title': job_title,
-                    'job_description': job_description,
-                    'main_responsibilities': main_responsibilities,
-                    'required_skills': required_skills,
-                    'client_company': client_company,
-                    'industry': industry,
-                    'work_location': work_location,
-                    'work_type': work_type,
-                    'company_size': company_size,
-                    'employment_type': employment_type,
-                    'experience_level': experience_level,
-                    'visa_support': visa_support,
-                    'min_salary': min_salary,
-                    'max_salary': max_salary,
-                    'currency': currency,
-                    'benefits': benefits,
-                    'application_method': application_method,
-                    'job_valid_until': job_valid_until.strftime("%Y-%m-%d")
-                }
-                
                 # 保存到数据库 - 现在只传递一个参数
                 success = save_head_hunter_job(job_data)
 
                 if success:
+                    # 同步线程尚未就绪时无需唤醒, 启动后会从队列中读取
+                    wake_workers("vector_sync", "match_scores")
                     st.success("✅ 职位发布成功！")
                     st.balloons()
                 else:
                     st.error("❌ 职位发布失败，请重试")
 
 
+def bulk_import_jobs():
+    """从 CSV / JSONL 批量导入职位"""
+    st.header("📥 批量导入职位")
+    st.markdown(
+        "上传 CSV 或 JSONL 文件, 列名与发布表单字段相同: "
+        + ", ".join(f"`{column}`" for column in JOB_COLUMNS)
+        + "。校验规则与发布表单一致, 无效行会被跳过并列出。"
+    )
+
+    upload = st.file_uploader("选择文件", type=["csv", "jsonl", "ndjson"], key="job_import_file")
+    if upload and st.button("📥 开始导入", type="primary", use_container_width=True):
+        status = st.empty()
+        with st.spinner("正在导入..."):
+            report = import_upload(
+                upload,
+                progress=lambda r: status.info(f"已导入 {r['imported']} 条, 拒绝 {len(r['errors'])} 条...")
+            )
+        status.empty()
+
+        if report["imported"]:
+            wake_workers("vector_sync", "match_scores")
+            st.success(f"✅ 已导入 {report['imported']} / {report['total']} 个职位 ({report['elapsed_s']}s)")
+        if report["errors"]:
+            st.warning(f"⚠️ {len(report['errors'])} 行未通过校验")
+            st.dataframe(
+                [{"行号": item["line"], "错误": "; ".join(item["errors"])} for item in report["errors"][:1000]],
+                use_container_width=True
+            )
+
+
 def view_published_jobs():
     """查看已发布的职位"""
     st.header("📋 已发布职位")
 
-    jobs = db2.get_all_head_hunter_jobs()
+    total_jobs = count_head_hunter_jobs()
 
-    if not jobs:
+    if not total_jobs:
         st.info("尚未发布任何职位")
         return
 
-    st.success(f"已发布 {len(jobs)} 个职位")
+    st.success(f"已发布 {total_jobs} 个职位")
 
     # 搜索和筛选
     col1, col2 = st.columns(2)
     with col1:
-        search_term = st.text_input("搜索职位标题或公司")
+        search_term = st.text_input("搜索职位标题、公司或描述")
     with col2:
         filter_industry = st.selectbox("按行业筛选", ["所有行业"] + ["科技", "金融", "咨询", "医疗", "教育", "制造", "零售", "其他"])
 
-    # 过滤职位
-    filtered_jobs = jobs
-    if search_term:
-        filtered_jobs = [job for job in jobs if search_term.lower() in job[2].lower() or search_term.lower() in job[6].lower()]
-    if filter_industry != "所有行业":
-        filtered_jobs = [job for job in filtered_jobs if job[7] == filter_industry]
+    industry = None if filter_industry == "所有行业" else filter_industry
+
+    # 筛选条件变化时回到第一页; cursors 记录每一页的起始位置
+    filter_key = (search_term, filter_industry)
+    if st.session_state.get('published_jobs_filter') != filter_key:
+        st.session_state.published_jobs_filter = filter_key
+        st.session_state.published_jobs_cursors = [None]
+    cursors = st.session_state.published_jobs_cursors
+
+    # 数据库端过滤和键集分页, 多取一条用于判断是否有下一页
+    page_jobs = query_head_hunter_jobs(
+        search_term, industry,
+        before_id=cursors[-1],
+        page_size=PUBLISHED_JOBS_PAGE_SIZE + 1
+    )
+    has_next_page = len(page_jobs) > PUBLISHED_JOBS_PAGE_SIZE
+    filtered_jobs = page_jobs[:PUBLISHED_JOBS_PAGE_SIZE]
 
     if not filtered_jobs:
         st.warning("没有找到匹配的职位")
         return
 
+    if search_term or industry:
+        st.caption(f"共 {count_head_hunter_jobs(search_term, industry)} 个匹配职位 · 第 {len(cursors)} 页")
+    else:
+        st.caption(f"第 {len(cursors)} 页")
+
     # 显示职位列表
     for job in filtered_jobs:
         with st.expander(f"#{job[0]} {job[2]} - {job[6]}", expanded=False):
@@ -991,75 +1259,75 @@ def view_published_jobs():
             st.write("**描述:**")
             st.write(job[3][:200] + "..." if len(job[3]) > 200 else job[3])
 
+    # 分页
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if len(cursors) > 1 and st.button("⬅️ 上一页", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col_next:
+        if has_next_page and st.button("下一页 ➡️", use_container_width=True):
+            cursors.append(filtered_jobs[-1][0])
+            st.rerun()
+
 def show_job_statistics():
     """显示职位统计"""
     st.header("📊 职位统计")
 
-    jobs = db2.get_all_head_hunter_jobs()
+    # 读取触发器维护的汇总表, 不再遍历全部职位
+    stats = get_job_statistics()
+    total_jobs = stats['total']
 
-    if not jobs:
+    if not total_jobs:
         st.info("尚无统计数据")
         return
 
     # 基本统计
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("总职位数", len(jobs))
+        st.metric("总职位数", total_jobs)
     with col2:
-        active_jobs = len([job for job in jobs if datetime.strptime(job[19], "%Y-%m-%d").date() >= datetime.now().date()])
-        st.metric("有效职位", active_jobs)
+        st.metric("有效职位", stats['active'])
     with col3:
-        expired_jobs = len(jobs) - active_jobs
-        st.metric("过期职位", expired_jobs)
+        st.metric("过期职位", stats['expired'])
     with col4:
-        avg_salary = sum((job[14] + job[15]) / 2 for job in jobs) / len(jobs)
-        st.metric("平均薪资", f"{avg_salary:,.0f}")
+        st.metric("平均薪资", f"{stats['avg_salary']:,.0f}")
 
     # 行业分布
     st.subheader("🏭 行业分布")
-    industry_counts = {}
-    for job in jobs:
-        industry = job[7]
-        industry_counts[industry] = industry_counts.get(industry, 0) + 1
-
-    for industry, count in industry_counts.items():
-        st.write(f"• **{industry}:** {count} 个职位 ({count/len(jobs)*100:.1f}%)")
+    for industry, count in stats['industry'].items():
+        st.write(f"• **{industry}:** {count} 个职位 ({count/total_jobs*100:.1f}%)")
 
     # 地点分布
     st.subheader("📍 工作地点分布")
-    location_counts = {}
-    for job in jobs:
-        location = job[8]
-        location_counts[location] = location_counts.get(location, 0) + 1
-
-    for location, count in location_counts.items():
+    for location, count in stats['location'].items():
         st.write(f"• **{location}:** {count} 个职位")
 
     # 经验要求分布
     st.subheader("🎯 经验要求分布")
-    experience_counts = {}
-    for job in jobs:
-        experience = job[12]
-        experience_counts[experience] = experience_counts.get(experience, 0) + 1
-
-    for experience, count in experience_counts.items():
+    for experience, count in stats['experience'].items():
         st.write(f"• **{experience}:** {count} 个职位")
 
 def recruitment_match_dashboard():
     """招聘匹配仪表板"""
+    from backend import show_match_statistics
+    from backend import show_instructions
+    from listing_cache import count_active_jobs
+    from listing_cache import count_job_seekers
+
     st.title("🎯 Recruitment Match Portal")
 
-    # 快速统计
-    jobs = get_all_jobs_for_matching()
-    seekers = get_all_job_seekers()
+    # 快速统计 - 只需要数量, 不读取完整列表 (COUNT 结果按表版本缓存)
+    job_count = count_active_jobs()
+    seeker_count = count_job_seekers()
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("有效职位", len(jobs) if jobs else 0)
+        st.metric("有效职位", job_count)
     with col2:
-        st.metric("求职者", len(seekers) if seekers else 0)
+        st.metric("求职者", seeker_count)
     with col3:
-        st.metric("匹配就绪", "✅" if jobs and seekers else "❌")
+        st.metric("匹配就绪", "✅" if job_count and seeker_count else "❌")
 
     # 页面选择
     page_option = st.sidebar.radio(
@@ -1076,6 +1344,14 @@ def recruitment_match_dashboard():
 
 def recruitment_match_page():
     """招聘匹配页面"""
+    from batch_scoring import score_candidates
+    from listing_cache import get_all_jobs_for_matching
+    from listing_cache import get_all_job_seekers
+    from match_scores import live_seeker_matrix
+    from match_scores import match_score_floor
+    from match_scores import top_matches
+    from skill_index import prefilter_candidates
+
     st.title("🎯 Recruitment Match - 智能人才匹配")
 
     # 获取数据
@@ -1124,29 +1400,53 @@ def recruitment_match_page():
     if st.button("🚀 开始智能匹配", type="primary", use_container_width=True):
         st.subheader("📈 匹配结果")
 
+        # 预计算分数表只保存高于下限的组合, 更低的阈值或分数表尚未更新时回退到实时评分
+        ranked = None
+        if min_match_score > match_score_floor():
+            ranked = top_matches(selected_job[0], min_match_score, max_candidates)
+
+        if ranked is not None:
+            st.caption("⚡ 来自预计算匹配分数表")
+        else:
+            # 与预计算路径使用同一份求职者字段; 倒排索引预筛选, 只对至少共享一项技能的求职者评分
+            matrix = live_seeker_matrix()
+            skill_index = load_skill_index()
+            skill_index.refresh()  # 纳入批量导入的求职者
+            candidates = prefilter_candidates(skill_index, matrix, selected_job, min_match_score)
+            pool_size = matrix.size if candidates is None else len(candidates)
+            st.caption(f"🔎 候选池: {pool_size} / {matrix.size} 名求职者")
+
+            # 向量化批量评分候选池, 取真正的前N名 (而不是先截断再评分)
+            ranked = score_candidates(selected_job, matrix, top_k=max_candidates, min_score=min_match_score,
+                                      candidates=candidates)
+
+        # 规则评分 (两条路径相同) 只用于预筛选前N名; 展示的分数和分析来自 analyze_match_simple (按输入缓存),
+        # 与逐个评分时一致. 两条路径都返回 job_seeker_id, 按ID取列表中的求职者行
+        load_backend()  # 确保 analyze_match_simple 已加上缓存和计时
+        from backend import analyze_match_simple
+
+        seekers_by_id = {str(seeker[0]): seeker for seeker in seekers}
+        shortlisted = [(seekers_by_id[seeker_id], prefilter) for seeker_id, prefilter in ranked
+                       if seeker_id in seekers_by_id]
         progress_bar = st.progress(0)
         results = []
-
-        for i, seeker in enumerate(seekers[:max_candidates]):
-            progress = (i + 1) / min(len(seekers), max_candidates)
-            progress_bar.progress(progress)
-
-            # 使用简化匹配算法
+        for i, (seeker, prefilter) in enumerate(shortlisted):
+            progress_bar.progress((i + 1) / len(shortlisted))
             analysis_result = analyze_match_simple(selected_job, seeker)
             match_score = analysis_result.get('match_score', 0)
-
-            if match_score >= min_match_score:
-                results.append({
-                    'seeker_id': seeker[0],
-                    'name': seeker[1],
-                    'current_title': seeker[9],
-                    'experience': seeker[3],
-                    'education': seeker[4],
-                    'match_score': match_score,
-                    'analysis': analysis_result,
-                    'raw_data': seeker
-                })
-
+            if match_score < min_match_score:
+                continue
+            results.append({
+                'seeker_id': seeker[0],
+                'name': seeker[1],
+                'current_title': seeker[9],
+                'experience': seeker[3],
+                'education': seeker[4],
+                'match_score': match_score,
+                'prefilter': prefilter,
+                'analysis': analysis_result,
+                'raw_data': seeker
+            })
         progress_bar.empty()
 
         # 显示结果
@@ -1174,6 +1474,14 @@ def recruitment_match_page():
                         st.write(f"**薪资匹配:** {result['analysis'].get('salary_match', '一般')}")
                         st.write(f"**文化契合:** {result['analysis'].get('culture_fit', '中')}")
 
+                        prefilter = result['prefilter']
+                        breakdown = prefilter['score_breakdown']
+                        st.caption(
+                            f"预筛选分 (规则评分, 仅用于选出候选人): {prefilter['match_score']}分 · "
+                            f"技能 {breakdown['skill']:.0%} · 经验 {breakdown['experience']:.0%} · "
+                            f"学历 {breakdown['education']:.0%} · 职位 {breakdown['role']:.0%}"
+                        )
+
                         if 'key_strengths' in result['analysis']:
                             st.write("**核心优势:**")
                             for strength in result['analysis']['key_strengths']:
@@ -1200,21 +1508,25 @@ def recruitment_match_page():
 
 def ai_interview_dashboard():
     """AI面试仪表板"""
+    from backend import get_job_seeker_profile
+    from listing_cache import count_active_jobs
+    from listing_cache import get_jobs_for_interview
+
     st.title("🤖 AI模拟面试系统")
 
-    # 快速统计
-    jobs = get_jobs_for_interview()
+    # 快速统计 - 职位只计数, 进入面试页面时才读取列表
     seeker_profile = get_job_seeker_profile()
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("可用职位", len(jobs) if jobs else 0)
+        st.metric("可用职位", count_active_jobs())
     with col2:
         st.metric("个人资料", "✅" if seeker_profile else "❌")
     with col3:
-        if 'interview' in st.session_state:
-            progress = st.session_state.interview['current_question']
-            total = st.session_state.interview['total_questions']
+        interview = session_store.get(current_session_id(), 'interview')
+        if interview:
+            progress = interview['current_question']
+            total = interview['total_questions']
             st.metric("面试进度", f"{progress}/{total}")
         else:
             st.metric("面试状态", "待开始")
@@ -1226,12 +1538,217 @@ def ai_interview_dashboard():
     )
 
     if page_option == "开始模拟面试":
-        ai_interview_page()
+        ai_interview_page(get_jobs_for_interview(), seeker_profile)
     elif page_option == "面试准备指导":
         show_interview_guidance()
     else:
         show_interview_instructions()
 
+# 面试页面默认只读取最近几条问答记录
+INTERVIEW_HISTORY_RECENT = 3
+
+def save_interview_state(session_id, engine, job_id=None):
+    """把面试进度写入会话存储: 进度是一个小值 (仪表板读取 current_question / total_questions), 每道已评估的题目追加一条记录"""
+    interview = session_store.get(session_id, 'interview') or {}
+    interview.update({
+        'job_id': job_id if job_id is not None else interview.get('job_id'),
+        'current_question': engine.current_index,
+        'total_questions': engine.total_questions,
+        'question': engine.current_question,
+        'completed': engine.finished,
+    })
+
+    saved = session_store.segment_count(session_id, 'interview')
+    for i in range(saved, len(engine.evaluations)):
+        session_store.append_segment(session_id, 'interview', {
+            'question': engine.questions[i],
+            'answer': engine.answers[i],
+            'evaluation': engine.evaluations[i],
+        })
+    session_store.set(session_id, 'interview', interview)
+    return interview
+
+def load_interview_engine(session_id, interview, jobs, seeker_profile):
+    """进程内的面试引擎; 服务重启或被淘汰后从会话存储中的记录恢复, 职位已失效时返回 None"""
+    from interview_engine import InterviewEngine
+    from interview_engine import get_live_engine
+    from interview_engine import keep_live_engine
+
+    engine = get_live_engine(session_id)
+    if engine is not None:
+        return engine
+
+    job = next((job for job in jobs if job[0] == interview.get('job_id')), None)
+    if job is None:
+        return None
+
+    transcript = session_store.segments(session_id, 'interview')
+    questions = [segment['question'] for segment in transcript]
+    if interview.get('question'):
+        questions.append(interview['question'])
+    engine = InterviewEngine.restore(
+        job, seeker_profile, questions,
+        [segment['answer'] for segment in transcript],
+        [segment['evaluation'] for segment in transcript],
+        total_questions=interview['total_questions']
+    )
+    keep_live_engine(session_id, engine)
+    return engine
+
+def ai_interview_page(jobs, seeker_profile):
+    """AI模拟面试 - 作答期间后台预生成下一题, 提交后评估流式输出, 同时用本回答准备再下一题"""
+    from interview_engine import InterviewEngine
+    from interview_engine import TOTAL_QUESTIONS
+    from interview_engine import drop_live_engine
+    from interview_engine import keep_live_engine
+
+    if not jobs:
+        st.warning("❌ 没有可用的职位信息，请先在猎头模块发布职位")
+        return
+
+    session_id = current_session_id()
+    interview = session_store.get(session_id, 'interview')
+    engine = load_interview_engine(session_id, interview, jobs, seeker_profile) if interview else None
+
+    def reset_interview():
+        drop_live_engine(session_id)
+        session_store.delete(session_id, 'interview')
+        st.rerun()
+
+    if interview and engine is None:
+        st.warning("⚠️ 上次面试的职位已不可用，请重新开始")
+        if st.button("🔄 重新开始"):
+            reset_interview()
+        return
+
+    if engine is None:
+        st.subheader("🎯 选择面试职位")
+        selected = st.selectbox(
+            "选择职位",
+            range(len(jobs)),
+            format_func=lambda i: f"{jobs[i][1]} - {jobs[i][5]}"
+        )
+        if not seeker_profile:
+            st.info("💡 填写个人资料后，面试问题会结合您的背景生成")
+
+        if st.button("🚀 开始面试", type="primary"):
+            engine = InterviewEngine(jobs[selected], seeker_profile, total_questions=TOTAL_QUESTIONS)
+            with st.spinner("正在生成第一个问题..."):
+                engine.start()
+            keep_live_engine(session_id, engine)
+            save_interview_state(session_id, engine, job_id=jobs[selected][0])
+            st.rerun()
+        return
+
+    # 已完成的问题和评估 - 按需读取记录, 不在内存中保留完整记录
+    answered = session_store.segment_count(session_id, 'interview')
+    first = 0
+    if answered > INTERVIEW_HISTORY_RECENT and not st.toggle(f"显示全部 {answered} 条问答", key="interview_show_all"):
+        first = answered - INTERVIEW_HISTORY_RECENT
+    for offset, segment in enumerate(session_store.segments(session_id, 'interview', first)):
+        i = first + offset
+        with st.expander(f"问题 {i + 1}: {segment['question'][:60]}", expanded=(i == answered - 1)):
+            st.markdown(f"**问题:** {segment['question']}")
+            st.markdown(f"**您的回答:** {segment['answer']}")
+            st.markdown(f"**评估:** {segment['evaluation']}")
+
+    if engine.finished:
+        st.success("🎉 面试完成！")
+        scores = [score for score in engine.scores() if score is not None]
+        if scores:
+            st.metric("平均得分", f"{sum(scores) / len(scores):.1f}/10")
+
+        st.subheader("📋 总体评价")
+        if interview.get('summary'):
+            st.markdown(interview['summary'])
+        else:
+            interview['summary'] = st.write_stream(engine.stream_summary())
+            session_store.set(session_id, 'interview', interview)
+
+        if st.button("🔄 重新开始"):
+            reset_interview()
+        return
+
+    st.progress(engine.current_index / engine.total_questions)
+    # 通常已在上一题作答和评估期间生成好
+    question = engine.wait_for_next_question()
+    if interview.get('question') != question:
+        interview = save_interview_state(session_id, engine)
+    st.subheader(f"问题 {engine.current_index + 1}/{engine.total_questions}")
+    st.markdown(question)
+
+    with st.form(key=f"interview_answer_{engine.current_index}"):
+        answer = st.text_area("您的回答", height=200)
+        submitted = st.form_submit_button("提交回答", type="primary")
+
+    if submitted:
+        if not answer.strip():
+            st.warning("请输入您的回答")
+            return
+        st.markdown("**评估:**")
+        st.write_stream(engine.submit_answer(answer.strip()))
+        save_interview_state(session_id, engine)
+        st.rerun()
+
+    if st.button("⏹️ 结束面试"):
+        reset_interview()
+
+def metrics_admin_page():
+    """性能指标面板 - 各阶段耗时分位数、调用次数、token 用量和缓存命中率"""
+    st.title("📈 Performance Metrics")
+
+    snapshot = metrics.snapshot()
+
+    st.subheader("⏱️ Stage latency")
+    if snapshot["stages"]:
+        rows = [
+            {
+                "stage": stage,
+                "calls": stats["count"],
+                "errors": stats["errors"],
+                "p50 (ms)": round(stats["p50_s"] * 1000, 1),
+                "p95 (ms)": round(stats["p95_s"] * 1000, 1),
+                "p99 (ms)": round(stats["p99_s"] * 1000, 1),
+                "total (s)": round(stats["total_s"], 2),
+            }
+            for stage, stats in sorted(snapshot["stages"].items(), key=lambda item: -item[1]["total_s"])
+        ]
+        st.dataframe(rows, use_container_width=True)
+    else:
+        st.info("还没有记录到任何调用")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("🪙 LLM tokens")
+        if snapshot["tokens"]:
+            st.dataframe(
+                [{"model": model, "prompt": usage["prompt"], "completion": usage["completion"]}
+                 for model, usage in sorted(snapshot["tokens"].items())],
+                use_container_width=True
+            )
+        else:
+            st.caption("暂无 token 记录")
+    with col2:
+        st.subheader("🗄️ Caches")
+        st.dataframe(
+            [{"cache": name, "hits": stats["hits"], "misses": stats["misses"],
+              "hit rate": f"{stats['hit_rate']*100:.0f}%", "entries": stats["entries"]}
+             for name, stats in sorted(snapshot["caches"].items())],
+            use_container_width=True
+        )
+
+    st.subheader("📤 Prometheus export")
+    text = prometheus_text(snapshot)
+    if METRICS_PORT:
+        st.caption(f"Scrape endpoint: `http://<host>:{METRICS_PORT}/metrics`")
+    st.download_button("Download metrics.txt", text, file_name="metrics.txt", mime="text/plain")
+    with st.expander("Show raw export"):
+        st.code(text, language="text")
+
+    if st.button("Reset metrics"):
+        metrics.reset()
+        st.rerun()
+
 def show_interview_guidance():
     """显示面试准备指导"""
     st.header("🎯 面试准备指导")
@@ -1287,11 +1804,10 @@ with st.sidebar:
     
     if st.button("查看所有求职者记录"):
         try:
-            conn = sqlite3.connect('job_seeker.db')
-            c = conn.cursor()
-            c.execute("SELECT job_seeker_id, timestamp, education_level, primary_role FROM job_seekers ORDER BY id DESC")
-            results = c.fetchall()
-            conn.close()
+            require_databases()
+            results = get_connection(JOB_SEEKER_DB).execute(
+                "SELECT job_seeker_id, timestamp, education_level, primary_role FROM job_seekers ORDER BY id DESC"
+            ).fetchall()
             
             if results:
                 st.write("📋 所有求职者记录:")
@@ -1302,11 +1818,21 @@ with st.sidebar:
         except Exception as e:
             st.error(f"查询失败: {e}")
     
+    # 简历分析缓存命中情况
+    cache_stats = resume_cache.stats()
+    st.caption(
+        f"简历缓存: 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']} "
+        f"({cache_stats['hit_rate']*100:.0f}%), {cache_stats['entries']} 条"
+    )
+
     # 显示当前session状态
     current_id = st.session_state.get('job_seeker_id')
     if current_id:
         st.info(f"当前Session ID: **{current_id}**")
 
+    store_stats = session_store.stats()
+    st.caption(f"会话存储: {store_stats['sessions']} 个会话, {store_stats['bytes'] / 1024:.0f} KB")
+
 # 侧边栏导航
 st.sidebar.title("🔍 导航")
 
@@ -1321,8 +1847,13 @@ if st.sidebar.button("🔍 Recruitment Match", use_container_width=True):
         st.session_state.current_page = "recruitment_match"
 if st.sidebar.button("🤖 AI Interview", use_container_width=True):
         st.session_state.current_page = "ai_interview"
+if st.sidebar.button("📈 Metrics", use_container_width=True):
+        st.session_state.current_page = "metrics"
+
+# 页面路由 - 默认的简历分析页和指标页在保存前不访问数据库, 不等待后台建表
+if st.session_state.current_page not in ("main", "metrics"):
+    require_databases()
 
-# 页面路由
 if st.session_state.current_page == "main":
     main_analyzer_page()
 elif st.session_state.current_page == "job_recommendations":
@@ -1347,6 +1878,8 @@ elif st.session_state.current_page == "recruitment_match":
     recruitment_match_dashboard()
 elif st.session_state.current_page == "ai_interview":
     ai_interview_dashboard()
+elif st.session_state.current_page == "metrics":
+    metrics_admin_page()
 
 
 # 侧边栏信息
@@ -0,0 +1,313 @@
+import abc
+import json
+import os
+import threading
+
+import numpy as np
+
+
+VECTOR_STORE_MODES = ("flat", "ivf")
+# 向量数增长到上次训练时的该倍数后重新训练聚类中心
+IVF_RETRAIN_GROWTH = 2.0
+
+
+class VectorStore(abc.ABC):
+    """向量存储接口 - 本地实现与 Pinecone 实现可互相替换"""
+
+    @abc.abstractmethod
+    def upsert(self, ids, vectors, metadata=None):
+        pass
+
+    @abc.abstractmethod
+    def query(self, vector, top_k=10):
+        """返回 [(id, score, metadata), ...], 按相似度降序"""
+
+    @abc.abstractmethod
+    def delete(self, ids):
+        pass
+
+    def maintain(self):
+        """批量写入后调用的维护步骤 (例如重新训练索引), 默认无操作"""
+
+    def save(self):
+        pass
+
+    @abc.abstractmethod
+    def __len__(self):
+        pass
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStore(VectorStore):
+    """进程内向量索引 - 余弦相似度, 支持暴力检索(flat)和倒排聚类(ivf), 持久化到磁盘并以内存映射加载"""
+
+    def __init__(self, directory, dim, mode="flat", n_lists=64, n_probe=8):
+        if mode not in VECTOR_STORE_MODES:
+            raise ValueError(f"Unknown vector store mode {mode!r}, expected one of {VECTOR_STORE_MODES}")
+        self.directory = directory
+        self.dim = dim
+        self.mode = mode
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self._lock = threading.RLock()
+
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = []
+        self.metadata = []
+        self._positions = {}
+        self._writable = True
+
+        self.centroids = None
+        self.assignments = None
+        self.trained_size = 0
+
+        self._load()
+        if self.mode == "ivf" and self.centroids is None:
+            # 旧索引或以 flat 模式保存的索引: 加载后立即训练, 不静默退化为暴力检索
+            self.build_ivf()
+
+    # ---------- 持久化 ----------
+
+    def _paths(self):
+        return (
+            os.path.join(self.directory, "vectors.npy"),
+            os.path.join(self.directory, "index.json"),
+            os.path.join(self.directory, "centroids.npy"),
+        )
+
+    def _load(self):
+        vectors_path, index_path, centroids_path = self._paths()
+        if not (os.path.exists(vectors_path) and os.path.exists(index_path)):
+            return
+
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+
+        # 内存映射加载, 启动时不需要把整个矩阵读入内存
+        self.vectors = np.load(vectors_path, mmap_mode="r")
+        self._writable = False
+        self.ids = index["ids"]
+        self.metadata = index["metadata"]
+        self._positions = {vector_id: i for i, vector_id in enumerate(self.ids)}
+
+        if self.mode == "ivf" and os.path.exists(centroids_path) and "assignments" in index:
+            assignments = np.asarray(index["assignments"], dtype=np.int32)
+            # 与向量不一致的聚类结果丢弃, 由 __init__ 重新训练
+            if len(assignments) == len(self.ids):
+                self.centroids = np.load(centroids_path)
+                self.assignments = assignments
+                self.trained_size = index.get("trained_size", len(self.ids))
+
+    def save(self):
+        """原子地写入向量、ID和元数据"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            vectors_path, index_path, centroids_path = self._paths()
+
+            # np.save 会自动补 .npy 后缀, 临时文件名需以 .npy 结尾
+            tmp_vectors = vectors_path + ".tmp.npy"
+            np.save(tmp_vectors, np.asarray(self.vectors, dtype=np.float32))
+            os.replace(tmp_vectors, vectors_path)
+
+            index = {"ids": self.ids, "metadata": self.metadata}
+            if self.centroids is not None:
+                tmp_centroids = centroids_path + ".tmp.npy"
+                np.save(tmp_centroids, self.centroids)
+                os.replace(tmp_centroids, centroids_path)
+                index["assignments"] = self.assignments.tolist()
+                index["trained_size"] = self.trained_size
+
+            tmp_index = index_path + ".tmp"
+            with open(tmp_index, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp_index, index_path)
+
+    # ---------- 写入 ----------
+
+    def _make_writable(self):
+        if not self._writable:
+            self.vectors = np.array(self.vectors, dtype=np.float32)
+            self._writable = True
+
+    def upsert(self, ids, vectors, metadata=None):
+        """新增或覆盖向量"""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim))
+        metadata = metadata or [{} for _ in ids]
+
+        with self._lock:
+            self._make_writable()
+            base = len(self.vectors)
+            new_rows = []
+            for vector_id, vector, meta in zip(ids, vectors, metadata):
+                position = self._positions.get(vector_id)
+                if position is None:
+                    self._positions[vector_id] = len(self.ids)
+                    new_rows.append(vector)
+                    self.ids.append(vector_id)
+                    self.metadata.append(meta)
+                elif position >= base:
+                    # 同一批次内重复的新ID
+                    new_rows[position - base] = vector
+                    self.metadata[position] = meta
+                else:
+                    self.vectors[position] = vector
+                    self.metadata[position] = meta
+                    if self.centroids is not None:
+                        self.assignments[position] = self._nearest_list(vector[None, :])[0]
+
+            if new_rows:
+                new_rows = np.vstack(new_rows)
+                self.vectors = np.vstack([self.vectors, new_rows])
+                if self.centroids is not None:
+                    self.assignments = np.concatenate([self.assignments, self._nearest_list(new_rows)])
+
+    def delete(self, ids):
+        """删除向量 (用末尾元素填补空位)"""
+        with self._lock:
+            self._make_writable()
+            for vector_id in ids:
+                position = self._positions.pop(vector_id, None)
+                if position is None:
+                    continue
+                last = len(self.ids) - 1
+                if position != last:
+                    self.vectors[position] = self.vectors[last]
+                    self.ids[position] = self.ids[last]
+                    self.metadata[position] = self.metadata[last]
+                    self._positions[self.ids[position]] = position
+                    if self.assignments is not None:
+                        self.assignments[position] = self.assignments[last]
+                self.vectors = self.vectors[:last]
+                self.ids.pop()
+                self.metadata.pop()
+                if self.assignments is not None:
+                    self.assignments = self.assignments[:last]
+
+    # ---------- IVF ----------
+
+    def _nearest_list(self, vectors):
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def build_ivf(self, iterations=10, seed=0):
+        """用球面 k-means 训练聚类中心, 之后的查询只扫描最近的 n_probe 个簇"""
+        with self._lock:
+            n = len(self.ids)
+            if n == 0:
+                return
+            k = min(self.n_lists, n)
+            rng = np.random.default_rng(seed)
+            data = np.asarray(self.vectors)
+            centroids = data[rng.choice(n, size=k, replace=False)].copy()
+
+            for _ in range(iterations):
+                assignments = np.argmax(data @ centroids.T, axis=1)
+                for c in range(k):
+                    members = data[assignments == c]
+                    if len(members):
+                        centroids[c] = members.mean(axis=0)
+                centroids = _normalize(centroids)
+
+            self.centroids = centroids.astype(np.float32)
+            self.assignments = np.argmax(data @ self.centroids.T, axis=1).astype(np.int32)
+            self.trained_size = n
+
+    def maintain(self):
+        """IVF 模式: 尚未训练, 或向量数比上次训练时增长了 IVF_RETRAIN_GROWTH 倍时重新训练聚类中心"""
+        if self.mode != "ivf":
+            return
+        with self._lock:
+            if self.centroids is None or len(self.ids) >= self.trained_size * IVF_RETRAIN_GROWTH:
+                self.build_ivf()
+
+    # ---------- 查询 ----------
+
+    def query(self, vector, top_k=10):
+        """余弦相似度最近邻查询"""
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, self.dim))[0]
+
+        with self._lock:
+            if not self.ids:
+                return []
+
+            if self.mode == "ivf":
+                if self.centroids is None:
+                    self.build_ivf()
+                probe = np.argsort(-(self.centroids @ query))[:self.n_probe]
+                candidates = np.flatnonzero(np.isin(self.assignments, probe))
+            else:
+                candidates = np.arange(len(self.ids))
+
+            if candidates.size == 0:
+                return []
+
+            scores = np.asarray(self.vectors[candidates]) @ query
+            k = min(top_k, candidates.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                (self.ids[candidates[i]], float(scores[i]), self.metadata[candidates[i]])
+                for i in top
+            ]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PineconeVectorStore(VectorStore):
+    """Pinecone 实现, 接口与本地索引一致"""
+
+    def __init__(self, index, namespace=""):
+        self.index = index
+        self.namespace = namespace
+
+    def upsert(self, ids, vectors, metadata=None):
+        metadata = metadata or [{} for _ in ids]
+        items = [
+            {"id": str(vector_id), "values": list(map(float, vector)), "metadata": meta}
+            for vector_id, vector, meta in zip(ids, vectors, metadata)
+        ]
+        # Pinecone 单次请求建议不超过100条
+        for start in range(0, len(items), 100):
+            self.index.upsert(vectors=items[start:start + 100], namespace=self.namespace)
+
+    def query(self, vector, top_k=10):
+        response = self.index.query(
+            vector=list(map(float, vector)),
+            top_k=top_k,
+            include_metadata=True,
+            namespace=self.namespace
+        )
+        return [(m["id"], m["score"], m.get("metadata") or {}) for m in response["matches"]]
+
+    def delete(self, ids):
+        self.index.delete(ids=[str(i) for i in ids], namespace=self.namespace)
+
+    def __len__(self):
+        stats = self.index.describe_index_stats()
+        return stats.get("total_vector_count", 0)
+
+
+def create_vector_store(dim=1536):
+    """根据环境变量选择向量存储: VECTOR_STORE=local (默认) 或 pinecone"""
+    backend = os.environ.get("VECTOR_STORE", "local").lower()
+
+    if backend == "pinecone":
+        from pinecone import Pinecone
+
+        client = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
+        # PINECONE_HOST 可指向本地替身 (replay.py)
+        index_name = os.environ["PINECONE_INDEX"]
+        host = os.environ.get("PINECONE_HOST")
+        return PineconeVectorStore(client.Index(index_name, host=host) if host else client.Index(index_name))
+
+    return LocalVectorStore(
+        os.environ.get("VECTOR_STORE_DIR", "vector_index"),
+        dim,
+        mode=os.environ.get("VECTOR_STORE_MODE", "flat")
+    )
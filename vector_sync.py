@@ -0,0 +1,197 @@
+import logging
+import os
+import threading
+import time
+
+from db_pool import HEAD_HUNTER_DB
+from db_pool import HEAD_HUNTER_TABLE
+from db_pool import get_connection
+from db_pool import run_script
+from db_pool import transaction
+
+
+logger = logging.getLogger(__name__)
+
+# 应用内目前没有读取向量存储的页面, 后台同步 (会调用 OpenAI 生成向量) 默认不启动; VECTOR_SYNC=on 时启动
+VECTOR_SYNC_ENABLED = os.environ.get("VECTOR_SYNC", "off").lower() in ("1", "on", "true")
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+
+# 向量存储的保存 (以及 IVF 维护) 频率: 队列清空时, 或累计未保存行数 / 距上次保存时间达到上限时
+# LocalVectorStore.save() 重写整个索引, 每批都保存会使回填的写入量随行数平方增长
+SAVE_EVERY_ROWS = 5000
+SAVE_INTERVAL_SECONDS = 60.0
+
+
+def embed_texts(texts, model=EMBEDDING_MODEL):
+    """调用 OpenAI 批量生成向量 (一次请求处理整批文本)"""
+    from openai import OpenAI
+
+    client = OpenAI()
+    response = client.embeddings.create(model=model, input=texts)
+    return [item.embedding for item in response.data]
+
+
+def create_sync_schema(conn):
+    """创建同步队列、高水位表和触发器 - 职位发布/编辑/删除时由数据库自动入队 (迁移步骤)"""
+    run_script(conn, f'''
+        CREATE TABLE IF NOT EXISTS vector_sync_queue (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            enqueued_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS vector_sync_state (
+            name TEXT PRIMARY KEY,
+            high_water INTEGER NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_vector_sync_insert
+        AFTER INSERT ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO vector_sync_queue (job_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_vector_sync_update
+        AFTER UPDATE ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO vector_sync_queue (job_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_vector_sync_delete
+        AFTER DELETE ON {HEAD_HUNTER_TABLE}
+        BEGIN
+            INSERT INTO vector_sync_queue (job_id) VALUES (OLD.id);
+        END;
+    ''')
+
+    # 首次启用时把已有职位全部入队
+    if conn.execute("SELECT 1 FROM vector_sync_state WHERE name = 'jobs'").fetchone() is None:
+        conn.execute(f"INSERT INTO vector_sync_queue (job_id) SELECT id FROM {HEAD_HUNTER_TABLE}")
+        conn.execute("INSERT INTO vector_sync_state (name, high_water) VALUES ('jobs', 0)")
+
+
+def job_text(row):
+    """拼接用于语义检索的职位文本"""
+    job_id, title, description, responsibilities, skills, company, industry, location = row
+    return "\n".join(str(part) for part in [
+        title, company, industry, location, description, responsibilities, skills
+    ] if part)
+
+
+class VectorSyncWorker(threading.Thread):
+    """后台同步线程: 按高水位读取队列, 批量生成向量并批量写入向量存储"""
+
+    def __init__(self, store, db_path=HEAD_HUNTER_DB, embed_fn=embed_texts,
+                 batch_size=64, poll_interval=30.0, save_every=SAVE_EVERY_ROWS, save_interval=SAVE_INTERVAL_SECONDS):
+        super().__init__(name="vector-sync", daemon=True)
+        self.store = store
+        self.db_path = db_path
+        self.embed_fn = embed_fn
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.save_every = save_every
+        self.save_interval = save_interval
+        # 已写入向量存储但尚未保存的最高队列序号; 保存后才推进数据库中的高水位
+        self._applied = None
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self.synced = 0
+
+    def wake(self):
+        """有新职位时唤醒线程, 调用方立即返回"""
+        self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                processed = self.sync_once()
+                drained = processed < self.batch_size
+                if drained or self._save_due():
+                    self.flush()
+                backoff = 1.0
+            except Exception as e:
+                logger.warning("Vector sync failed, retrying in %.0fs: %s", backoff, e)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 300.0)
+                continue
+
+            # 队列未清空时继续处理下一批
+            if drained:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def sync_once(self):
+        """把一批队列项写入向量存储 (不保存), 返回处理的队列条数; 由 flush() 保存并推进高水位"""
+        conn = get_connection(self.db_path)
+        high_water = self._applied
+        if high_water is None:
+            high_water = conn.execute(
+                "SELECT high_water FROM vector_sync_state WHERE name = 'jobs'"
+            ).fetchone()[0]
+        queue = conn.execute(
+            "SELECT seq, job_id FROM vector_sync_queue WHERE seq > ? ORDER BY seq LIMIT ?",
+            (high_water, self.batch_size)
+        ).fetchall()
+        if not queue:
+            return 0
+
+        job_ids = sorted({job_id for _, job_id in queue})
+        placeholders = ",".join("?" * len(job_ids))
+        rows = conn.execute(f'''
+            SELECT id, job_title, job_description, main_responsibilities, required_skills,
+                   client_company, industry, work_location
+            FROM {HEAD_HUNTER_TABLE} WHERE id IN ({placeholders})
+        ''', job_ids).fetchall()
+
+        # 队列中存在但表中已不存在的职位 -> 从向量存储删除
+        present = {row[0] for row in rows}
+        removed = [str(job_id) for job_id in job_ids if job_id not in present]
+        if removed:
+            self.store.delete(removed)
+
+        if rows:
+            vectors = self.embed_fn([job_text(row) for row in rows])
+            metadata = [
+                {"job_id": row[0], "title": row[1], "company": row[5], "industry": row[6], "location": row[7]}
+                for row in rows
+            ]
+            self.store.upsert([str(row[0]) for row in rows], vectors, metadata)
+
+        self._applied = queue[-1][0]
+        self._unsaved += len(rows)
+        self.synced += len(rows)
+        return len(queue)
+
+    def _save_due(self):
+        return self._unsaved >= self.save_every or time.monotonic() - self._last_save >= self.save_interval
+
+    def flush(self):
+        """维护并保存向量存储, 然后推进高水位 - 重启后从已保存的位置继续, 未保存的批次会重新同步"""
+        if self._applied is None:
+            return
+        # IVF 索引在这里训练 / 重新训练聚类中心
+        self.store.maintain()
+        self.store.save()
+
+        with transaction(self.db_path) as conn:
+            conn.execute("UPDATE vector_sync_state SET high_water = ? WHERE name = 'jobs'", (self._applied,))
+            conn.execute("DELETE FROM vector_sync_queue WHERE seq <= ?", (self._applied,))
+        self._applied = None
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+
+    def pending(self):
+        """尚未同步的队列条数"""
+        return get_connection(self.db_path).execute(
+            "SELECT COUNT(*) FROM vector_sync_queue WHERE seq > "
+            "(SELECT high_water FROM vector_sync_state WHERE name = 'jobs')"
+        ).fetchone()[0]